@@ -0,0 +1,109 @@
+"""検索文の組み立てコストのマイクロベンチマーク
+
+サービスでよく使う検索（タスクの主キー検索・案件のRedmine設定・案件の見積明細）を、
+呼び出しごとの組み立て方を変えて実行し、1回あたりの時間を比べる。
+DBはメモリ上のSQLiteなので、差はほぼPython側の処理時間（文の組み立て・キャッシュキー計算・結果の変換）。
+
+    python benchmarks/query_construction.py [回数]
+
+- legacy:   db.query(...).filter(...).first()（変更前の書き方）
+- select:   呼び出しごとに select() を組み立てる
+- lambda:   lambda_stmt()（クロージャの値だけを取り出してキャッシュキーにする）
+- prebuilt: モジュールで1回だけ組み立てた文に bindparam の値を渡す（サービスの書き方）
+- get:      Session.get()（主キー検索のみ）
+"""
+import os
+import sys
+import time
+from decimal import Decimal
+
+from sqlalchemy import bindparam, create_engine, lambda_stmt, select
+from sqlalchemy.orm import Session
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "packages", "crm-core", "src"))
+
+from crm_core import Base, EstimateItem, Project, RedmineConfig, Task  # noqa: E402
+
+PROJECTS = 50
+TASKS_PER_PROJECT = 20
+ITEMS_PER_PROJECT = 10
+
+TASK_BY_ID = select(Task).where(Task.task_id == bindparam("task_id"))
+CONFIG_BY_PROJECT = select(RedmineConfig).where(RedmineConfig.project_id == bindparam("project_id"))
+ITEMS_BY_PROJECT = (
+    select(EstimateItem)
+    .where(EstimateItem.project_id == bindparam("project_id"))
+    .order_by(EstimateItem.sort_order)
+)
+
+
+def seed(engine) -> None:
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        for p in range(1, PROJECTS + 1):
+            db.add(Project(project_id=p, project_name=f"案件{p}"))
+            db.add(RedmineConfig(project_id=p, redmine_url="https://redmine.example.com", redmine_project_id=f"p{p}"))
+            for t in range(TASKS_PER_PROJECT):
+                db.add(Task(project_id=p, task_name=f"タスク{t}", sort_order=t))
+            for i in range(ITEMS_PER_PROJECT):
+                db.add(EstimateItem(project_id=p, item_name=f"明細{i}", unit_price=Decimal(1000), sort_order=i))
+        db.commit()
+
+
+VARIANTS = {
+    "Task by ID": {
+        "legacy": lambda db, n: db.query(Task).filter(Task.task_id == n).first(),
+        "select": lambda db, n: db.scalars(select(Task).where(Task.task_id == n)).first(),
+        "lambda": lambda db, n: db.scalars(lambda_stmt(lambda: select(Task).where(Task.task_id == n))).first(),
+        "prebuilt": lambda db, n: db.scalars(TASK_BY_ID, {"task_id": n}).first(),
+        "get": lambda db, n: db.get(Task, n),
+    },
+    "RedmineConfig by project": {
+        "legacy": lambda db, n: db.query(RedmineConfig).filter(RedmineConfig.project_id == n).first(),
+        "select": lambda db, n: db.scalar(select(RedmineConfig).where(RedmineConfig.project_id == n)),
+        "lambda": lambda db, n: db.scalar(lambda_stmt(lambda: select(RedmineConfig).where(RedmineConfig.project_id == n))),
+        "prebuilt": lambda db, n: db.scalar(CONFIG_BY_PROJECT, {"project_id": n}),
+    },
+    "items by project": {
+        "legacy": lambda db, n: db.query(EstimateItem).filter(
+            EstimateItem.project_id == n
+        ).order_by(EstimateItem.sort_order).all(),
+        "select": lambda db, n: db.scalars(
+            select(EstimateItem).where(EstimateItem.project_id == n).order_by(EstimateItem.sort_order)
+        ).all(),
+        "lambda": lambda db, n: db.scalars(lambda_stmt(
+            lambda: select(EstimateItem).where(EstimateItem.project_id == n).order_by(EstimateItem.sort_order)
+        )).all(),
+        "prebuilt": lambda db, n: db.scalars(ITEMS_BY_PROJECT, {"project_id": n}).all(),
+    },
+}
+
+
+def measure(engine, lookup, calls: int) -> float:
+    """1回あたりの時間（マイクロ秒）。毎回 identity map を空にして必ずSQLを発行させる"""
+    with Session(engine) as db:
+        for n in range(1, 101):  # コンパイル済みキャッシュを温める
+            lookup(db, n % PROJECTS + 1)
+            db.expunge_all()
+        started = time.perf_counter()
+        for n in range(calls):
+            lookup(db, n % PROJECTS + 1)
+            db.expunge_all()
+        return (time.perf_counter() - started) / calls * 1e6
+
+
+def main(calls: int = 5000) -> None:
+    engine = create_engine("sqlite://")
+    seed(engine)
+    print(f"{calls} calls each, in-memory SQLite (µs/call)")
+    for name, variants in VARIANTS.items():
+        baseline = None
+        print(f"\n{name}")
+        for label, lookup in variants.items():
+            per_call = measure(engine, lookup, calls)
+            baseline = baseline or per_call
+            print(f"  {label:<9} {per_call:8.1f}  ({per_call / baseline:.2f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
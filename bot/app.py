@@ -2,13 +2,22 @@
 import logging
 from slack_bolt import App
 from slack_bolt.adapter.socket_mode import SocketModeHandler
-
-from config import SLACK_BOT_TOKEN, SLACK_APP_TOKEN, DEBUG
+from crm_core import set_query_budget_mode
+
+from config import SLACK_BOT_TOKEN, SLACK_APP_TOKEN, DEBUG, SCHEDULER_ENABLED, QUERY_BUDGET_MODE
+from router import CommandRouter
+from outbox import init_outbox
+from metrics import metrics
+from scheduler import Scheduler
+from jobs import register_jobs
+from timers import timers
 from handlers.project_handler import register_project_handlers
 from handlers.report_handler import register_report_handlers
 from handlers.schedule_handler import register_schedule_handlers
 from handlers.estimate_handler import register_estimate_handlers
 from handlers.redmine_handler import register_redmine_handlers
+from handlers.suggestion_handler import register_suggestion_handlers
+from handlers.search_handler import register_search_handlers
 
 # ログ設定
 logging.basicConfig(
@@ -16,21 +25,37 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
+set_query_budget_mode(QUERY_BUDGET_MODE)
 
 # Slack App初期化
 app = App(token=SLACK_BOT_TOKEN)
 
+# メッセージコマンドはルーター経由で1つのリスナーから振り分ける
+router = CommandRouter()
+
+# Slackへの送信はバックグラウンドの送信キュー経由で行う
+outbox = init_outbox(app.client)
+
+# 定期ジョブ（月次レポート・キャッシュ更新など）
+scheduler = Scheduler()
+
 
 # ======================
 # 基本コマンド
 # ======================
-@app.message("こんにちは")
-def greet(message, say):
+@router.command("こんにちは")
+def greet(message, say, args):
     """挨拶に応答"""
     user = message["user"]
     say(f"こんにちは <@{user}>さん! 営業CRMボットです。")
 
 
+@router.command("メトリクス", aliases=("metrics",))
+def show_metrics(message, say, args):
+    """送信遅延などのメトリクスを表示"""
+    say(metrics.format_text())
+
+
 @app.event("app_mention")
 def handle_mention(event, say):
     """メンション時の応答"""
@@ -39,19 +64,27 @@ def handle_mention(event, say):
 
 
 @app.event("message")
-def handle_message_events(body, logger):
-    """その他のメッセージイベント（ログ用）"""
-    logger.debug(f"Message event: {body}")
+def handle_message_events(body, message, logger):
+    """メッセージコマンドを振り分け（該当しないものはログのみ）"""
+    if message.get("subtype") or message.get("bot_id"):
+        return
+    # 作業タイマーの無操作判定用（計測中でなければメモリ参照のみ）
+    timers.touch(message.get("user"))
+    if not router.dispatch(message, outbox.say_to(message["channel"])):
+        logger.debug(f"Message event: {body}")
 
 
 # ======================
 # ハンドラー登録
 # ======================
-register_project_handlers(app)
-register_report_handlers(app)
-register_schedule_handlers(app)
-register_estimate_handlers(app)
-register_redmine_handlers(app)
+register_project_handlers(app, router)
+register_report_handlers(app, router)
+register_schedule_handlers(app, router)
+register_estimate_handlers(app, router)
+register_redmine_handlers(app, router)
+register_search_handlers(app, router)
+register_suggestion_handlers(app)
+register_jobs(scheduler, outbox)
 
 
 # ======================
@@ -66,12 +99,18 @@ def main():
         return
 
     handler = SocketModeHandler(app, SLACK_APP_TOKEN)
+    outbox.start()
+    if SCHEDULER_ENABLED:
+        scheduler.start()
 
     try:
         logger.info("Bot is running! Press Ctrl+C to stop.")
         handler.start()
     except KeyboardInterrupt:
         logger.info("Shutting down...")
+    finally:
+        scheduler.stop()
+        outbox.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,64 @@
+"""インメモリキャッシュ"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class TTLCache:
+    """有効期限付きLRUキャッシュ（スレッドセーフ）
+
+    Boltのリスナーはスレッドプールで並行実行されるため、ロックで保護する。
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """値を取得（期限切れの場合はdefault）"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """値を保存（上限を超えたら最も古いものを破棄）"""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def add(self, key: Hashable, value: Any = True) -> bool:
+        """キーが未登録（または期限切れ）の場合のみ保存し、保存したかを返す"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] >= time.monotonic():
+                return False
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            return True
+
+    def discard(self, key: Hashable) -> None:
+        """エントリを破棄（なければ何もしない）"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """全エントリを破棄"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -16,3 +16,18 @@ DATABASE_URL = os.environ.get(
 
 # アプリ設定
 DEBUG = os.environ.get("DEBUG", "False").lower() == "true"
+# クエリ数の上限チェック（off / warn / raise）。DEBUG では違反を警告ログに記録する
+QUERY_BUDGET_MODE = os.environ.get("CRM_QUERY_BUDGET", "warn" if DEBUG else "off").lower()
+
+# スケジューラー設定
+SCHEDULER_ENABLED = os.environ.get("SCHEDULER_ENABLED", "True").lower() == "true"
+# 月次レポートの自動投稿先チャンネルID（未設定なら投稿せずキャッシュのみ）
+REPORT_CHANNEL = os.environ.get("REPORT_CHANNEL")
+# 期限チェックのダイジェスト投稿先チャンネルID（未設定なら REPORT_CHANNEL）
+DEADLINE_CHANNEL = os.environ.get("DEADLINE_CHANNEL") or REPORT_CHANNEL
+
+# 作業タイマー: 最後の操作からこの分数を過ぎたら自動停止する
+TIMER_IDLE_MINUTES = int(os.environ.get("TIMER_IDLE_MINUTES", "120"))
+
+# 工数記録: この月数より前の月は日次ロールアップに圧縮する（0なら圧縮しない）
+TIME_ENTRY_RETENTION_MONTHS = int(os.environ.get("TIME_ENTRY_RETENTION_MONTHS", "24"))
@@ -1,31 +1,27 @@
-"""Database connection and operations"""
-from contextlib import contextmanager
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
-from config import DATABASE_URL
-from models import Base, Client, Project, AcquisitionChannel, Industry, ProjectStatus
+"""Database connection and operations
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(bind=engine)
+セッションの外で使う戻り値は ORM オブジェクトではなく crm_core.rows の行（frozen・__slots__）で返す。
+"""
+import re
+from difflib import SequenceMatcher
+from typing import Optional
+from sqlalchemy import func, or_, case
+from sqlalchemy.orm import Session
+from crm_core import ChannelRow, IndustryRow, StatusRow, ClientRow, ProjectRow
+from crm_core.database import get_db
+# ハンドラ・ジョブは従来どおり database から import するため再エクスポートする
+from crm_core.database import get_read_db, get_engine, init_database  # noqa: F401
+from crm_estimate import create_version
+from models import (
+    Base, Client, Project, AcquisitionChannel, Industry, ProjectStatus,
+    normalize_company_name,
+)
 
+# "12" / "PRJ-0012" / "prj12" 形式の案件ID
+PROJECT_ID_PATTERN = re.compile(r"^(?:PRJ-?)?0*(\d{1,9})$", re.IGNORECASE)
 
-@contextmanager
-def get_db() -> Session:
-    """データベースセッションのコンテキストマネージャー"""
-    db = SessionLocal()
-    try:
-        yield db
-        db.commit()
-    except Exception:
-        db.rollback()
-        raise
-    finally:
-        db.close()
-
-
-def init_database():
-    """テーブル作成"""
-    Base.metadata.create_all(engine)
+# pg_trgm の % 演算子の既定のしきい値（pg_trgm.similarity_threshold）
+SIMILARITY_THRESHOLD = 0.3
 
 
 # ======================
@@ -36,9 +32,15 @@ def create_client(
     industry_id: int = None,
     company_size: str = None,
     contact_person: str = None
-) -> Client:
-    """クライアント作成"""
+) -> ClientRow:
+    """クライアント作成
+
+    正規化名が同じクライアントがあれば作成せずにそれを返す（normalized_name は一意）。
+    """
     with get_db() as db:
+        existing = find_client(db, company_name)
+        if existing:
+            return ClientRow.from_instance(existing)
         client = Client(
             company_name=company_name,
             industry_id=industry_id,
@@ -47,29 +49,70 @@ def create_client(
         )
         db.add(client)
         db.flush()
-        return client
+        return ClientRow.from_instance(client)
+
+
+def find_client(db: Session, company_name: str) -> Client:
+    """正規化名の完全一致でクライアントを検索（一意インデックス）"""
+    return db.query(Client).filter(
+        Client.normalized_name == normalize_company_name(company_name)
+    ).first()
 
 
-def get_client_by_name(company_name: str) -> Client:
-    """会社名でクライアント検索"""
+def get_client_by_name(company_name: str) -> Optional[ClientRow]:
+    """会社名でクライアント検索（表記ゆれを吸収した完全一致）"""
     with get_db() as db:
-        return db.query(Client).filter(
-            Client.company_name.ilike(f"%{company_name}%")
+        row = db.execute(
+            ClientRow.select().where(Client.normalized_name == normalize_company_name(company_name))
         ).first()
+        return ClientRow(*row) if row else None
+
+
+def find_client_candidates(company_name: str, limit: int = 5) -> list[tuple[int, str, float]]:
+    """会社名に似たクライアントを類似度順に返す（pg_trgm）
+
+    PostgreSQL以外（組み込みSQLite）では全クライアントの正規化名との類似度をアプリ側で計算する。
+    戻り値: (client_id, company_name, similarity) のリスト
+    """
+    normalized = normalize_company_name(company_name)
+    similarity = func.similarity(Client.normalized_name, normalized)
+    with get_db() as db:
+        if db.get_bind().dialect.name != "postgresql":
+            return _similar_clients(db, normalized, limit)
+        rows = db.query(
+            Client.client_id, Client.company_name, similarity
+        ).filter(
+            Client.normalized_name.op("%")(normalized)
+        ).order_by(
+            similarity.desc(), Client.client_id
+        ).limit(limit).all()
+        return [(client_id, name, float(score)) for client_id, name, score in rows]
+
+
+def _similar_clients(db: Session, normalized: str, limit: int) -> list[tuple[int, str, float]]:
+    """pg_trgm がないDB用の類似クライアント検索（difflib の一致率）"""
+    scored = []
+    rows = db.query(Client.client_id, Client.company_name, Client.normalized_name).filter(
+        Client.normalized_name.isnot(None)
+    )
+    for client_id, name, candidate in rows:
+        score = SequenceMatcher(None, candidate, normalized).ratio()
+        if score >= SIMILARITY_THRESHOLD:
+            scored.append((client_id, name, score))
+    scored.sort(key=lambda row: (-row[2], row[0]))
+    return scored[:limit]
 
 
-def get_or_create_client(company_name: str) -> tuple[Client, bool]:
+def get_or_create_client(company_name: str) -> tuple[ClientRow, bool]:
     """クライアント取得または作成"""
     with get_db() as db:
-        client = db.query(Client).filter(
-            Client.company_name == company_name
-        ).first()
+        client = find_client(db, company_name)
         if client:
-            return client, False
+            return ClientRow.from_instance(client), False
         client = Client(company_name=company_name)
         db.add(client)
         db.flush()
-        return client, True
+        return ClientRow.from_instance(client), True
 
 
 # ======================
@@ -82,7 +125,7 @@ def create_project(
     request_date=None,
     deadline=None,
     status_id: int = 1
-) -> Project:
+) -> ProjectRow:
     """案件作成"""
     with get_db() as db:
         project = Project(
@@ -95,48 +138,140 @@ def create_project(
         )
         db.add(project)
         db.flush()
-        return project
+        return ProjectRow.from_instance(project)
 
 
-def get_recent_projects(limit: int = 10) -> list[Project]:
+def get_recent_projects(limit: int = 10) -> list[ProjectRow]:
     """最近の案件取得"""
     with get_db() as db:
-        return db.query(Project).order_by(
-            Project.created_at.desc()
+        rows = db.execute(
+            ProjectRow.select().order_by(Project.created_at.desc()).limit(limit)
+        )
+        return [ProjectRow(*row) for row in rows]
+
+
+def search_projects(keyword: str, limit: int = 20) -> list[tuple[int, str, str]]:
+    """案件名・クライアント名・PRJ-IDで案件を検索
+
+    - 空文字: 最近の案件（主キー降順）
+    - 数字 / PRJ-0012: 案件IDの完全一致を先頭に
+    - 2文字以下: 前方一致（text_pattern_ops インデックス）
+    - 3文字以上: 部分一致（pg_trgm GINインデックス）、前方一致を上位に
+    クライアント名は正規化名（normalized_name）で照合する。
+    """
+    keyword = keyword.strip()
+    with get_db() as db:
+        query = db.query(
+            Project.project_id, Project.project_name, Client.company_name
+        ).outerjoin(Client, Project.client_id == Client.client_id)
+
+        if not keyword:
+            rows = query.order_by(Project.project_id.desc()).limit(limit).all()
+            return [tuple(r) for r in rows]
+
+        id_match = PROJECT_ID_PATTERN.match(keyword)
+        exact_id = int(id_match.group(1)) if id_match else None
+
+        pattern = _escape_like(keyword.lower())
+        client_pattern = _escape_like(normalize_company_name(keyword))
+        prefix = f"{pattern}%"
+        client_prefix = f"{client_pattern}%"
+        project_name = func.lower(Project.project_name)
+
+        if len(keyword) < 3:
+            condition = or_(
+                project_name.like(prefix, escape="\\"),
+                Client.normalized_name.like(client_prefix, escape="\\"),
+            )
+        else:
+            condition = or_(
+                Project.project_name.ilike(f"%{pattern}%", escape="\\"),
+                Client.normalized_name.like(f"%{client_pattern}%", escape="\\"),
+            )
+        whens = [
+            (project_name.like(prefix, escape="\\"), 1),
+            (Client.normalized_name.like(client_prefix, escape="\\"), 2),
+        ]
+        if exact_id is not None:
+            condition = or_(Project.project_id == exact_id, condition)
+            whens.insert(0, (Project.project_id == exact_id, 0))
+
+        rank = case(*whens, else_=3)
+        rows = query.filter(condition).order_by(
+            rank, Project.project_id.desc()
         ).limit(limit).all()
+        return [tuple(r) for r in rows]
 
 
-def update_project_status(project_id: int, status_id: int) -> Project:
+def search_clients(keyword: str, limit: int = 20) -> list[tuple[int, str]]:
+    """会社名でクライアントを検索（正規化名で照合、前方一致を上位に）"""
+    keyword = keyword.strip()
+    with get_db() as db:
+        query = db.query(Client.client_id, Client.company_name)
+        if not keyword:
+            rows = query.order_by(Client.client_id.desc()).limit(limit).all()
+            return [tuple(r) for r in rows]
+
+        pattern = _escape_like(normalize_company_name(keyword))
+        prefix = f"{pattern}%"
+        if len(pattern) < 3:
+            condition = Client.normalized_name.like(prefix, escape="\\")
+        else:
+            condition = Client.normalized_name.like(f"%{pattern}%", escape="\\")
+
+        rank = case((Client.normalized_name.like(prefix, escape="\\"), 0), else_=1)
+        rows = query.filter(condition).order_by(
+            rank, Client.client_id.desc()
+        ).limit(limit).all()
+        return [tuple(r) for r in rows]
+
+
+def _escape_like(value: str) -> str:
+    """LIKEパターンのワイルドカードをエスケープ"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+# 見積提出済（このステータスにしたときの見積を版として残す）
+ESTIMATE_SUBMITTED_STATUS = 3
+
+
+def update_project_status(project_id: int, status_id: int) -> Optional[ProjectRow]:
     """案件ステータス更新"""
     with get_db() as db:
         project = db.query(Project).filter(
             Project.project_id == project_id
         ).first()
         if project:
+            if status_id == ESTIMATE_SUBMITTED_STATUS and project.status_id != status_id:
+                create_version(db, project_id, note="見積提出")
             project.status_id = status_id
-        return project
+            db.flush()
+            return ProjectRow.from_instance(project)
+        return None
 
 
 # ======================
 # マスタデータ取得
 # ======================
-def get_all_channels() -> list[AcquisitionChannel]:
+def get_all_channels() -> list[ChannelRow]:
     """全獲得チャネル取得"""
     with get_db() as db:
-        return db.query(AcquisitionChannel).filter(
-            AcquisitionChannel.is_active == True
-        ).all()
+        rows = db.execute(
+            ChannelRow.select().where(AcquisitionChannel.is_active == True)
+        )
+        return [ChannelRow(*row) for row in rows]
 
 
-def get_all_industries() -> list[Industry]:
+def get_all_industries() -> list[IndustryRow]:
     """全業種取得"""
     with get_db() as db:
-        return db.query(Industry).all()
+        return [IndustryRow(*row) for row in db.execute(IndustryRow.select())]
 
 
-def get_all_statuses() -> list[ProjectStatus]:
+def get_all_statuses() -> list[StatusRow]:
     """全ステータス取得"""
     with get_db() as db:
-        return db.query(ProjectStatus).order_by(
-            ProjectStatus.status_order
-        ).all()
+        rows = db.execute(
+            StatusRow.select().order_by(ProjectStatus.status_order)
+        )
+        return [StatusRow(*row) for row in rows]
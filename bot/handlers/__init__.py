@@ -4,6 +4,8 @@ from .report_handler import register_report_handlers
 from .schedule_handler import register_schedule_handlers
 from .estimate_handler import register_estimate_handlers
 from .redmine_handler import register_redmine_handlers
+from .suggestion_handler import register_suggestion_handlers
+from .search_handler import register_search_handlers
 
 __all__ = [
     "register_project_handlers",
@@ -11,4 +13,6 @@ __all__ = [
     "register_schedule_handlers",
     "register_estimate_handlers",
     "register_redmine_handlers",
+    "register_suggestion_handlers",
+    "register_search_handlers",
 ]
@@ -1,40 +1,73 @@
 """見積もり機能ハンドラー"""
 from datetime import datetime
+import math
 import re
 import sys
 import os
+from sqlalchemy import func, literal_column
+from crm_core import query_budget
+from crm_core.loading import get_project_with_client
+from crm_estimate import (
+    EstimateService, insert_estimate_items, recompute_estimate_total, parse_item_lines,
+    create_version, restore_version, list_versions, get_version, version_items,
+    stored_diff, diff_items, get_estimate_accuracy, suggest_project_buffer,
+)
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database import get_db
-from models import Project, EstimateItem
+from database import get_db, get_read_db
+from models import EstimateItem
+from idempotency import begin_submission, claim_submission, abort_submission
+from outbox import get_outbox
+from pagination import Page, keyset_page, decode_cursor, build_pagination_block
+from .suggestion_handler import project_select_element, selected_project_id
 
 
-def register_estimate_handlers(app):
+def register_estimate_handlers(app, router):
     """見積もり関連のハンドラーを登録"""
 
-    @app.message(re.compile(r"^見積\s+(\d+)$"))
-    def handle_show_estimate(message, say, context):
+    @router.command("見積", r"(\d+)", usage="見積 [案件ID]")
+    def handle_show_estimate(message, say, args):
         """案件の見積一覧を表示"""
-        match = context["matches"]
-        project_id = int(match[0])
+        project_id = int(args[0])
 
         try:
-            with get_db() as db:
-                project = db.query(Project).filter(Project.project_id == project_id).first()
+            with get_read_db() as db:
+                project = get_project_with_client(db, project_id, "見積")
                 if not project:
                     say(f"案件ID {project_id} が見つかりません")
                     return
 
-                items = db.query(EstimateItem).filter(
-                    EstimateItem.project_id == project_id
-                ).order_by(EstimateItem.sort_order).all()
+                page = fetch_estimate_page(db, project_id)
+                total = calculate_estimate_total(db, project_id)
 
-                blocks = build_estimate_blocks(project, items)
+                blocks = build_estimate_blocks(project, page, total)
                 say(text=f"見積書 - {project.project_name}", blocks=blocks)
         except Exception as e:
             say(f":x: エラー: {str(e)}")
 
+    @app.action(re.compile(r"^estimate_page_(next|prev)$"))
+    def handle_estimate_page(ack, body, respond):
+        """見積明細のページ送り"""
+        ack()
+        params, position = decode_cursor(body["actions"][0]["value"])
+        project_id = params["project_id"]
+
+        try:
+            with get_read_db() as db:
+                project = get_project_with_client(db, project_id, "見積")
+                if not project:
+                    respond(f"案件ID {project_id} が見つかりません")
+                    return
+
+                page = fetch_estimate_page(db, project_id, **position)
+                total = calculate_estimate_total(db, project_id)
+
+                blocks = build_estimate_blocks(project, page, total)
+                respond(text=f"見積書 - {project.project_name}", blocks=blocks, replace_original=True)
+        except Exception as e:
+            respond(f":x: エラー: {str(e)}")
+
     @app.command("/estimate")
     def handle_estimate_command(ack, body, client):
         """見積明細追加モーダルを開く"""
@@ -45,13 +78,17 @@ def register_estimate_handlers(app):
         )
 
     @app.view("estimate_submission")
-    def handle_estimate_submission(ack, body, client, view):
+    def handle_estimate_submission(ack, body, view):
         """見積明細登録処理"""
         ack()
+        key = begin_submission(view)
+        if key is None:
+            return
+
         user_id = body["user"]["id"]
         values = view["state"]["values"]
 
-        project_id = int(values["project_id_block"]["project_id"]["value"])
+        project_id = selected_project_id(values)
         item_name = values["item_name_block"]["item_name"]["value"]
         quantity = float(values["quantity_block"]["quantity"]["value"] or "1")
         unit = values["unit_block"]["unit"]["value"] or "式"
@@ -60,6 +97,9 @@ def register_estimate_handlers(app):
 
         try:
             with get_db() as db:
+                if not claim_submission(db, key, view, user_id):
+                    return
+
                 # 明細追加
                 item = EstimateItem(
                     project_id=project_id,
@@ -73,37 +113,267 @@ def register_estimate_handlers(app):
                 db.flush()
 
                 # 案件の見積総額を更新
-                total = db.query(EstimateItem).filter(
-                    EstimateItem.project_id == project_id
-                ).all()
-                total_amount = sum(float(i.quantity) * float(i.unit_price) for i in total)
-
-                project = db.query(Project).filter(Project.project_id == project_id).first()
-                if project:
-                    project.estimated_amount = total_amount
+                total_amount = recompute_estimate_total(db, project_id)
 
                 item_id = item.item_id
 
-            client.chat_postMessage(
-                channel=user_id,
-                text=f":white_check_mark: 見積明細を追加しました\n"
-                     f"*項目:* {item_name}\n"
-                     f"*数量:* {quantity} {unit}\n"
-                     f"*単価:* ¥{unit_price:,.0f}\n"
-                     f"*金額:* ¥{quantity * unit_price:,.0f}\n"
-                     f"*見積総額:* ¥{total_amount:,.0f}"
+            get_outbox().notify(
+                user_id,
+                f":white_check_mark: 見積明細を追加しました\n"
+                f"*項目:* {item_name}\n"
+                f"*数量:* {quantity} {unit}\n"
+                f"*単価:* ¥{unit_price:,.0f}\n"
+                f"*金額:* ¥{quantity * unit_price:,.0f}\n"
+                f"*見積総額:* ¥{total_amount:,.0f}"
+            )
+        except Exception as e:
+            abort_submission(key)
+            get_outbox().notify(
+                user_id,
+                f":x: 見積追加に失敗: {str(e)}"
+            )
+
+    @app.command("/estimate-bulk")
+    def handle_estimate_bulk_command(ack, body, client):
+        """見積明細まとめて追加モーダルを開く"""
+        ack()
+        client.views_open(
+            trigger_id=body["trigger_id"],
+            view=get_estimate_bulk_modal()
+        )
+
+    @app.view("estimate_bulk_submission")
+    def handle_estimate_bulk_submission(ack, body, view):
+        """貼り付けた明細をまとめて登録"""
+        values = view["state"]["values"]
+        items, errors = parse_item_lines(values["items_block"]["items"]["value"] or "")
+        if errors or not items:
+            ack(response_action="errors", errors={
+                "items_block": "\n".join(errors[:5]) if errors else "明細を入力してください"
+            })
+            return
+
+        ack()
+        key = begin_submission(view)
+        if key is None:
+            return
+
+        user_id = body["user"]["id"]
+        project_id = selected_project_id(values)
+
+        try:
+            with get_db() as db:
+                if not claim_submission(db, key, view, user_id):
+                    return
+
+                count = insert_estimate_items(db, project_id, items)
+                total_amount = recompute_estimate_total(db, project_id)
+
+            added = sum(item["quantity"] * item["unit_price"] for item in items)
+            get_outbox().notify(
+                user_id,
+                f":white_check_mark: 見積明細を{count}件追加しました\n"
+                f"*追加金額:* ¥{added:,.0f}\n"
+                f"*見積総額:* ¥{total_amount:,.0f}"
             )
         except Exception as e:
-            client.chat_postMessage(
-                channel=user_id,
-                text=f":x: 見積追加に失敗: {str(e)}"
+            abort_submission(key)
+            get_outbox().notify(
+                user_id,
+                f":x: 見積追加に失敗: {str(e)}"
             )
 
-    @app.message(re.compile(r"^見積削除\s+(\d+)$"))
-    def handle_delete_estimate_item(message, say, context):
+    @router.command("テンプレート一覧", aliases=("見積テンプレート",))
+    @query_budget("テンプレート一覧", max_statements=1)
+    def handle_list_templates(message, say, args):
+        """見積テンプレートの一覧を表示"""
+        try:
+            templates = EstimateService.get_templates()
+            if not templates:
+                say("見積テンプレートがありません\n`テンプレート保存 [案件ID] [名前]` で作成できます")
+                return
+
+            lines = [
+                f"• *{name}*（{count}項目 ¥{total:,.0f}）" + (f" - {description}" if description else "")
+                for name, description, count, total in templates
+            ]
+            say("*見積テンプレート*\n" + "\n".join(lines))
+        except Exception as e:
+            say(f":x: エラー: {str(e)}")
+
+    @router.command("テンプレート適用", r"(\d+)\s+(.+)", usage="テンプレート適用 [案件ID] [テンプレート名]")
+    def handle_apply_template(message, say, args):
+        """テンプレートの明細を案件の見積に追加"""
+        project_id = int(args[0])
+        template_name = args[1].strip()
+
+        try:
+            count, total_amount = EstimateService.apply_template(project_id, template_name)
+            say(f":white_check_mark: テンプレート「{template_name}」の明細を{count}件追加しました\n"
+                f"*見積総額:* ¥{total_amount:,.0f}")
+        except ValueError as e:
+            say(f":warning: {str(e)}")
+        except Exception as e:
+            say(f":x: テンプレート適用に失敗: {str(e)}")
+
+    @router.command("テンプレート保存", r"(\d+)\s+(.+)", usage="テンプレート保存 [案件ID] [テンプレート名]")
+    def handle_save_template(message, say, args):
+        """案件の見積明細をテンプレートとして保存"""
+        project_id = int(args[0])
+        template_name = args[1].strip()[:100]
+
+        try:
+            count = EstimateService.save_template(project_id, template_name)
+            say(f":floppy_disk: テンプレート「{template_name}」を保存しました（{count}項目）")
+        except ValueError as e:
+            say(f":warning: {str(e)}")
+        except Exception as e:
+            say(f":x: テンプレート保存に失敗: {str(e)}")
+
+    @router.command("見積版保存", r"(\d+)(?:\s+(.+))?", usage="見積版保存 [案件ID] [メモ]")
+    def handle_save_estimate_version(message, say, args):
+        """現在の見積明細を版として保存"""
+        project_id = int(args[0])
+        note = (args[1] or "").strip()
+
+        try:
+            with get_db() as db:
+                version = create_version(db, project_id, note=note, created_by=message.get("user"))
+                if version is None:
+                    say("前の版から変更がないため、版は作成しませんでした")
+                    return
+                version_no, total = version.version_no, float(version.total_amount or 0)
+
+            say(f":bookmark: 見積を v{version_no} として保存しました（¥{total:,.0f}）")
+        except Exception as e:
+            say(f":x: 版の保存に失敗: {str(e)}")
+
+    @router.command("見積版一覧", r"(\d+)", usage="見積版一覧 [案件ID]")
+    @query_budget("見積版一覧", max_statements=1)
+    def handle_list_estimate_versions(message, say, args):
+        """見積の版一覧を表示"""
+        project_id = int(args[0])
+
+        try:
+            with get_read_db() as db:
+                versions = list_versions(db, project_id)
+
+            if not versions:
+                say(f"案件ID {project_id} の見積の版はまだありません\n`見積版保存 {project_id}` で保存できます")
+                return
+
+            lines = [
+                f"*v{v.version_no}* {v.created_at:%Y-%m-%d %H:%M} ¥{float(v.total_amount or 0):,.0f}"
+                f"（{v.item_count}項目 +{v.added_count} ~{v.changed_count} -{v.removed_count}）"
+                + (f" {v.note}" if v.note else "")
+                for v in versions[:VERSION_LIST_MAX]
+            ]
+            say(f"*見積の版 (PRJ-{project_id:04d})*\n" + "\n".join(lines))
+        except Exception as e:
+            say(f":x: エラー: {str(e)}")
+
+    @router.command("見積版", r"(\d+)\s+v?(\d+)", usage="見積版 [案件ID] [版]")
+    def handle_show_estimate_version(message, say, args):
+        """版の見積明細を表示"""
+        project_id, version_no = int(args[0]), int(args[1])
+
+        try:
+            with get_db() as db:
+                items = version_items(db, project_id, version_no)
+            if items is None:
+                say(f"版 v{version_no} が見つかりません")
+                return
+
+            total = sum(row[2] * row[4] for row in items)
+            lines = [format_version_item(row) for row in items[:VERSION_DIFF_MAX]]
+            if len(items) > VERSION_DIFF_MAX:
+                lines.append(f"…ほか {len(items) - VERSION_DIFF_MAX} 項目")
+            say(f"*見積 v{version_no} (PRJ-{project_id:04d})* 合計 ¥{total:,.0f}\n" + "\n".join(lines))
+        except Exception as e:
+            say(f":x: エラー: {str(e)}")
+
+    @router.command("見積版比較", r"(\d+)\s+v?(\d+)(?:\s+v?(\d+))?", usage="見積版比較 [案件ID] [版] [比較先の版]")
+    def handle_diff_estimate_versions(message, say, args):
+        """版の差分を表示（比較先を省略すると前の版との差分）"""
+        project_id, version_no = int(args[0]), int(args[1])
+
+        try:
+            with get_db() as db:
+                if args[2] is None:
+                    # 前の版との差分は保存済みの1行から表示
+                    version = get_version(db, project_id, version_no)
+                    if version is None:
+                        say(f"版 v{version_no} が見つかりません")
+                        return
+                    diff = stored_diff(version)
+                    title = f"v{version_no - 1} → v{version_no}" if version_no > 1 else f"v{version_no}"
+                else:
+                    other_no = int(args[2])
+                    old = version_items(db, project_id, version_no)
+                    new = version_items(db, project_id, other_no)
+                    if old is None or new is None:
+                        say(f"版 v{version_no if old is None else other_no} が見つかりません")
+                        return
+                    diff = diff_items(old, new)
+                    title = f"v{version_no} → v{other_no}"
+
+            say(f"*見積の差分 {title} (PRJ-{project_id:04d})*\n" + format_version_diff(diff))
+        except Exception as e:
+            say(f":x: エラー: {str(e)}")
+
+    @router.command("見積版復元", r"(\d+)\s+v?(\d+)", usage="見積版復元 [案件ID] [版]")
+    def handle_restore_estimate_version(message, say, args):
+        """見積明細を指定した版の内容に戻す"""
+        project_id, version_no = int(args[0]), int(args[1])
+
+        try:
+            with get_db() as db:
+                # 復元前の明細も版として残しておく
+                create_version(db, project_id, note="復元前", created_by=message.get("user"))
+                version, total_amount = restore_version(
+                    db, project_id, version_no, created_by=message.get("user")
+                )
+                new_no = version.version_no if version else None
+
+            saved = f"（v{new_no} として保存）" if new_no else ""
+            say(f":leftwards_arrow_with_hook: 見積を v{version_no} の内容に戻しました{saved}\n"
+                f"*見積総額:* ¥{total_amount:,.0f}")
+        except ValueError as e:
+            say(f":warning: {str(e)}")
+        except Exception as e:
+            say(f":x: 復元に失敗: {str(e)}")
+
+    @router.command("見積精度", r"(\d+)?", usage="見積精度 [案件ID]")
+    def handle_estimate_accuracy(message, say, args):
+        """見積と実績のずれを表示（案件ID指定時はその案件への推奨バッファ）"""
+        try:
+            if args[0] is None:
+                say(blocks=build_accuracy_blocks(get_estimate_accuracy()), text="見積精度")
+                return
+
+            project_id = int(args[0])
+            suggestion = suggest_project_buffer(project_id)
+            if suggestion is None:
+                say(f"案件ID {project_id} が見つかりません")
+                return
+
+            basis = " / ".join(f"{label}「{name}」{count}件" for label, name, count in suggestion.basis)
+            lines = [
+                f"*推奨バッファ (PRJ-{project_id:04d}):* +{suggestion.buffer:.0%}",
+                f"根拠: {basis or '全案件の実績'}",
+            ]
+            if suggestion.suggested_hours is not None:
+                lines.append(
+                    f"見積工数 {suggestion.estimated_hours:g}h → *{suggestion.suggested_hours:.1f}h*"
+                )
+            say("\n".join(lines))
+        except Exception as e:
+            say(f":x: エラー: {str(e)}")
+
+    @router.command("見積削除", r"(\d+)", usage="見積削除 [明細ID]")
+    def handle_delete_estimate_item(message, say, args):
         """見積明細を削除: 見積削除 [明細ID]"""
-        match = context["matches"]
-        item_id = int(match[0])
+        item_id = int(args[0])
 
         try:
             with get_db() as db:
@@ -118,14 +388,7 @@ def register_estimate_handlers(app):
                 db.flush()
 
                 # 見積総額を再計算
-                remaining = db.query(EstimateItem).filter(
-                    EstimateItem.project_id == project_id
-                ).all()
-                total_amount = sum(float(i.quantity) * float(i.unit_price) for i in remaining)
-
-                project = db.query(Project).filter(Project.project_id == project_id).first()
-                if project:
-                    project.estimated_amount = total_amount
+                total_amount = recompute_estimate_total(db, project_id)
 
             say(f":wastebasket: 見積明細を削除しました\n"
                 f"*削除項目:* {item_name}\n"
@@ -134,8 +397,133 @@ def register_estimate_handlers(app):
             say(f":x: 削除に失敗: {str(e)}")
 
 
-def build_estimate_blocks(project, items):
-    """見積表示用のブロックを構築"""
+# ソートキー (sort_order, item_id)。migrations/005_keyset_pagination.sql のインデックス式と同じ形
+ESTIMATE_SORT_ORDER = func.coalesce(EstimateItem.sort_order, literal_column("0"))
+
+
+# 版一覧・差分の最大表示行数（sectionのテキストは3000文字まで）
+VERSION_LIST_MAX = 20
+VERSION_DIFF_MAX = 30
+
+
+def format_version_item(row) -> str:
+    """版の明細1行の表示"""
+    _, name, quantity, unit, price = row[:5]
+    return f"• {name} {quantity:g}{unit} × ¥{price:,.0f} = ¥{quantity * price:,.0f}"
+
+
+def format_version_diff(diff) -> str:
+    """版の差分の表示"""
+    lines = []
+    for row in diff.added:
+        lines.append("➕ " + format_version_item(row)[2:])
+    for old, new in diff.changed:
+        changes = []
+        if old[1] != new[1]:
+            changes.append(f"項目名 {old[1]} → {new[1]}")
+        if old[2] != new[2] or old[3] != new[3]:
+            changes.append(f"数量 {old[2]:g}{old[3]} → {new[2]:g}{new[3]}")
+        if old[4] != new[4]:
+            changes.append(f"単価 ¥{old[4]:,.0f} → ¥{new[4]:,.0f}")
+        lines.append(f"✏️ {new[1]}: " + (", ".join(changes) or "説明・並び順を変更"))
+    for row in diff.removed:
+        lines.append("➖ " + format_version_item(row)[2:])
+
+    if not lines:
+        return "_差分はありません_"
+    before = sum(o[2] * o[4] for o, _ in diff.changed) + sum(r[2] * r[4] for r in diff.removed)
+    after = sum(n[2] * n[4] for _, n in diff.changed) + sum(a[2] * a[4] for a in diff.added)
+    shown = lines[:VERSION_DIFF_MAX]
+    if len(lines) > VERSION_DIFF_MAX:
+        shown.append(f"…ほか {len(lines) - VERSION_DIFF_MAX} 件")
+    shown.append(f"*金額の増減:* ¥{after - before:+,.0f}")
+    return "\n".join(shown)
+
+
+# 見積精度の次元ごとの表示件数
+ACCURACY_GROUPS_MAX = 8
+
+
+def format_group_accuracy(group) -> str:
+    """グループの見積精度1行の表示"""
+    rate = "-" if math.isnan(group.hourly_rate) else f"¥{group.hourly_rate:,.0f}"
+    return (
+        f"• {group.name}（{group.count}件）中央値 {group.overrun[50]:+.0%} / "
+        f"80% {group.overrun[80]:+.0%} / 時給 {rate} / バッファ +{group.buffer:.0%}"
+    )
+
+
+def build_accuracy_blocks(accuracy):
+    """見積精度のブロック"""
+    if not accuracy.overall.count:
+        return [{
+            "type": "section",
+            "text": {"type": "mrkdwn", "text": "納品済・完了の案件で見積工数と実績工数のあるものがありません"}
+        }]
+
+    blocks = [
+        {
+            "type": "header",
+            "text": {"type": "plain_text", "text": "📐 見積精度（工数の超過率）", "emoji": True}
+        },
+        {
+            "type": "section",
+            "text": {"type": "mrkdwn", "text": format_group_accuracy(accuracy.overall)[2:]}
+        },
+    ]
+    for dimension, title in (("channel", "チャネル別"), ("industry", "業種別"), ("client", "クライアント別")):
+        groups = accuracy.ranked(dimension, ACCURACY_GROUPS_MAX)
+        if groups:
+            blocks.extend([
+                {"type": "divider"},
+                {
+                    "type": "section",
+                    "text": {
+                        "type": "mrkdwn",
+                        "text": f"*{title}*\n" + "\n".join(format_group_accuracy(g) for g in groups)
+                    }
+                },
+            ])
+    blocks.append({
+        "type": "context",
+        "elements": [{"type": "mrkdwn", "text": "`見積精度 [案件ID]` でその案件への推奨バッファを表示"}]
+    })
+    return blocks
+
+
+def fetch_estimate_page(db, project_id: int, after=None, before=None) -> Page:
+    """見積明細を1ページ分だけ取得"""
+    query = db.query(
+        EstimateItem.item_id, EstimateItem.item_name, EstimateItem.quantity,
+        EstimateItem.unit, EstimateItem.unit_price,
+        ESTIMATE_SORT_ORDER.label("sort_key"),
+    ).filter(EstimateItem.project_id == project_id)
+
+    page = keyset_page(
+        query,
+        [ESTIMATE_SORT_ORDER, EstimateItem.item_id],
+        lambda row: (row.sort_key, row.item_id),
+        after=after,
+        before=before,
+    )
+    page.params = {"project_id": project_id}
+    return page
+
+
+def calculate_estimate_total(db, project_id: int) -> float:
+    """見積合計をSQLで集計（全ページ分）"""
+    total = db.query(
+        func.coalesce(func.sum(EstimateItem.quantity * EstimateItem.unit_price), 0)
+    ).filter(EstimateItem.project_id == project_id).scalar()
+    return float(total)
+
+
+@query_budget("見積表示", max_statements=0)
+def build_estimate_blocks(project, page: Page, total: float):
+    """見積表示用のブロックを構築（明細は1ページ分、合計は全明細）
+
+    project は get_project_with_client() でクライアントを先読みしておくこと。
+    """
     client_name = project.client.company_name if project.client else "不明"
 
     blocks = [
@@ -154,11 +542,10 @@ def build_estimate_blocks(project, items):
         {"type": "divider"},
     ]
 
+    items = page.rows
     if items:
-        total = 0
         for item in items:
             amount = float(item.quantity) * float(item.unit_price)
-            total += amount
             blocks.append({
                 "type": "section",
                 "text": {
@@ -174,6 +561,10 @@ def build_estimate_blocks(project, items):
                 }
             })
 
+        navigation = build_pagination_block(page, "estimate_page")
+        if navigation:
+            blocks.append(navigation)
+
         blocks.append({"type": "divider"})
         blocks.append({
             "type": "section",
@@ -203,12 +594,8 @@ def get_estimate_modal():
             {
                 "type": "input",
                 "block_id": "project_id_block",
-                "element": {
-                    "type": "plain_text_input",
-                    "action_id": "project_id",
-                    "placeholder": {"type": "plain_text", "text": "案件ID（数字）"}
-                },
-                "label": {"type": "plain_text", "text": "案件ID"}
+                "element": project_select_element(),
+                "label": {"type": "plain_text", "text": "案件"}
             },
             {
                 "type": "input",
@@ -266,3 +653,40 @@ def get_estimate_modal():
             }
         ]
     }
+
+
+def get_estimate_bulk_modal():
+    """見積明細まとめて追加モーダル"""
+    return {
+        "type": "modal",
+        "callback_id": "estimate_bulk_submission",
+        "title": {"type": "plain_text", "text": "見積明細まとめて追加"},
+        "submit": {"type": "plain_text", "text": "追加"},
+        "close": {"type": "plain_text", "text": "キャンセル"},
+        "blocks": [
+            {
+                "type": "input",
+                "block_id": "project_id_block",
+                "element": project_select_element(),
+                "label": {"type": "plain_text", "text": "案件"}
+            },
+            {
+                "type": "input",
+                "block_id": "items_block",
+                "element": {
+                    "type": "plain_text_input",
+                    "action_id": "items",
+                    "multiline": True,
+                    "placeholder": {
+                        "type": "plain_text",
+                        "text": "デザイン, 1, 式, 80000\nコーディング, 5, 人日, 40000"
+                    }
+                },
+                "label": {"type": "plain_text", "text": "明細（1行1項目）"},
+                "hint": {
+                    "type": "plain_text",
+                    "text": "項目名, 数量, 単位, 単価 の順（数量・単位は省略可）。スプレッドシートからの貼り付け（タブ区切り）にも対応"
+                }
+            }
+        ]
+    }
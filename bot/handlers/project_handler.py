@@ -1,12 +1,21 @@
 """案件登録ハンドラー - Slack対話型フォーム"""
 from datetime import datetime
+import re
 import sys
 import os
 
 # 親ディレクトリをパスに追加
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database import get_db, Client, Project
+from crm_core import query_budget
+from database import (
+    get_db, get_read_db, find_client, find_client_candidates, get_all_statuses, update_project_status,
+    Client, Project, ProjectStatus,
+)
+from idempotency import begin_submission, claim_submission, abort_submission
+from outbox import get_outbox
+from pagination import Page, keyset_page, decode_cursor, build_pagination_block
+from .suggestion_handler import NEW_CLIENT_PREFIX, invalidate_suggestions
 
 # チャネル名マッピング
 CHANNEL_MAP = {
@@ -21,7 +30,7 @@ CHANNEL_MAP = {
 }
 
 
-def register_project_handlers(app):
+def register_project_handlers(app, router):
     """案件関連のハンドラーを登録"""
 
     @app.command("/project")
@@ -34,15 +43,19 @@ def register_project_handlers(app):
         )
 
     @app.view("project_submission")
-    def handle_project_submission(ack, body, client, view):
+    def handle_project_submission(ack, body, view):
         """案件登録フォームの送信処理"""
         ack()
+        key = begin_submission(view)
+        if key is None:
+            return
+
         user_id = body["user"]["id"]
         values = view["state"]["values"]
 
         # フォームから値を取得
         project_name = values["project_name_block"]["project_name"]["value"]
-        client_name = values["client_name_block"]["client_name"]["value"]
+        client_value = values["client_block"]["client_id"]["selected_option"]["value"]
         channel_id = values["channel_block"]["channel"]["selected_option"]["value"]
         request_date = values["request_date_block"]["request_date"]["selected_date"]
         deadline = values["deadline_block"]["deadline"]["selected_date"]
@@ -53,20 +66,33 @@ def register_project_handlers(app):
         try:
             # データベースに保存
             with get_db() as db:
+                if not claim_submission(db, key, view, user_id):
+                    return
+
                 # クライアント取得または作成
-                db_client = db.query(Client).filter(
-                    Client.company_name == client_name
-                ).first()
+                if client_value.startswith(NEW_CLIENT_PREFIX):
+                    # 表記ゆれ（株式会社ABC / (株)ABC / ＡＢＣ）は同一クライアント
+                    client_name = client_value[len(NEW_CLIENT_PREFIX):]
+                    db_client = find_client(db, client_name)
+                else:
+                    db_client = db.query(Client).filter(
+                        Client.client_id == int(client_value)
+                    ).first()
+                    if not db_client:
+                        raise ValueError(f"クライアントID {client_value} が見つかりません")
 
-                if not db_client:
+                created_client = db_client is None
+                if created_client:
                     db_client = Client(company_name=client_name)
                     db.add(db_client)
                     db.flush()
+                client_id = db_client.client_id
+                client_name = db_client.company_name
 
                 # 案件作成
                 project = Project(
                     project_name=project_name,
-                    client_id=db_client.client_id,
+                    client_id=client_id,
                     acquisition_channel_id=int(channel_id),
                     request_date=datetime.strptime(request_date, "%Y-%m-%d").date() if request_date else None,
                     deadline=datetime.strptime(deadline, "%Y-%m-%d").date() if deadline else None,
@@ -77,27 +103,41 @@ def register_project_handlers(app):
                 db.flush()
                 project_id = project.project_id
 
+            invalidate_suggestions()
+
+            # 新規クライアントの場合は似た既存クライアントを知らせる
+            similar = ""
+            if created_client:
+                candidates = [
+                    name for cid, name, _ in find_client_candidates(client_name)
+                    if cid != client_id
+                ]
+                if candidates:
+                    similar = f"\n:warning: *類似クライアント:* {', '.join(candidates)}"
+
             # 成功メッセージを送信
-            client.chat_postMessage(
-                channel=user_id,
-                text=f":white_check_mark: 案件を登録しました!\n"
-                     f"*案件ID:* PRJ-{project_id:04d}\n"
-                     f"*案件名:* {project_name}\n"
-                     f"*クライアント:* {client_name}\n"
-                     f"*獲得チャネル:* {channel_name}\n"
-                     f"*依頼日:* {request_date}\n"
-                     f"*納期:* {deadline}\n"
-                     f"*メモ:* {notes if notes else '(なし)'}"
+            get_outbox().notify(
+                user_id,
+                f":white_check_mark: 案件を登録しました!\n"
+                f"*案件ID:* PRJ-{project_id:04d}\n"
+                f"*案件名:* {project_name}\n"
+                f"*クライアント:* {client_name}\n"
+                f"*獲得チャネル:* {channel_name}\n"
+                f"*依頼日:* {request_date}\n"
+                f"*納期:* {deadline}\n"
+                f"*メモ:* {notes if notes else '(なし)'}"
+                f"{similar}"
             )
         except Exception as e:
+            abort_submission(key)
             # エラーメッセージを送信
-            client.chat_postMessage(
-                channel=user_id,
-                text=f":x: 案件登録に失敗しました\nエラー: {str(e)}"
+            get_outbox().notify(
+                user_id,
+                f":x: 案件登録に失敗しました\nエラー: {str(e)}"
             )
 
-    @app.message("案件登録")
-    def handle_project_message(message, say, client):
+    @router.command("案件登録")
+    def handle_project_message(message, say, args):
         """メッセージで案件登録を開始"""
         say(
             text="案件を登録しますか?",
@@ -132,30 +172,106 @@ def register_project_handlers(app):
             view=get_project_modal()
         )
 
-    @app.message("案件一覧")
-    def handle_list_projects(message, say):
-        """最近の案件一覧を表示"""
-        try:
-            with get_db() as db:
-                projects = db.query(Project).order_by(
-                    Project.created_at.desc()
-                ).limit(10).all()
+    @router.command("案件一覧", r"(\S+)?", usage="案件一覧 [ステータス名]")
+    @query_budget("案件一覧", max_statements=1)
+    def handle_list_projects(message, say, args):
+        """最近の案件一覧を表示: 案件一覧 [ステータス名]"""
+        status_name = args[0]
 
-                if not projects:
-                    say("登録されている案件はありません。")
-                    return
+        try:
+            with get_read_db() as db:
+                page = fetch_project_page(db, status_name)
 
-                lines = ["*最近の案件一覧:*\n"]
-                for p in projects:
-                    client_name = p.client.company_name if p.client else "不明"
-                    lines.append(
-                        f"• PRJ-{p.project_id:04d}: {p.project_name} ({client_name})"
-                    )
+            if not page.rows:
+                say("登録されている案件はありません。")
+                return
 
-                say("\n".join(lines))
+            say(text="最近の案件一覧", blocks=build_project_list_blocks(page))
         except Exception as e:
             say(f"案件一覧の取得に失敗しました: {str(e)}")
 
+    @router.command("ステータス変更", r"(\d+)\s+(\S+)", usage="ステータス変更 [案件ID] [ステータス名]")
+    def handle_change_status(message, say, args):
+        """案件のステータスを変更: ステータス変更 [案件ID] [ステータス名]
+
+        見積提出済にしたときは、その時点の見積を版として保存する。
+        """
+        project_id, status_name = int(args[0]), args[1]
+
+        try:
+            statuses = {status.status_name: status for status in get_all_statuses()}
+            status = statuses.get(status_name)
+            if status is None:
+                say(f"ステータス「{status_name}」はありません\n選べるステータス: {' / '.join(statuses)}")
+                return
+
+            project = update_project_status(project_id, status.status_id)
+            if project is None:
+                say(f"案件ID {project_id} が見つかりません")
+                return
+
+            say(f":white_check_mark: PRJ-{project_id:04d} {project.project_name} を「{status_name}」にしました")
+        except Exception as e:
+            say(f":x: ステータスの変更に失敗しました: {str(e)}")
+
+    @app.action(re.compile(r"^project_page_(next|prev)$"))
+    def handle_project_page(ack, body, respond):
+        """案件一覧のページ送り"""
+        ack()
+        params, position = decode_cursor(body["actions"][0]["value"])
+
+        try:
+            with get_read_db() as db:
+                page = fetch_project_page(db, params["status"], **position)
+
+            respond(text="最近の案件一覧", blocks=build_project_list_blocks(page), replace_original=True)
+        except Exception as e:
+            respond(f"案件一覧の取得に失敗しました: {str(e)}")
+
+
+def fetch_project_page(db, status_name: str = None, after=None, before=None) -> Page:
+    """案件を新しい順に1ページ分だけ取得（クライアント名は結合して同時に取得）"""
+    query = db.query(
+        Project.project_id, Project.project_name, Project.created_at,
+        Client.company_name,
+    ).outerjoin(Client, Project.client_id == Client.client_id)
+
+    if status_name:
+        query = query.join(
+            ProjectStatus, Project.status_id == ProjectStatus.status_id
+        ).filter(ProjectStatus.status_name == status_name)
+
+    page = keyset_page(
+        query,
+        [Project.created_at, Project.project_id],
+        lambda row: (row.created_at, row.project_id),
+        after=after,
+        before=before,
+        descending=True,
+    )
+    page.params = {"status": status_name}
+    return page
+
+
+def build_project_list_blocks(page: Page) -> list:
+    """案件一覧用のブロックを構築（1ページ分）"""
+    title = "*最近の案件一覧:*"
+    if page.params.get("status"):
+        title = f"*最近の案件一覧（{page.params['status']}）:*"
+
+    lines = [title, ""]
+    for p in page.rows:
+        client_name = p.company_name or "不明"
+        lines.append(
+            f"• PRJ-{p.project_id:04d}: {p.project_name} ({client_name})"
+        )
+
+    blocks = [{"type": "section", "text": {"type": "mrkdwn", "text": "\n".join(lines)}}]
+    navigation = build_pagination_block(page, "project_page")
+    if navigation:
+        blocks.append(navigation)
+    return blocks
+
 
 def get_project_modal():
     """案件登録モーダルのビュー定義"""
@@ -178,13 +294,14 @@ def get_project_modal():
             },
             {
                 "type": "input",
-                "block_id": "client_name_block",
+                "block_id": "client_block",
                 "element": {
-                    "type": "plain_text_input",
-                    "action_id": "client_name",
-                    "placeholder": {"type": "plain_text", "text": "例: 株式会社〇〇"}
+                    "type": "external_select",
+                    "action_id": "client_id",
+                    "min_query_length": 0,
+                    "placeholder": {"type": "plain_text", "text": "会社名で検索（例: 株式会社〇〇）"}
                 },
-                "label": {"type": "plain_text", "text": "クライアント名"}
+                "label": {"type": "plain_text", "text": "クライアント"}
             },
             {
                 "type": "input",
@@ -1,6 +1,5 @@
 """Redmine連携ハンドラー"""
 from datetime import datetime
-import re
 import sys
 import os
 import requests
@@ -9,6 +8,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database import get_db
 from models import Project, Task, RedmineConfig
+from outbox import get_outbox
+from .suggestion_handler import project_select_element, selected_project_id
 
 
 class RedmineClient:
@@ -79,7 +80,7 @@ class RedmineClient:
         return response.json().get("projects", [])
 
 
-def register_redmine_handlers(app):
+def register_redmine_handlers(app, router):
     """Redmine連携のハンドラーを登録"""
 
     @app.command("/redmine-setup")
@@ -92,13 +93,13 @@ def register_redmine_handlers(app):
         )
 
     @app.view("redmine_setup_submission")
-    def handle_redmine_setup_submission(ack, body, client, view):
+    def handle_redmine_setup_submission(ack, body, view):
         """Redmine連携設定を保存"""
         ack()
         user_id = body["user"]["id"]
         values = view["state"]["values"]
 
-        project_id = int(values["project_id_block"]["project_id"]["value"])
+        project_id = selected_project_id(values)
         redmine_url = values["redmine_url_block"]["redmine_url"]["value"]
         redmine_project_id = values["redmine_project_id_block"]["redmine_project_id"]["value"]
         api_key = values["api_key_block"]["api_key"]["value"]
@@ -110,9 +111,9 @@ def register_redmine_handlers(app):
             project_exists = any(p["identifier"] == redmine_project_id for p in projects)
 
             if not project_exists:
-                client.chat_postMessage(
-                    channel=user_id,
-                    text=f":warning: Redmineプロジェクト `{redmine_project_id}` が見つかりません"
+                get_outbox().notify(
+                    user_id,
+                    f":warning: Redmineプロジェクト `{redmine_project_id}` が見つかりません"
                 )
                 return
 
@@ -136,28 +137,27 @@ def register_redmine_handlers(app):
                     )
                     db.add(config)
 
-            client.chat_postMessage(
-                channel=user_id,
-                text=f":white_check_mark: Redmine連携を設定しました\n"
-                     f"*Redmine URL:* {redmine_url}\n"
-                     f"*プロジェクト:* {redmine_project_id}"
+            get_outbox().notify(
+                user_id,
+                f":white_check_mark: Redmine連携を設定しました\n"
+                f"*Redmine URL:* {redmine_url}\n"
+                f"*プロジェクト:* {redmine_project_id}"
             )
         except requests.RequestException as e:
-            client.chat_postMessage(
-                channel=user_id,
-                text=f":x: Redmine接続エラー: {str(e)}"
+            get_outbox().notify(
+                user_id,
+                f":x: Redmine接続エラー: {str(e)}"
             )
         except Exception as e:
-            client.chat_postMessage(
-                channel=user_id,
-                text=f":x: 設定エラー: {str(e)}"
+            get_outbox().notify(
+                user_id,
+                f":x: 設定エラー: {str(e)}"
             )
 
-    @app.message(re.compile(r"^Redmine登録\s+(\d+)$"))
-    def handle_sync_to_redmine(message, say, context):
+    @router.command("Redmine登録", r"(\d+)", usage="Redmine登録 [タスクID]")
+    def handle_sync_to_redmine(message, say, args):
         """タスクをRedmineに登録: Redmine登録 [タスクID]"""
-        match = context["matches"]
-        task_id = int(match[0])
+        task_id = int(args[0])
 
         try:
             with get_db() as db:
@@ -199,11 +199,10 @@ def register_redmine_handlers(app):
         except Exception as e:
             say(f":x: エラー: {str(e)}")
 
-    @app.message(re.compile(r"^Redmine一括登録\s+(\d+)$"))
-    def handle_bulk_sync_to_redmine(message, say, context):
+    @router.command("Redmine一括登録", r"(\d+)", usage="Redmine一括登録 [案件ID]")
+    def handle_bulk_sync_to_redmine(message, say, args):
         """案件の全タスクをRedmineに登録: Redmine一括登録 [案件ID]"""
-        match = context["matches"]
-        project_id = int(match[0])
+        project_id = int(args[0])
 
         try:
             with get_db() as db:
@@ -261,12 +260,8 @@ def get_redmine_setup_modal():
             {
                 "type": "input",
                 "block_id": "project_id_block",
-                "element": {
-                    "type": "plain_text_input",
-                    "action_id": "project_id",
-                    "placeholder": {"type": "plain_text", "text": "CRM案件ID（数字）"}
-                },
-                "label": {"type": "plain_text", "text": "案件ID"}
+                "element": project_select_element(),
+                "label": {"type": "plain_text", "text": "案件"}
             },
             {
                 "type": "input",
@@ -6,15 +6,15 @@ import re
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database import get_db
-from reports.monthly_report import MonthlyReportGenerator
+from reports.monthly_report import get_monthly_report
+from outbox import get_outbox
 
 
-def register_report_handlers(app):
+def register_report_handlers(app, router):
     """レポート関連のハンドラーを登録"""
 
     @app.command("/report")
-    def handle_report_command(ack, body, client, respond):
+    def handle_report_command(ack, body):
         """月次レポートを生成して投稿"""
         ack()
         user_id = body["user"]["id"]
@@ -24,33 +24,31 @@ def register_report_handlers(app):
         year, month = parse_year_month(text)
 
         try:
-            with get_db() as db:
-                generator = MonthlyReportGenerator(db)
-                stats, markdown, blocks = generator.generate(year, month)
+            stats, markdown, blocks = get_monthly_report(year, month)
 
             # Slackに投稿
-            client.chat_postMessage(
-                channel=user_id,
+            get_outbox().post_message(
+                user_id,
                 text=f"月次レポート {stats.year}年{stats.month}月",
                 blocks=blocks
             )
 
         except Exception as e:
-            client.chat_postMessage(
-                channel=user_id,
-                text=f":x: レポート生成に失敗しました\nエラー: {str(e)}"
+            get_outbox().notify(
+                user_id,
+                f":x: レポート生成に失敗しました\nエラー: {str(e)}"
             )
 
-    @app.message(re.compile(r"^(月次)?レポート(\s+\d{4}\s+\d{1,2})?$"))
-    def handle_report_message(message, say, context):
+    @router.command("レポート", r"(?:(\d{4})\s+(\d{1,2}))?", aliases=("月次レポート",), usage="レポート [年 月]")
+    def handle_report_message(message, say, args):
         """メッセージで月次レポートを生成"""
-        text = message.get("text", "")
-        year, month = parse_year_month(text)
+        year, month = (int(args[0]), int(args[1])) if args[0] else (None, None)
+        if year is not None and not is_valid_year_month(year, month):
+            say("使い方: `レポート [年 月]`（例: レポート 2025 11）")
+            return
 
         try:
-            with get_db() as db:
-                generator = MonthlyReportGenerator(db)
-                stats, markdown, blocks = generator.generate(year, month)
+            stats, markdown, blocks = get_monthly_report(year, month)
 
             say(
                 text=f"月次レポート {stats.year}年{stats.month}月",
@@ -60,8 +58,8 @@ def register_report_handlers(app):
         except Exception as e:
             say(f":x: レポート生成に失敗しました: {str(e)}")
 
-    @app.message("ヘルプ")
-    def handle_help(message, say):
+    @router.command("ヘルプ", aliases=("help",))
+    def handle_help(message, say, args):
         """ヘルプメッセージを表示"""
         say(
             text="利用可能なコマンド一覧",
@@ -82,7 +80,29 @@ def register_report_handlers(app):
                             "*案件管理*\n"
                             "• `案件登録` - 新規案件を登録\n"
                             "• `/project` - 案件登録フォームを開く\n"
-                            "• `案件一覧` - 最近の案件を表示\n\n"
+                            "• `案件一覧` - 最近の案件を表示\n"
+                            "• `ステータス変更 [案件ID] [ステータス名]` - 案件のステータスを変更（見積提出済で見積を版として保存）\n"
+                            "• `検索 [キーワード]` - 案件の要件・メモ、タスク・見積明細を全文検索\n\n"
+                            "*工程・タスク*\n"
+                            "• `工程 [案件ID]` - マイルストーンを表示\n"
+                            "• `タスク一覧 [案件ID]` - タスク一覧（`未完了` `期限切れ` `担当:名前` で絞り込み）\n"
+                            "• `工数記録 [タスクID] [時間]` - 工数を記録\n"
+                            "• `開始 [タスクID]` / `停止 [説明]` / `タイマー` - 作業タイマーで工数を記録\n"
+                            "• `依存追加 [タスクID] [先行タスクID]` - タスクの依存関係を追加\n"
+                            "• `クリティカルパス [案件ID]` - 納期を左右するタスクを表示\n"
+                            "• `稼働状況 [週数]` - 全案件の週別稼働予定と過負荷の週を表示\n"
+                            "• `工数集計 [今週|先週|今月|先月|今日|昨日] [タスク別]` - 期間の工数を案件別に集計\n"
+                            "• `期限チェック` - 全案件の期限切れ・期限間近のマイルストーンとタスク\n"
+                            "• `/task` `/milestone` - タスク・マイルストーンを追加\n\n"
+                            "*見積・Redmine*\n"
+                            "• `見積 [案件ID]` - 見積を表示\n"
+                            "• `見積削除 [明細ID]` - 見積明細を削除\n"
+                            "• `/estimate-bulk` - 見積明細を貼り付けてまとめて追加\n"
+                            "• `テンプレート一覧` / `テンプレート適用 [案件ID] [名前]` / `テンプレート保存 [案件ID] [名前]`\n"
+                            "• `見積版保存 [案件ID] [メモ]` / `見積版一覧 [案件ID]` - 提出した見積を版として保存・一覧\n"
+                            "• `見積版 [案件ID] [版]` / `見積版比較 [案件ID] [版]` / `見積版復元 [案件ID] [版]`\n"
+                            "• `見積精度 [案件ID]` - 見積と実績のずれ・推奨バッファ\n"
+                            "• `Redmine登録 [タスクID]` / `Redmine一括登録 [案件ID]`\n\n"
                             "*レポート*\n"
                             "• `レポート` - 前月の月次レポートを生成\n"
                             "• `レポート 2025 11` - 指定月のレポートを生成\n"
@@ -101,6 +121,11 @@ def parse_year_month(text: str) -> tuple[int | None, int | None]:
     if len(numbers) >= 2:
         year = int(numbers[0])
         month = int(numbers[1])
-        if 2000 <= year <= 2100 and 1 <= month <= 12:
+        if is_valid_year_month(year, month):
             return year, month
     return None, None
+
+
+def is_valid_year_month(year: int, month: int) -> bool:
+    """レポートの対象にできる年月か"""
+    return 2000 <= year <= 2100 and 1 <= month <= 12
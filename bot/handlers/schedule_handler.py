@@ -3,21 +3,31 @@ from datetime import datetime, date
 import re
 import sys
 import os
+from sqlalchemy import func, literal_column
+from crm_core import query_budget
+from crm_schedule import (
+    TaskService, get_critical_path, get_capacity_plan, get_burn_series, sparkline, scan_deadlines,
+    aggregate_hours, period_bounds, record_time,
+)
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database import get_db
-from models import Project, Milestone, Task, EstimateItem, TimeEntry
+from database import get_db, get_read_db
+from models import Project, Milestone, Task, EstimateItem
+from idempotency import begin_submission, claim_submission, abort_submission
+from outbox import get_outbox
+from timers import timers
+from pagination import Page, keyset_page, decode_cursor, build_pagination_block
+from .suggestion_handler import project_select_element, selected_project_id
 
 
-def register_schedule_handlers(app):
+def register_schedule_handlers(app, router):
     """工期管理・タスク関連のハンドラーを登録"""
 
-    @app.message(re.compile(r"^工程\s+(\d+)$"))
-    def handle_show_schedule(message, say, context):
+    @router.command("工程", r"(\d+)", usage="工程 [案件ID]")
+    def handle_show_schedule(message, say, args):
         """案件の工程・マイルストーンを表示"""
-        match = context["matches"]
-        project_id = int(match[0])
+        project_id = int(args[0])
 
         try:
             with get_db() as db:
@@ -31,27 +41,45 @@ def register_schedule_handlers(app):
         except Exception as e:
             say(f":x: エラー: {str(e)}")
 
-    @app.message(re.compile(r"^タスク一覧\s+(\d+)$"))
-    def handle_list_tasks(message, say, context):
-        """案件のタスク一覧を表示"""
-        match = context["matches"]
-        project_id = int(match[0])
+    @router.command("タスク一覧", r"(\d+)(?:\s+(.+))?", usage="タスク一覧 [案件ID] [未完了|期限切れ|進行中|担当:名前]")
+    @query_budget("タスク一覧", max_statements=1)
+    def handle_list_tasks(message, say, args):
+        """案件のタスク一覧を表示: タスク一覧 [案件ID] [未完了|期限切れ|進行中|担当:名前 ...]"""
+        project_id = int(args[0])
+        filters = parse_task_filters(args[1] or "")
 
         try:
-            with get_db() as db:
-                tasks = db.query(Task).filter(
-                    Task.project_id == project_id
-                ).order_by(Task.sort_order, Task.due_date).all()
+            with get_read_db() as db:
+                page = fetch_task_page(db, project_id, filters)
 
-                if not tasks:
-                    say(f"案件ID {project_id} にタスクがありません")
-                    return
+            if not page.rows:
+                say(f"案件ID {project_id} に該当するタスクがありません")
+                return
 
-                blocks = build_task_list_blocks(tasks, project_id)
-                say(text=f"タスク一覧", blocks=blocks)
+            blocks = build_task_list_blocks(page, project_id)
+            say(text=f"タスク一覧", blocks=blocks)
         except Exception as e:
             say(f":x: エラー: {str(e)}")
 
+    @app.action(re.compile(r"^task_page_(next|prev)$"))
+    def handle_task_page(ack, body, respond):
+        """タスク一覧のページ送り"""
+        ack()
+        params, position = decode_cursor(body["actions"][0]["value"])
+        project_id = params["project_id"]
+
+        try:
+            with get_read_db() as db:
+                page = fetch_task_page(db, project_id, params["filters"], **position)
+
+            respond(
+                text="タスク一覧",
+                blocks=build_task_list_blocks(page, project_id),
+                replace_original=True
+            )
+        except Exception as e:
+            respond(f":x: エラー: {str(e)}")
+
     @app.command("/milestone")
     def handle_milestone_command(ack, body, client):
         """マイルストーン追加モーダルを開く"""
@@ -62,19 +90,26 @@ def register_schedule_handlers(app):
         )
 
     @app.view("milestone_submission")
-    def handle_milestone_submission(ack, body, client, view):
+    def handle_milestone_submission(ack, body, view):
         """マイルストーン登録処理"""
         ack()
+        key = begin_submission(view)
+        if key is None:
+            return
+
         user_id = body["user"]["id"]
         values = view["state"]["values"]
 
-        project_id = int(values["project_id_block"]["project_id"]["value"])
+        project_id = selected_project_id(values)
         milestone_name = values["milestone_name_block"]["milestone_name"]["value"]
         due_date_str = values["due_date_block"]["due_date"]["selected_date"]
         description = values["description_block"]["description"]["value"] or ""
 
         try:
             with get_db() as db:
+                if not claim_submission(db, key, view, user_id):
+                    return
+
                 milestone = Milestone(
                     project_id=project_id,
                     milestone_name=milestone_name,
@@ -86,17 +121,18 @@ def register_schedule_handlers(app):
                 db.flush()
                 milestone_id = milestone.milestone_id
 
-            client.chat_postMessage(
-                channel=user_id,
-                text=f":white_check_mark: マイルストーンを追加しました\n"
-                     f"*ID:* MS-{milestone_id}\n"
-                     f"*名前:* {milestone_name}\n"
-                     f"*期限:* {due_date_str}"
+            get_outbox().notify(
+                user_id,
+                f":white_check_mark: マイルストーンを追加しました\n"
+                f"*ID:* MS-{milestone_id}\n"
+                f"*名前:* {milestone_name}\n"
+                f"*期限:* {due_date_str}"
             )
         except Exception as e:
-            client.chat_postMessage(
-                channel=user_id,
-                text=f":x: マイルストーン追加に失敗: {str(e)}"
+            abort_submission(key)
+            get_outbox().notify(
+                user_id,
+                f":x: マイルストーン追加に失敗: {str(e)}"
             )
 
     @app.command("/task")
@@ -109,13 +145,17 @@ def register_schedule_handlers(app):
         )
 
     @app.view("task_submission")
-    def handle_task_submission(ack, body, client, view):
+    def handle_task_submission(ack, body, view):
         """タスク登録処理"""
         ack()
+        key = begin_submission(view)
+        if key is None:
+            return
+
         user_id = body["user"]["id"]
         values = view["state"]["values"]
 
-        project_id = int(values["project_id_block"]["project_id"]["value"])
+        project_id = selected_project_id(values)
         task_name = values["task_name_block"]["task_name"]["value"]
         estimated_hours = values["estimated_hours_block"]["estimated_hours"]["value"]
         due_date_str = values["due_date_block"]["due_date"]["selected_date"]
@@ -123,6 +163,9 @@ def register_schedule_handlers(app):
 
         try:
             with get_db() as db:
+                if not claim_submission(db, key, view, user_id):
+                    return
+
                 task = Task(
                     project_id=project_id,
                     task_name=task_name,
@@ -135,26 +178,26 @@ def register_schedule_handlers(app):
                 db.flush()
                 task_id = task.task_id
 
-            client.chat_postMessage(
-                channel=user_id,
-                text=f":white_check_mark: タスクを追加しました\n"
-                     f"*ID:* TASK-{task_id}\n"
-                     f"*名前:* {task_name}\n"
-                     f"*見積工数:* {estimated_hours}h"
+            get_outbox().notify(
+                user_id,
+                f":white_check_mark: タスクを追加しました\n"
+                f"*ID:* TASK-{task_id}\n"
+                f"*名前:* {task_name}\n"
+                f"*見積工数:* {estimated_hours}h"
             )
         except Exception as e:
-            client.chat_postMessage(
-                channel=user_id,
-                text=f":x: タスク追加に失敗: {str(e)}"
+            abort_submission(key)
+            get_outbox().notify(
+                user_id,
+                f":x: タスク追加に失敗: {str(e)}"
             )
 
-    @app.message(re.compile(r"^工数記録\s+(\d+)\s+([\d.]+)(?:\s+(.+))?$"))
-    def handle_time_entry(message, say, context):
+    @router.command("工数記録", r"(\d+)\s+(\d+(?:\.\d+)?)(?:\s+(.+))?", usage="工数記録 [タスクID] [時間] [説明]")
+    def handle_time_entry(message, say, args):
         """工数を記録: 工数記録 [タスクID] [時間] [説明]"""
-        match = context["matches"]
-        task_id = int(match[0])
-        hours = float(match[1])
-        description = match[2] if len(match) > 2 else ""
+        task_id = int(args[0])
+        hours = float(args[1])
+        description = args[2] or ""
 
         try:
             with get_db() as db:
@@ -163,21 +206,8 @@ def register_schedule_handlers(app):
                     say(f"タスクID {task_id} が見つかりません")
                     return
 
-                entry = TimeEntry(
-                    task_id=task_id,
-                    project_id=task.project_id,
-                    hours=hours,
-                    description=description,
-                    work_date=date.today()
-                )
-                db.add(entry)
-
-                # タスクの実績工数を更新
-                total_hours = sum(
-                    float(e.hours) for e in task.time_entries
-                ) + hours
-                task.actual_hours = total_hours
-                db.flush()
+                # 工数記録の追加とタスクの実績工数への加算（UPDATE 1回）
+                _, total_hours = record_time(db, task_id, task.project_id, hours, description)
 
             say(f":clock3: 工数を記録しました\n"
                 f"*タスク:* {task.task_name}\n"
@@ -186,6 +216,152 @@ def register_schedule_handlers(app):
         except Exception as e:
             say(f":x: 工数記録に失敗: {str(e)}")
 
+    @router.command("開始", r"(\d+)", usage="開始 [タスクID]")
+    def handle_start_timer(message, say, args):
+        """タスクの作業タイマーを開始（計測中のタイマーは停止して記録）"""
+        task_id = int(args[0])
+
+        try:
+            stopped, state = timers.start(message["user"], task_id)
+            if state is None:
+                say(f"タスクID {task_id} が見つかりません")
+                return
+
+            lines = []
+            if stopped is not None:
+                lines.append(format_stopped_timer(stopped))
+            lines.append(f":stopwatch: TASK-{task_id} のタイマーを開始しました（{state.started_at:%H:%M}）\n"
+                         f"終わったら `停止` を送ってください")
+            say("\n".join(lines))
+        except Exception as e:
+            say(f":x: タイマー開始に失敗: {str(e)}")
+
+    @router.command("停止", r"(.+)?", usage="停止 [説明]")
+    def handle_stop_timer(message, say, args):
+        """作業タイマーを停止して工数を記録"""
+        try:
+            stopped = timers.stop(message["user"], description=(args[0] or "").strip())
+            if stopped is None:
+                say("計測中のタイマーはありません\n`開始 [タスクID]` で開始できます")
+                return
+            say(format_stopped_timer(stopped))
+        except Exception as e:
+            say(f":x: タイマー停止に失敗: {str(e)}")
+
+    @router.command("タイマー")
+    def handle_show_timer(message, say, args):
+        """計測中のタイマーを表示"""
+        state = timers.get(message["user"])
+        if state is None:
+            say("計測中のタイマーはありません\n`開始 [タスクID]` で開始できます")
+            return
+        elapsed = (datetime.now() - state.started_at).total_seconds() / 3600
+        say(f":stopwatch: TASK-{state.task_id} を計測中（{state.started_at:%H:%M} から {elapsed:.2f}h）")
+
+    @router.command("依存追加", r"(\d+)\s+(\d+)", usage="依存追加 [タスクID] [先行タスクID]")
+    def handle_add_dependency(message, say, args):
+        """依存関係を追加: 依存追加 [タスクID] [先行タスクID]"""
+        task_id, depends_on_task_id = int(args[0]), int(args[1])
+
+        try:
+            TaskService.add_dependency(task_id, depends_on_task_id)
+            say(f":link: TASK-{task_id} は TASK-{depends_on_task_id} の完了後に着手します")
+        except ValueError as e:
+            say(f":warning: {str(e)}")
+        except Exception as e:
+            say(f":x: 依存追加に失敗: {str(e)}")
+
+    @router.command("稼働状況", r"(\d+)?", aliases=("キャパシティ",), usage="稼働状況 [週数]")
+    def handle_capacity(message, say, args):
+        """案件横断の週別稼働予定を表示: 稼働状況 [週数]"""
+        weeks = min(int(args[0]) if args[0] else CAPACITY_DEFAULT_WEEKS, CAPACITY_MAX_WEEKS)
+
+        try:
+            plan = get_capacity_plan()
+            if not len(plan.days):
+                say("残工数のある未完了タスクがありません")
+                return
+
+            blocks = build_capacity_blocks(plan, weeks)
+            say(text="稼働状況", blocks=blocks)
+        except Exception as e:
+            say(f":x: エラー: {str(e)}")
+
+    @router.command("クリティカルパス", r"(\d+)", usage="クリティカルパス [案件ID]")
+    def handle_critical_path(message, say, args):
+        """案件のクリティカルパスを表示"""
+        project_id = int(args[0])
+
+        try:
+            with get_db() as db:
+                project = db.query(Project).filter(Project.project_id == project_id).first()
+                if not project:
+                    say(f"案件ID {project_id} が見つかりません")
+                    return
+                deadline = project.deadline
+
+            result = get_critical_path(project_id)
+            if not result.timings:
+                say(f"案件ID {project_id} にタスクがありません")
+                return
+
+            blocks = build_critical_path_blocks(result, deadline)
+            say(text=f"クリティカルパス (PRJ-{project_id:04d})", blocks=blocks)
+        except ValueError as e:
+            say(f":warning: {str(e)}")
+        except Exception as e:
+            say(f":x: エラー: {str(e)}")
+
+    @router.command(
+        "工数集計", r"(今日|昨日|今週|先週|今月|先月)?(?:\s*(タスク|案件)別?)?",
+        usage="工数集計 [今日|昨日|今週|先週|今月|先月] [タスク別]",
+    )
+    def handle_timesheet(message, say, args):
+        """期間の工数を案件別（またはタスク別）に集計: 工数集計 今週"""
+        label = args[0] or "今週"
+        by = "task" if args[1] == "タスク" else "project"
+        period, offset, bucket = TIMESHEET_RANGES[label]
+        start, end = period_bounds(period, offset=offset)
+
+        try:
+            with get_db() as db:
+                rows = aggregate_hours(db, start, end, period=bucket, by=by)
+            if not rows:
+                say(f"{label}（{start:%m/%d}〜{end:%m/%d}）の工数記録はありません")
+                return
+
+            blocks = build_timesheet_blocks(rows, f"{label}の工数", start, end, bucket, by)
+            say(text=f"{label}の工数", blocks=blocks)
+        except Exception as e:
+            say(f":x: エラー: {str(e)}")
+
+    @router.command("期限チェック", aliases=("期限",))
+    def handle_deadline_check(message, say, args):
+        """全案件の期限切れ・期限間近のマイルストーンとタスクを表示"""
+        try:
+            with get_db() as db:
+                items = scan_deadlines(db)
+            if not items:
+                say(":white_check_mark: 期限切れ・期限間近のマイルストーン・タスクはありません")
+                return
+
+            say(text="期限チェック", blocks=build_deadline_blocks(items, "⏰ 期限チェック"))
+        except Exception as e:
+            say(f":x: エラー: {str(e)}")
+
+
+def format_stopped_timer(stopped) -> str:
+    """停止したタイマーの表示"""
+    period = f"{stopped.started_at:%H:%M}〜{stopped.stopped_at:%H:%M}"
+    if stopped.total_hours is None:
+        return f":stopwatch: TASK-{stopped.task_id} のタイマーを停止しました（{period}、0.01h未満のため記録なし）"
+    return (f":clock3: TASK-{stopped.task_id} に {stopped.hours:g}h を記録しました（{period}）\n"
+            f"*累計:* {stopped.total_hours:g}h")
+
+
+# 工程表示のバーンダウンに使う日数
+BURNDOWN_SPARK_DAYS = 60
+
 
 def build_schedule_blocks(project, db):
     """工程表示用のブロックを構築"""
@@ -206,6 +382,20 @@ def build_schedule_blocks(project, db):
         },
     ]
 
+    # バーンダウン（事前計算済みの日次系列から直近分を表示）
+    series = get_burn_series(project.project_id)
+    if series is not None:
+        remaining = series.burndown[-BURNDOWN_SPARK_DAYS:]
+        blocks.append({
+            "type": "context",
+            "elements": [{
+                "type": "mrkdwn",
+                "text": f"バーンダウン `{sparkline(remaining)}` "
+                        f"残 {remaining[-1]:.1f}h / 見積 {series.total_scope[-1]:.1f}h"
+                        f"（実績 {series.burnup[-1]:.1f}h, 直近{len(remaining)}日）"
+            }]
+        })
+
     milestones = db.query(Milestone).filter(
         Milestone.project_id == project.project_id
     ).order_by(Milestone.due_date).all()
@@ -236,8 +426,305 @@ def build_schedule_blocks(project, db):
     return blocks
 
 
-def build_task_list_blocks(tasks, project_id):
-    """タスク一覧用のブロックを構築"""
+# 稼働状況の表示週数
+CAPACITY_DEFAULT_WEEKS = 8
+CAPACITY_MAX_WEEKS = 26
+
+
+def build_capacity_blocks(plan, weeks: int = CAPACITY_DEFAULT_WEEKS):
+    """週別の稼働予定ブロックを構築"""
+    lines = []
+    for week in plan.weekly()[:weeks]:
+        emoji = "⚠️" if week["overbooked_days"] else "✅"
+        top = sorted(week["by_project"].items(), key=lambda x: x[1], reverse=True)[:3]
+        detail = ", ".join(f"{name[:15]} {hours:.0f}h" for name, hours in top)
+        overbooked = f"（過負荷 {week['overbooked_days']}日）" if week["overbooked_days"] else ""
+        lines.append(
+            f"{emoji} *{week['week_start']:%m/%d}週* {week['hours']:.0f}h / {week['capacity']:.0f}h{overbooked}\n"
+            f"　{detail}"
+        )
+
+    overbooked_days = plan.overbooked_days()
+    summary = (
+        f"過負荷の日: {len(overbooked_days)}日（最初: {overbooked_days[0][0]:%m/%d} {overbooked_days[0][1]:.1f}h）"
+        if overbooked_days else "過負荷の日はありません"
+    )
+
+    return [
+        {
+            "type": "header",
+            "text": {"type": "plain_text", "text": "📅 稼働状況（全案件）", "emoji": True}
+        },
+        {
+            "type": "context",
+            "elements": [{"type": "mrkdwn", "text": f"1日の上限 {plan.capacity:g}h | {summary}"}]
+        },
+        {"type": "divider"},
+        {"type": "section", "text": {"type": "mrkdwn", "text": "\n".join(lines)}},
+    ]
+
+
+# クリティカルパス表示の最大タスク数（sectionのテキストは3000文字まで）
+CRITICAL_PATH_DISPLAY_MAX = 30
+
+
+def build_critical_path_blocks(result, deadline=None):
+    """クリティカルパス表示用のブロックを構築"""
+    status_emoji = {"todo": "⬜", "in_progress": "🔵", "review": "🟡", "done": "✅"}
+    hours_per_day = result.hours_per_day
+
+    critical = result.critical_tasks()
+    lines = []
+    for timing in critical[:CRITICAL_PATH_DISPLAY_MAX]:
+        lines.append(
+            f"{status_emoji.get(timing.status, '⬜')} TASK-{timing.task_id} *{timing.task_name}* "
+            f"{timing.duration:g}h（{timing.earliest_start / hours_per_day:.1f}日目〜"
+            f"{timing.earliest_finish / hours_per_day:.1f}日目）"
+        )
+    if len(critical) > CRITICAL_PATH_DISPLAY_MAX:
+        lines.append(f"…ほか {len(critical) - CRITICAL_PATH_DISPLAY_MAX} 件")
+
+    # 余裕の少ない非クリティカルタスク
+    near = sorted(
+        (t for t in result.timings.values() if not t.is_critical),
+        key=lambda t: t.slack,
+    )[:5]
+
+    blocks = [
+        {
+            "type": "header",
+            "text": {"type": "plain_text", "text": f"🧭 クリティカルパス (PRJ-{result.project_id:04d})", "emoji": True}
+        },
+        {
+            "type": "section",
+            "fields": [
+                {"type": "mrkdwn", "text": f"*所要工数:* {result.total_hours:g}h"},
+                {"type": "mrkdwn", "text": f"*所要日数:* {result.total_days:.1f}日（{hours_per_day:g}h/日）"},
+                {"type": "mrkdwn", "text": f"*タスク数:* {len(result.timings)}（クリティカル {len(critical)}）"},
+                {"type": "mrkdwn", "text": f"*納期:* {deadline or '未設定'}"},
+            ]
+        },
+        {"type": "divider"},
+        {"type": "section", "text": {"type": "mrkdwn", "text": "\n".join(lines)}},
+    ]
+    if near:
+        blocks.append({
+            "type": "context",
+            "elements": [{
+                "type": "mrkdwn",
+                "text": "余裕の少ないタスク: " + ", ".join(
+                    f"TASK-{t.task_id}（余裕 {t.slack / hours_per_day:.1f}日）" for t in near
+                )
+            }]
+        })
+    return blocks
+
+
+# 工数集計の期間指定 → (期間, 今日からのずれ, 内訳の単位)
+TIMESHEET_RANGES = {
+    "今日": ("day", 0, "day"),
+    "昨日": ("day", -1, "day"),
+    "今週": ("week", 0, "day"),
+    "先週": ("week", -1, "day"),
+    "今月": ("month", 0, "week"),
+    "先月": ("month", -1, "week"),
+}
+TIMESHEET_DISPLAY_MAX = 25
+WEEKDAY_NAMES = "月火水木金土日"
+
+
+def format_bucket(day, bucket: str) -> str:
+    """内訳の期間ラベル"""
+    if bucket == "day":
+        return f"{day:%m/%d}({WEEKDAY_NAMES[day.weekday()]})"
+    return f"{day:%m/%d}週"
+
+
+def build_timesheet_blocks(rows, title: str, start, end, bucket: str, by: str = "project"):
+    """工数集計のブロック（合計の多い順、内訳は期間ごと）"""
+    totals: dict = {}
+    names: dict = {}
+    breakdown: dict = {}
+    bucket_totals: dict = {}
+    for row in rows:
+        totals[row.key] = totals.get(row.key, 0.0) + row.hours
+        names[row.key] = row.name
+        per_key = breakdown.setdefault(row.key, {})
+        per_key[row.period_start] = per_key.get(row.period_start, 0.0) + row.hours
+        bucket_totals[row.period_start] = bucket_totals.get(row.period_start, 0.0) + row.hours
+
+    ranked = sorted(totals, key=lambda key: -totals[key])
+    lines = []
+    for key in ranked[:TIMESHEET_DISPLAY_MAX]:
+        label = f"TASK-{key} {names[key]}" if by == "task" and key is not None else names[key]
+        detail = " / ".join(
+            f"{format_bucket(day, bucket)} {hours:g}h" for day, hours in sorted(breakdown[key].items())
+        )
+        lines.append(f"• *{label}* {totals[key]:g}h\n　{detail}")
+    if len(ranked) > TIMESHEET_DISPLAY_MAX:
+        lines.append(f"…ほか {len(ranked) - TIMESHEET_DISPLAY_MAX} 件")
+
+    per_bucket = " / ".join(
+        f"{format_bucket(day, bucket)} {hours:g}h" for day, hours in sorted(bucket_totals.items())
+    )
+    return [
+        {
+            "type": "header",
+            "text": {"type": "plain_text", "text": f"⏱ {title}", "emoji": True}
+        },
+        {
+            "type": "context",
+            "elements": [{
+                "type": "mrkdwn",
+                "text": f"{start:%Y-%m-%d}〜{end:%Y-%m-%d} | 合計 *{sum(totals.values()):g}h* | {per_bucket}"
+            }]
+        },
+        {"type": "divider"},
+        {"type": "section", "text": {"type": "mrkdwn", "text": "\n".join(lines)}},
+    ]
+
+
+# 担当者欄の Slack ユーザーID（U012ABCDEF / <@U012ABCDEF>）
+SLACK_USER_ID = re.compile(r"<?@?([UW][A-Z0-9]{6,})>?")
+
+
+def assignee_user_id(assigned_to) -> str | None:
+    """担当者欄が Slack ユーザーIDならそのID"""
+    match = SLACK_USER_ID.fullmatch((assigned_to or "").strip())
+    return match.group(1) if match else None
+
+
+# 期限チェックの最大表示件数（期限の早い順、sectionのテキストは3000文字まで）
+DEADLINE_DISPLAY_MAX = 25
+
+
+def format_deadline_item(item) -> str:
+    """期限チェック1行の表示"""
+    if item.kind == "milestone":
+        label = f"🎯 {item.name}"
+    else:
+        user_id = assignee_user_id(item.assigned_to)
+        assignee = f" <@{user_id}>" if user_id else (f" @{item.assigned_to}" if item.assigned_to else "")
+        label = f"TASK-{item.item_id} {item.name}{assignee}"
+    if item.overdue:
+        when = f"*{-item.days_left}日超過*"
+    elif item.days_left == 0:
+        when = "*今日まで*"
+    else:
+        when = f"あと{item.days_left}日"
+    return f"• {label}（PRJ-{item.project_id:04d} {item.project_name}）期限 {item.due_date} {when}"
+
+
+def build_deadline_blocks(items, title: str):
+    """期限切れ・期限間近の一覧ブロック（期限切れ → 期限間近）"""
+    overdue = [item for item in items if item.overdue]
+    at_risk = [item for item in items if not item.overdue]
+    blocks = [
+        {
+            "type": "header",
+            "text": {"type": "plain_text", "text": title, "emoji": True}
+        },
+        {
+            "type": "context",
+            "elements": [{"type": "mrkdwn", "text": f"期限切れ {len(overdue)}件 / 期限間近 {len(at_risk)}件"}]
+        },
+    ]
+
+    remaining = DEADLINE_DISPLAY_MAX
+    for heading, group in (("🔴 期限切れ", overdue), ("🟡 期限間近", at_risk)):
+        if not group or remaining <= 0:
+            continue
+        shown = group[:remaining]
+        remaining -= len(shown)
+        lines = [format_deadline_item(item) for item in shown]
+        if len(group) > len(shown):
+            lines.append(f"…ほか {len(group) - len(shown)} 件")
+        blocks.extend([
+            {"type": "divider"},
+            {
+                "type": "section",
+                "text": {"type": "mrkdwn", "text": f"*{heading}*\n" + "\n".join(lines)}
+            },
+        ])
+    return blocks
+
+
+# タスク一覧のフィルタ指定（タスク一覧 [案件ID] の後ろに空白区切りで指定）
+TASK_STATUS_ALIASES = {
+    "未着手": "todo",
+    "進行中": "in_progress",
+    "レビュー": "review",
+    "完了": "done",
+}
+
+# ソートキー (sort_order, due_date, task_id)。NULLは末尾扱いにして行値比較できるようにする。
+# migrations/005_keyset_pagination.sql のインデックス式と同じ形にすること
+TASK_SORT_ORDER = func.coalesce(Task.sort_order, literal_column("0"))
+TASK_DUE_DATE = func.coalesce(Task.due_date, literal_column("'9999-12-31'"))
+
+
+def parse_task_filters(text: str) -> dict:
+    """フィルタ指定を解析: 未完了 / 期限切れ / 未着手・進行中・レビュー・完了 / 担当:名前"""
+    filters = {}
+    for token in text.split():
+        if token == "未完了":
+            filters["open"] = True
+        elif token == "期限切れ":
+            filters["overdue"] = True
+        elif token.startswith("担当:") or token.startswith("担当："):
+            filters["assignee"] = token[3:]
+        elif token in TASK_STATUS_ALIASES:
+            filters["status"] = TASK_STATUS_ALIASES[token]
+        elif token in TASK_STATUS_ALIASES.values():
+            filters["status"] = token
+    return filters
+
+
+def fetch_task_page(db, project_id: int, filters: dict, after=None, before=None) -> Page:
+    """タスクを1ページ分だけ取得（フィルタはSQLで適用）"""
+    query = db.query(
+        Task.task_id, Task.task_name, Task.status, Task.assigned_to,
+        Task.estimated_hours, Task.actual_hours, Task.due_date,
+        TASK_SORT_ORDER.label("sort_key"), TASK_DUE_DATE.label("due_key"),
+    ).filter(Task.project_id == project_id)
+
+    if filters.get("status"):
+        query = query.filter(Task.status == filters["status"])
+    if filters.get("open") or filters.get("overdue"):
+        query = query.filter(Task.status != "done")
+    if filters.get("overdue"):
+        query = query.filter(Task.due_date < date.today())
+    if filters.get("assignee"):
+        query = query.filter(Task.assigned_to == filters["assignee"])
+
+    page = keyset_page(
+        query,
+        [TASK_SORT_ORDER, TASK_DUE_DATE, Task.task_id],
+        lambda row: (row.sort_key, row.due_key, row.task_id),
+        after=after,
+        before=before,
+    )
+    page.params = {"project_id": project_id, "filters": filters}
+    return page
+
+
+def describe_task_filters(filters: dict) -> str:
+    """フィルタ条件の表示用テキスト"""
+    labels = {v: k for k, v in TASK_STATUS_ALIASES.items()}
+    parts = []
+    if filters.get("status"):
+        parts.append(labels.get(filters["status"], filters["status"]))
+    if filters.get("open"):
+        parts.append("未完了")
+    if filters.get("overdue"):
+        parts.append("期限切れ")
+    if filters.get("assignee"):
+        parts.append(f"担当:{filters['assignee']}")
+    return " / ".join(parts)
+
+
+def build_task_list_blocks(page: Page, project_id):
+    """タスク一覧用のブロックを構築（1ページ分）"""
     status_emoji = {
         "todo": "⬜",
         "in_progress": "🔵",
@@ -250,10 +737,16 @@ def build_task_list_blocks(tasks, project_id):
             "type": "header",
             "text": {"type": "plain_text", "text": f"📝 タスク一覧 (PRJ-{project_id:04d})", "emoji": True}
         },
-        {"type": "divider"},
     ]
+    filter_text = describe_task_filters(page.params.get("filters", {}))
+    if filter_text:
+        blocks.append({
+            "type": "context",
+            "elements": [{"type": "mrkdwn", "text": f"絞り込み: {filter_text}"}]
+        })
+    blocks.append({"type": "divider"})
 
-    for task in tasks:
+    for task in page.rows:
         emoji = status_emoji.get(task.status, "⬜")
         hours_info = ""
         if task.estimated_hours:
@@ -269,6 +762,10 @@ def build_task_list_blocks(tasks, project_id):
             }
         })
 
+    navigation = build_pagination_block(page, "task_page")
+    if navigation:
+        blocks.append(navigation)
+
     return blocks
 
 
@@ -284,12 +781,8 @@ def get_milestone_modal():
             {
                 "type": "input",
                 "block_id": "project_id_block",
-                "element": {
-                    "type": "plain_text_input",
-                    "action_id": "project_id",
-                    "placeholder": {"type": "plain_text", "text": "案件ID（数字）"}
-                },
-                "label": {"type": "plain_text", "text": "案件ID"}
+                "element": project_select_element(),
+                "label": {"type": "plain_text", "text": "案件"}
             },
             {
                 "type": "input",
@@ -339,12 +832,8 @@ def get_task_modal():
             {
                 "type": "input",
                 "block_id": "project_id_block",
-                "element": {
-                    "type": "plain_text_input",
-                    "action_id": "project_id",
-                    "placeholder": {"type": "plain_text", "text": "案件ID（数字）"}
-                },
-                "label": {"type": "plain_text", "text": "案件ID"}
+                "element": project_select_element(),
+                "label": {"type": "plain_text", "text": "案件"}
             },
             {
                 "type": "input",
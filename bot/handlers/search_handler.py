@@ -0,0 +1,97 @@
+"""全文検索ハンドラー - 案件の要件・メモ、タスク・見積明細の説明を検索"""
+import re
+import sys
+import os
+from crm_core import query_budget
+from crm_core.search import DOC_TYPES, search_query, snippet
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import get_read_db
+from pagination import Page, keyset_page, decode_cursor, build_pagination_block
+
+# 1件あたり名前と本文の抜粋の2行になるため、一覧より少なめにする
+SEARCH_PAGE_SIZE = 10
+
+
+def register_search_handlers(app, router):
+    """検索関連のハンドラーを登録"""
+
+    @router.command("検索", r"(.+)", usage="検索 [キーワード]")
+    @query_budget("検索", max_statements=1)
+    def handle_search(message, say, args):
+        """案件・タスク・見積明細を全文検索: 検索 [キーワード]"""
+        keyword = args[0].strip()
+
+        try:
+            with get_read_db() as db:
+                page = fetch_search_page(db, keyword)
+
+            if not page.rows:
+                say(f"「{keyword}」に一致する案件・タスク・見積明細はありません")
+                return
+
+            say(text=f"検索: {keyword}", blocks=build_search_blocks(page))
+        except Exception as e:
+            say(f":x: 検索に失敗しました: {str(e)}")
+
+    @app.action(re.compile(r"^search_page_(next|prev)$"))
+    def handle_search_page(ack, body, respond):
+        """検索結果のページ送り"""
+        ack()
+        params, position = decode_cursor(body["actions"][0]["value"])
+
+        try:
+            with get_read_db() as db:
+                page = fetch_search_page(db, params["keyword"], **position)
+
+            respond(text=f"検索: {params['keyword']}", blocks=build_search_blocks(page), replace_original=True)
+        except Exception as e:
+            respond(f":x: 検索に失敗しました: {str(e)}")
+
+
+def fetch_search_page(db, keyword: str, after=None, before=None) -> Page:
+    """検索結果を関連度順に1ページ分だけ取得"""
+    query, columns = search_query(db, keyword)
+    if query is None:
+        page = Page(rows=[], has_prev=False, has_next=False)
+    else:
+        page = keyset_page(
+            query,
+            columns,
+            lambda row: (row.rank, row.document_id),
+            after=after,
+            before=before,
+            descending=True,
+            limit=SEARCH_PAGE_SIZE,
+        )
+    page.params = {"keyword": keyword}
+    return page
+
+
+def format_search_hit(row) -> str:
+    """検索結果1件の見出し（種類・ID・名前）"""
+    label = f"*[{DOC_TYPES[row.doc_type]}]*"
+    if row.doc_type == "project":
+        return f"{label} PRJ-{row.doc_id:04d}: {row.title}"
+    owner = f"（PRJ-{row.project_id:04d}）" if row.project_id else ""
+    if row.doc_type == "task":
+        return f"{label} TASK-{row.doc_id}: {row.title}{owner}"
+    return f"{label} 明細ID {row.doc_id}: {row.title}{owner}"
+
+
+def build_search_blocks(page: Page) -> list:
+    """検索結果のブロックを構築（1ページ分）"""
+    keyword = page.params["keyword"]
+    blocks = [{"type": "section", "text": {"type": "mrkdwn", "text": f"*検索: {keyword}*"}}]
+    for row in page.rows:
+        lines = [format_search_hit(row)]
+        excerpt = snippet(row.content, keyword)
+        if excerpt:
+            lines.append(f"> {excerpt}")
+        blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": "\n".join(lines)}})
+
+    navigation = build_pagination_block(page, "search_page")
+    if navigation:
+        blocks.append(navigation)
+    return blocks
@@ -0,0 +1,114 @@
+"""案件・クライアント選択肢ハンドラー - external_select の block_suggestion"""
+import logging
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache import TTLCache
+from database import search_projects, search_clients
+from models import normalize_company_name
+
+logger = logging.getLogger(__name__)
+
+# Slackの制約: option text は75文字、value は150文字まで
+OPTION_TEXT_MAX = 75
+OPTION_VALUE_MAX = 150
+SUGGESTION_LIMIT = 20
+
+# 新規クライアント選択肢の value プレフィックス
+NEW_CLIENT_PREFIX = "new:"
+
+# 入力中の同じクエリが連続して届くため、短いTTLでキャッシュする
+_project_cache = TTLCache(maxsize=512, ttl=30)
+_client_cache = TTLCache(maxsize=512, ttl=30)
+
+
+def register_suggestion_handlers(app):
+    """external_select の選択肢ロードハンドラーを登録"""
+
+    @app.options("project_id")
+    def handle_project_options(ack, payload):
+        """案件の選択肢を返す（/task, /milestone, /estimate, /redmine-setup）"""
+        keyword = payload.get("value", "")
+        try:
+            ack(options=get_project_options(keyword))
+        except Exception as e:
+            logger.error(f"Project suggestion failed: {e}")
+            ack(options=[])
+
+    @app.options("client_id")
+    def handle_client_options(ack, payload):
+        """クライアントの選択肢を返す（/project）"""
+        keyword = payload.get("value", "")
+        try:
+            ack(options=get_client_options(keyword))
+        except Exception as e:
+            logger.error(f"Client suggestion failed: {e}")
+            ack(options=[])
+
+
+def get_project_options(keyword: str) -> list[dict]:
+    """案件の選択肢（キャッシュ付き）"""
+    key = keyword.strip().lower()
+    options = _project_cache.get(key)
+    if options is None:
+        options = [
+            build_option(
+                f"PRJ-{project_id:04d} {project_name}" + (f" ({company_name})" if company_name else ""),
+                str(project_id)
+            )
+            for project_id, project_name, company_name in search_projects(keyword, SUGGESTION_LIMIT)
+        ]
+        _project_cache.set(key, options)
+    return options
+
+
+def get_client_options(keyword: str) -> list[dict]:
+    """クライアントの選択肢（検索結果のみキャッシュ）
+
+    入力と正規化名が一致する既存クライアントがなければ「新規」選択肢を末尾に加える。
+    キャッシュのキーは大文字・小文字を区別しないため、「新規」選択肢は毎回いまの入力から作る。
+    """
+    key = keyword.strip().lower()
+    rows = _client_cache.get(key)
+    if rows is None:
+        rows = search_clients(keyword, SUGGESTION_LIMIT)
+        _client_cache.set(key, rows)
+    options = [build_option(name, str(client_id)) for client_id, name in rows]
+    name = keyword.strip()
+    normalized = normalize_company_name(name) if name else ""
+    if name and not any(normalize_company_name(existing) == normalized for _, existing in rows):
+        options.append(build_option(
+            f"＋ 新規クライアント: {name}",
+            NEW_CLIENT_PREFIX + name[:OPTION_VALUE_MAX - len(NEW_CLIENT_PREFIX)]
+        ))
+    return options
+
+
+def build_option(text: str, value: str) -> dict:
+    """Slackの option オブジェクトを構築"""
+    if len(text) > OPTION_TEXT_MAX:
+        text = text[:OPTION_TEXT_MAX - 1] + "…"
+    return {"text": {"type": "plain_text", "text": text}, "value": value}
+
+
+def invalidate_suggestions():
+    """案件・クライアント追加時にキャッシュを破棄"""
+    _project_cache.clear()
+    _client_cache.clear()
+
+
+def project_select_element(placeholder: str = "案件名・クライアント名・PRJ-IDで検索") -> dict:
+    """案件選択用の external_select 要素"""
+    return {
+        "type": "external_select",
+        "action_id": "project_id",
+        "min_query_length": 0,
+        "placeholder": {"type": "plain_text", "text": placeholder}
+    }
+
+
+def selected_project_id(values: dict) -> int:
+    """モーダル送信値から選択された案件IDを取得"""
+    return int(values["project_id_block"]["project_id"]["selected_option"]["value"])
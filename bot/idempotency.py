@@ -0,0 +1,92 @@
+"""モーダル送信の冪等化
+
+Slackの再送（3秒以内にackできなかった場合）や送信ボタンの二重クリックで
+同じ view_submission が複数回届いても、登録は1回だけ行う。
+
+冪等キーは view ID と入力値のハッシュ。
+- まずプロセス内のTTLキャッシュで判定（DBアクセスなし）
+- 次に submission_keys テーブルの主キー制約で判定（再起動後・複数プロセス）
+  キーは登録と同じトランザクションで挿入するため、登録が失敗すればキーも残らない
+
+    key = begin_submission(view)
+    if key is None:
+        return
+    try:
+        with get_db() as db:
+            if not claim_submission(db, key, view, user_id):
+                return
+            ...  # 登録処理
+    except Exception:
+        abort_submission(key)
+"""
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from cache import TTLCache
+from metrics import metrics
+from models import SubmissionKey
+
+logger = logging.getLogger(__name__)
+
+# Slackの再送は数分以内に収まるが、二重クリックの取りこぼしがないよう長めに保持
+SUBMISSION_TTL = 24 * 60 * 60
+SUBMISSION_CACHE_SIZE = 10000
+SUBMISSION_RETENTION_DAYS = 7
+
+_recent = TTLCache(maxsize=SUBMISSION_CACHE_SIZE, ttl=SUBMISSION_TTL)
+
+
+def submission_key(view: dict) -> str:
+    """view ID と入力値から冪等キーを計算"""
+    payload = json.dumps(
+        view["state"]["values"], ensure_ascii=False, sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(f"{view['id']}:{payload}".encode("utf-8")).hexdigest()
+
+
+def begin_submission(view: dict) -> Optional[str]:
+    """送信の受付を開始（処理中・処理済みの送信ならNone）"""
+    key = submission_key(view)
+    if not _recent.add(key):
+        logger.info(f"Duplicate submission dropped: {view.get('callback_id')} {key[:12]}")
+        metrics.incr("submission.duplicate")
+        metrics.incr("submission.duplicate.memory")
+        return None
+    return key
+
+
+def claim_submission(db: Session, key: str, view: dict, user_id: Optional[str] = None) -> bool:
+    """冪等キーを登録と同じトランザクションで記録（既に記録済みならFalse）"""
+    try:
+        with db.begin_nested():
+            db.add(SubmissionKey(
+                submission_key=key,
+                callback_id=view.get("callback_id") or "",
+                user_id=user_id,
+            ))
+    except IntegrityError:
+        logger.info(f"Duplicate submission dropped: {view.get('callback_id')} {key[:12]}")
+        metrics.incr("submission.duplicate")
+        metrics.incr("submission.duplicate.db")
+        return False
+    metrics.incr("submission.accepted")
+    return True
+
+
+def abort_submission(key: str) -> None:
+    """登録に失敗した送信を受付済みから外す（再送で再試行できるように）"""
+    _recent.discard(key)
+
+
+def purge_submission_keys(db: Session, days: int = SUBMISSION_RETENTION_DAYS) -> int:
+    """保持期間を過ぎた冪等キーを削除"""
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    return db.query(SubmissionKey).filter(
+        SubmissionKey.created_at < cutoff
+    ).delete(synchronize_session=False)
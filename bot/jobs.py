@@ -0,0 +1,127 @@
+"""組み込みの定期ジョブ"""
+import logging
+from datetime import date
+
+from crm_core import check_replica
+from crm_core.database import has_replica, is_replica_active
+from crm_schedule import scan_deadlines, mark_delayed_milestones, group_by_assignee, ensure_partitions, compact_time_entries
+
+from config import REPORT_CHANNEL, DEADLINE_CHANNEL, TIME_ENTRY_RETENTION_MONTHS
+from database import get_db
+from handlers.schedule_handler import build_deadline_blocks, assignee_user_id
+from idempotency import purge_submission_keys
+from metrics import metrics
+from timers import timers
+from reports.monthly_report import get_monthly_report, previous_month
+
+logger = logging.getLogger(__name__)
+
+
+def register_jobs(scheduler, outbox):
+    """組み込みジョブを登録"""
+
+    @scheduler.job("monthly_report", "0 6 1 * *")
+    def post_monthly_report(run_at):
+        """毎月1日の早朝に前月のレポートを作成して投稿"""
+        # 再起動後のキャッチアップでも、本来の実行日から見た前月を対象にする
+        year, month = previous_month(run_at.date())
+        stats, markdown, blocks = get_monthly_report(year, month, refresh=True)
+        if REPORT_CHANNEL:
+            outbox.post_message(
+                REPORT_CHANNEL,
+                text=f"月次レポート {stats.year}年{stats.month}月",
+                blocks=blocks
+            )
+
+    @scheduler.job("cache_warming", "0 7 * * *")
+    def warm_caches(run_at):
+        """始業前に当月・前月のレポートを作り、/report をキャッシュから返せるようにする
+
+        日中は案件・クライアントの変更で破棄され、次の /report で作り直される。
+        """
+        today = date.today()
+        for year, month in {(today.year, today.month), previous_month(today)}:
+            get_monthly_report(year, month, refresh=True)
+
+    @scheduler.job("submission_key_cleanup", "30 3 * * *")
+    def cleanup_submission_keys(run_at):
+        """保持期間を過ぎた冪等キーを削除"""
+        with get_db() as db:
+            deleted = purge_submission_keys(db)
+        logger.info(f"Purged {deleted} submission keys")
+
+    @scheduler.job("time_entry_maintenance", "15 3 * * *")
+    def maintain_time_entries(run_at):
+        """工数記録の先の月のパーティションを作成し、保持期間を過ぎた月を日次ロールアップに圧縮"""
+        # パーティションを作成できなくても圧縮は行う（作成は翌日に再試行される）
+        try:
+            with get_db() as db:
+                created = ensure_partitions(db, run_at.date())
+        except Exception as e:
+            logger.error(f"Creating time entry partitions failed: {e}")
+        else:
+            if created:
+                logger.info(f"Created time entry partitions: {', '.join(created)}")
+        if TIME_ENTRY_RETENTION_MONTHS > 0:
+            with get_db() as db:
+                result = compact_time_entries(db, TIME_ENTRY_RETENTION_MONTHS, run_at.date())
+            if result.entries:
+                logger.info(
+                    f"Compacted {result.entries} time entries before {result.before} "
+                    f"into {result.rollups} daily rollups ({len(result.partitions)} partitions dropped)"
+                )
+
+    @scheduler.job("deadline_scan", "0 8 * * *")
+    def scan_deadlines_job(run_at):
+        """期限切れのマイルストーンを delayed にし、期限切れ・期限間近の一覧を担当者ごとに1通で送る"""
+        with get_db() as db:
+            delayed, recovered = mark_delayed_milestones(db, run_at.date())
+            items = scan_deadlines(db, run_at.date())
+        logger.info(f"Deadline scan: {len(items)} items, {delayed} milestones delayed, {recovered} recovered")
+
+        # Slack ユーザーIDの担当者にはDM、それ以外（マイルストーン・名前だけの担当者）はチャンネルに1通
+        unrouted = []
+        groups = group_by_assignee(items, lambda name: assignee_user_id(name) or name.strip())
+        for assignee, assigned in groups.items():
+            user_id = assignee_user_id(assignee)
+            if user_id:
+                outbox.post_message(
+                    user_id,
+                    text=f"期限チェック: {len(assigned)}件",
+                    blocks=build_deadline_blocks(assigned, "⏰ あなたの期限チェック"),
+                )
+            else:
+                unrouted.extend(assigned)
+
+        if unrouted and DEADLINE_CHANNEL:
+            unrouted.sort(key=lambda item: (item.due_date, item.kind, item.item_id))
+            outbox.post_message(
+                DEADLINE_CHANNEL,
+                text=f"期限チェック: {len(unrouted)}件",
+                blocks=build_deadline_blocks(unrouted, "⏰ 期限チェック"),
+            )
+
+    @scheduler.job("timer_idle_check", "*/5 * * * *")
+    def stop_idle_timers(run_at):
+        """無操作のまま放置されたタイマーを最終操作時刻までで停止して本人に通知"""
+        for user_id, stopped in timers.stop_idle():
+            outbox.notify(
+                user_id,
+                f":zzz: TASK-{stopped.task_id} のタイマーを自動停止しました"
+                f"（最終操作 {stopped.stopped_at:%H:%M} までの {stopped.hours:g}h を記録）\n"
+                f"その後も作業していた場合は `工数記録 {stopped.task_id} [時間]` で追加してください"
+            )
+
+    if has_replica():
+        @scheduler.job("replica_check", "* * * * *")
+        def check_replica_job(run_at):
+            """読み取り用レプリカの遅延をメトリクスに記録（接続不可・遅延過大ならプライマリへ振り替え）"""
+            try:
+                lag = check_replica()
+            except Exception as e:
+                logger.warning(f"Replica check failed: {e}")
+                metrics.incr("db.replica_errors")
+            else:
+                if lag is not None:
+                    metrics.gauge("db.replica_lag_seconds", lag)
+            metrics.gauge("db.replica_active", int(is_replica_active()))
@@ -0,0 +1,74 @@
+"""プロセス内メトリクス（カウンターと所要時間）"""
+import threading
+from collections import deque
+
+# 所要時間は直近の観測値だけを保持してパーセンタイルを計算する
+TIMING_WINDOW = 1000
+
+
+class Metrics:
+    """スレッドセーフなカウンター・所要時間の集計"""
+
+    def __init__(self):
+        self._counters: dict[str, int] = {}
+        self._gauges: dict[str, float] = {}
+        self._timings: dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, value: int = 1) -> None:
+        """カウンターを加算"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def gauge(self, name: str, value: float) -> None:
+        """現在値を記録"""
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, seconds: float) -> None:
+        """所要時間を記録"""
+        with self._lock:
+            if name not in self._timings:
+                self._timings[name] = deque(maxlen=TIMING_WINDOW)
+            self._timings[name].append(seconds)
+
+    def snapshot(self) -> dict:
+        """現在の集計値を取得"""
+        with self._lock:
+            timings = {}
+            for name, values in self._timings.items():
+                ordered = sorted(values)
+                if not ordered:
+                    continue
+                timings[name] = {
+                    "count": len(ordered),
+                    "avg": sum(ordered) / len(ordered),
+                    "p50": ordered[len(ordered) // 2],
+                    "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                    "max": ordered[-1],
+                }
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "timings": timings,
+            }
+
+    def format_text(self) -> str:
+        """Slack表示用のテキスト"""
+        snapshot = self.snapshot()
+        lines = ["*メトリクス*"]
+        for name, value in sorted(snapshot["counters"].items()):
+            lines.append(f"• {name}: {value}")
+        for name, value in sorted(snapshot["gauges"].items()):
+            lines.append(f"• {name}: {value:g}")
+        for name, t in sorted(snapshot["timings"].items()):
+            lines.append(
+                f"• {name}: n={t['count']} avg={t['avg'] * 1000:.0f}ms "
+                f"p95={t['p95'] * 1000:.0f}ms max={t['max'] * 1000:.0f}ms"
+            )
+        if len(lines) == 1:
+            lines.append("_まだ記録がありません_")
+        return "\n".join(lines)
+
+
+metrics = Metrics()
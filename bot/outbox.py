@@ -0,0 +1,238 @@
+"""Slack送信キュー
+
+ハンドラーはメッセージをキューに積むだけで、実際の送信はバックグラウンドの
+送信スレッドが行う。
+
+- メソッドごとのトークンバケットでレート制限内に収める
+- 429 は Retry-After の秒数だけそのメソッドを止めてから再送する
+- 同じ宛先への短い通知（notify）はまとめて1メッセージにする
+- 送信遅延（キュー投入〜送信完了）をメトリクスに記録する
+"""
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from slack_sdk.errors import SlackApiError
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# (1秒あたりの送信数, バースト, 宛先ごとか)
+# chat.postMessage はチャンネルあたり約1件/秒、chat.update は Tier 3（50件/分）
+METHOD_LIMITS = {
+    "chat.postMessage": (1.0, 3, True),
+    "chat.update": (50 / 60, 5, False),
+}
+DEFAULT_LIMIT = (20 / 60, 3, False)
+
+COALESCE_WINDOW = 2.0     # 通知をまとめるまでの待ち時間（秒）
+COALESCE_MAX_CHARS = 3000  # まとめた通知の最大文字数
+MAX_ATTEMPTS = 5
+
+
+class TokenBucket:
+    """トークンバケット"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def wait_time(self, now: float) -> float:
+        """トークンが1つ溜まるまでの秒数（0なら即送信可）"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self) -> None:
+        self.tokens -= 1
+
+
+@dataclass
+class OutboundMessage:
+    """送信待ちメッセージ"""
+    method: str
+    channel: str
+    kwargs: dict
+    coalesce: bool = False
+    enqueued_at: float = field(default_factory=time.monotonic)
+    attempts: int = 0
+
+
+class SlackOutbox:
+    """宛先ごとのFIFOを保ったままレート制限内で送信する送信キュー"""
+
+    def __init__(self, client, coalesce_window: float = COALESCE_WINDOW):
+        self.client = client
+        self.coalesce_window = coalesce_window
+        self._queues: dict[str, deque] = {}
+        self._buckets: dict[tuple, TokenBucket] = {}
+        self._blocked_until: dict[str, float] = {}
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    # ======================
+    # キュー投入（ハンドラースレッドから呼ぶ）
+    # ======================
+    def post_message(self, channel: str, text: str = "", blocks: list = None, **kwargs) -> None:
+        """chat.postMessage を予約"""
+        kwargs.update(channel=channel, text=text)
+        if blocks is not None:
+            kwargs["blocks"] = blocks
+        self._enqueue(OutboundMessage("chat.postMessage", channel, kwargs))
+
+    def notify(self, channel: str, text: str) -> None:
+        """短い通知を予約（同じ宛先への通知はまとめて送る）"""
+        self._enqueue(OutboundMessage(
+            "chat.postMessage", channel, {"channel": channel, "text": text}, coalesce=True
+        ))
+
+    def update_message(self, channel: str, ts: str, text: str = "", blocks: list = None) -> None:
+        """chat.update を予約"""
+        kwargs = {"channel": channel, "ts": ts, "text": text}
+        if blocks is not None:
+            kwargs["blocks"] = blocks
+        self._enqueue(OutboundMessage("chat.update", channel, kwargs))
+
+    def say_to(self, channel: str) -> Callable:
+        """Boltの say と同じ呼び出し方で送信キューに積む関数を返す"""
+        def say(text: str = "", blocks: list = None, **kwargs):
+            self.post_message(channel, text=text, blocks=blocks, **kwargs)
+        return say
+
+    def _enqueue(self, message: OutboundMessage) -> None:
+        with self._cond:
+            self._queues.setdefault(message.channel, deque()).append(message)
+            metrics.gauge("slack.queue_depth", self._depth())
+            self._cond.notify()
+
+    # ======================
+    # 送信スレッド
+    # ======================
+    def start(self) -> None:
+        """送信スレッドを開始"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="slack-outbox", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """送信待ちを可能な範囲で送ってから停止"""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                message, wait = self._next_ready()
+                if message is None:
+                    if not self._running and not self._queues:
+                        return
+                    self._cond.wait(timeout=wait)
+                    continue
+            self._send(message)
+
+    def _next_ready(self) -> tuple[Optional[OutboundMessage], Optional[float]]:
+        """送信可能な先頭メッセージを取り出す（なければ次に見直すまでの秒数）"""
+        now = time.monotonic()
+        wait = None
+        for channel in list(self._queues):
+            queue = self._queues[channel]
+            head = queue[0]
+
+            delay = max(0.0, self._blocked_until.get(head.method, 0) - now)
+            if head.coalesce and self._running:
+                delay = max(delay, head.enqueued_at + self.coalesce_window - now)
+            bucket = self._bucket(head)
+            if delay == 0:
+                delay = bucket.wait_time(now)
+            if delay > 0:
+                wait = delay if wait is None else min(wait, delay)
+                continue
+
+            bucket.consume()
+            message = queue.popleft()
+            if message.coalesce:
+                message = self._coalesce(message, queue)
+            if not queue:
+                del self._queues[channel]
+            metrics.gauge("slack.queue_depth", self._depth())
+            return message, None
+        return None, wait
+
+    def _coalesce(self, first: OutboundMessage, queue: deque) -> OutboundMessage:
+        """続く通知を1メッセージにまとめる"""
+        texts = [first.kwargs["text"]]
+        length = len(texts[0])
+        while queue and queue[0].coalesce:
+            text = queue[0].kwargs["text"]
+            if length + len(text) + 1 > COALESCE_MAX_CHARS:
+                break
+            queue.popleft()
+            texts.append(text)
+            length += len(text) + 1
+        if len(texts) > 1:
+            metrics.incr("slack.coalesced", len(texts) - 1)
+            first.kwargs["text"] = "\n".join(texts)
+        return first
+
+    def _bucket(self, message: OutboundMessage) -> TokenBucket:
+        rate, capacity, per_channel = METHOD_LIMITS.get(message.method, DEFAULT_LIMIT)
+        key = (message.method, message.channel if per_channel else None)
+        if key not in self._buckets:
+            self._buckets[key] = TokenBucket(rate, capacity)
+        return self._buckets[key]
+
+    def _send(self, message: OutboundMessage) -> None:
+        method = getattr(self.client, message.method.replace(".", "_"))
+        message.attempts += 1
+        try:
+            method(**message.kwargs)
+            metrics.incr("slack.sent")
+            metrics.observe("slack.send_latency", time.monotonic() - message.enqueued_at)
+        except SlackApiError as e:
+            if e.response.status_code == 429 and message.attempts < MAX_ATTEMPTS:
+                retry_after = float(e.response.headers.get("Retry-After", 1))
+                logger.warning(f"Rate limited on {message.method}, retry after {retry_after}s")
+                metrics.incr("slack.rate_limited")
+                with self._cond:
+                    self._blocked_until[message.method] = time.monotonic() + retry_after
+                    self._queues.setdefault(message.channel, deque()).appendleft(message)
+                return
+            logger.error(f"Failed to send {message.method} to {message.channel}: {e}")
+            metrics.incr("slack.failed")
+        except Exception as e:
+            logger.error(f"Failed to send {message.method} to {message.channel}: {e}")
+            metrics.incr("slack.failed")
+
+    def _depth(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+
+_outbox: Optional[SlackOutbox] = None
+
+
+def init_outbox(client) -> SlackOutbox:
+    """送信キューを初期化（app.py から1回だけ呼ぶ）"""
+    global _outbox
+    _outbox = SlackOutbox(client)
+    return _outbox
+
+
+def get_outbox() -> SlackOutbox:
+    """送信キューを取得"""
+    if _outbox is None:
+        raise RuntimeError("Outbox is not initialized")
+    return _outbox
@@ -0,0 +1,127 @@
+"""キーセット（カーソル）ページング
+
+OFFSETを使わず、最後に表示した行のソートキーを起点に次の1ページだけを取得する。
+Slackのボタン value にカーソルを埋め込み、「次へ / 前へ」で往復できるようにする。
+"""
+import json
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Callable, Optional
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+# Slackのメッセージは50ブロックまで。ヘッダー・ナビゲーション分を残した件数
+PAGE_SIZE = 20
+
+
+@dataclass
+class Page:
+    """1ページ分の結果"""
+    rows: list
+    has_prev: bool
+    has_next: bool
+    first_key: Optional[tuple] = None
+    last_key: Optional[tuple] = None
+    params: dict = field(default_factory=dict)
+
+
+def keyset_page(
+    query: Query,
+    columns: list,
+    key_of: Callable[[Any], tuple],
+    after: Optional[tuple] = None,
+    before: Optional[tuple] = None,
+    descending: bool = False,
+    limit: int = PAGE_SIZE,
+) -> Page:
+    """ソートキー columns でキーセットページングした1ページを取得
+
+    after: このキーより後ろのページ（次へ）
+    before: このキーより前のページ（前へ）
+    key_of: 行からソートキーのタプルを取り出す関数
+    """
+    key = tuple_(*columns)
+    backward = before is not None
+    # 前ページは逆順に limit+1 件取得してから並べ直す
+    reverse = descending != backward
+
+    if after is not None:
+        query = query.filter(key < after if descending else key > after)
+    elif before is not None:
+        query = query.filter(key > before if descending else key < before)
+
+    order = [c.desc() if reverse else c.asc() for c in columns]
+    rows = query.order_by(*order).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backward:
+        rows.reverse()
+        has_prev, has_next = has_more, True
+    else:
+        has_prev, has_next = after is not None, has_more
+
+    return Page(
+        rows=rows,
+        has_prev=has_prev,
+        has_next=has_next,
+        first_key=key_of(rows[0]) if rows else None,
+        last_key=key_of(rows[-1]) if rows else None,
+    )
+
+
+def encode_cursor(params: dict, key: tuple, direction: str) -> str:
+    """ボタン value 用にカーソルを文字列化"""
+    return json.dumps(
+        {"p": params, "k": [_encode_value(v) for v in key], "d": direction},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+
+
+def decode_cursor(value: str) -> tuple[dict, dict]:
+    """カーソル文字列から (params, {"after"|"before": key}) を復元"""
+    data = json.loads(value)
+    key = tuple(_decode_value(v) for v in data["k"])
+    position = {"after": key} if data["d"] == "next" else {"before": key}
+    return data["p"], position
+
+
+def build_pagination_block(page: Page, action_prefix: str) -> Optional[dict]:
+    """「前へ / 次へ」ボタンのactionsブロックを構築（不要ならNone）"""
+    elements = []
+    if page.has_prev and page.first_key is not None:
+        elements.append({
+            "type": "button",
+            "text": {"type": "plain_text", "text": "◀ 前へ"},
+            "action_id": f"{action_prefix}_prev",
+            "value": encode_cursor(page.params, page.first_key, "prev"),
+        })
+    if page.has_next and page.last_key is not None:
+        elements.append({
+            "type": "button",
+            "text": {"type": "plain_text", "text": "次へ ▶"},
+            "action_id": f"{action_prefix}_next",
+            "value": encode_cursor(page.params, page.last_key, "next"),
+        })
+    if not elements:
+        return None
+    return {"type": "actions", "elements": elements}
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"t": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if "t" in value:
+            return datetime.fromisoformat(value["t"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+    return value
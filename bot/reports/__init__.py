@@ -1,4 +1,4 @@
 """Reports module for Freelance CRM"""
-from .monthly_report import MonthlyReportGenerator
+from .monthly_report import MonthlyReportGenerator, get_monthly_report, previous_month
 
-__all__ = ["MonthlyReportGenerator"]
+__all__ = ["MonthlyReportGenerator", "get_monthly_report", "previous_month"]
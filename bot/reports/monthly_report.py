@@ -2,16 +2,30 @@
 from datetime import datetime, date
 from calendar import monthrange
 from dataclasses import dataclass
+from itertools import chain
 from typing import Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import event, func, and_
+from crm_core import query_budget
+from crm_core.loading import query_projects_with_client
 
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from cache import TTLCache
+from database import get_read_db
 from models import Project, Client, AcquisitionChannel
 
+# 案件・クライアントの変更をコミットしたら破棄する。TTLは他のプロセスでの変更を反映するまでの上限
+# （スケジューラーの cache_warming ジョブが始業前に当月・前月分を作っておく）
+REPORT_CACHE_TTL = 60 * 60
+_report_cache = TTLCache(maxsize=24, ttl=REPORT_CACHE_TTL)
+
+# レポートの集計対象（変更されたらキャッシュを破棄する）
+_REPORT_MODELS = (Project, Client)
+_REPORT_CHANGED = "crm_report_changed"
+
 
 @dataclass
 class MonthlyStats:
@@ -60,12 +74,13 @@ class MonthlyReportGenerator:
         end_date = date(year, month, last_day)
         return start_date, end_date
 
+    @query_budget("月次レポート", max_statements=3)
     def collect_stats(self, year: int, month: int) -> MonthlyStats:
         """月次統計を収集"""
         start_date, end_date = self.get_month_range(year, month)
 
         # 当月に作成された案件
-        new_projects = self.db.query(Project).filter(
+        new_projects = query_projects_with_client(self.db, "月次レポート").filter(
             and_(
                 func.date(Project.created_at) >= start_date,
                 func.date(Project.created_at) <= end_date
@@ -297,17 +312,68 @@ class MonthlyReportGenerator:
     def generate(self, year: Optional[int] = None, month: Optional[int] = None) -> tuple[MonthlyStats, str, list]:
         """レポートを生成して統計、Markdown、Slackブロックを返す"""
         if year is None or month is None:
-            today = date.today()
             # 前月のレポートを生成
-            if today.month == 1:
-                year = today.year - 1
-                month = 12
-            else:
-                year = today.year
-                month = today.month - 1
+            year, month = previous_month(date.today())
 
         stats = self.collect_stats(year, month)
         markdown = self.generate_markdown(stats)
         blocks = self.generate_slack_blocks(stats)
 
         return stats, markdown, blocks
+
+
+def previous_month(day: date) -> tuple[int, int]:
+    """前月の年月"""
+    if day.month == 1:
+        return day.year - 1, 12
+    return day.year, day.month - 1
+
+
+def invalidate_monthly_reports():
+    """案件・クライアントの変更時にレポートのキャッシュを破棄"""
+    _report_cache.clear()
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_report_change(session, flush_context):
+    """案件・クライアントの追加・変更・削除を記録（破棄はコミット後）"""
+    if any(isinstance(obj, _REPORT_MODELS) for obj in chain(session.new, session.dirty, session.deleted)):
+        session.info[_REPORT_CHANGED] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_report_bulk_change(orm_execute_state):
+    """案件・クライアントへの一括 UPDATE・DELETE（見積合計の更新など）を記録"""
+    if orm_execute_state.is_select:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, _REPORT_MODELS):
+        orm_execute_state.session.info[_REPORT_CHANGED] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    # コミット前に破棄すると、その間に別スレッドが古い内容でキャッシュし直すことがある
+    if session.info.pop(_REPORT_CHANGED, False):
+        invalidate_monthly_reports()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_report_change(session):
+    session.info.pop(_REPORT_CHANGED, None)
+
+
+def get_monthly_report(
+    year: Optional[int] = None, month: Optional[int] = None, refresh: bool = False
+) -> tuple[MonthlyStats, str, list]:
+    """月次レポートを取得（キャッシュ付き、refresh=True で作り直す）"""
+    if year is None or month is None:
+        year, month = previous_month(date.today())
+
+    key = (year, month)
+    report = None if refresh else _report_cache.get(key)
+    if report is None:
+        with get_read_db() as db:
+            report = MonthlyReportGenerator(db).generate(year, month)
+        _report_cache.set(key, report)
+    return report
@@ -0,0 +1,94 @@
+r"""メッセージコマンドルーター
+
+Boltのメッセージリスナーを1つにまとめ、先頭の単語（コマンド名）で
+ハンドラーを引く。コマンド数によらず1メッセージあたり辞書引き1回で振り分け、
+引数はコマンドごとに事前コンパイルした正規表現で解析する。
+
+    router = CommandRouter()
+
+    @router.command("工程", r"(\d+)", usage="工程 [案件ID]")
+    def handle_show_schedule(message, say, args):
+        project_id = int(args[0])
+"""
+import logging
+import re
+from dataclasses import dataclass
+from typing import Callable, Optional, Pattern
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Command:
+    """登録済みコマンド"""
+    name: str
+    handler: Callable
+    parser: Optional[Pattern]
+    usage: str
+
+
+class CommandRouter:
+    """先頭キーワードによるコマンド振り分け"""
+
+    def __init__(self):
+        self._commands: dict[str, Command] = {}
+
+    def command(
+        self,
+        name: str,
+        args: Optional[str] = None,
+        aliases: tuple[str, ...] = (),
+        usage: Optional[str] = None,
+    ):
+        """コマンドを登録するデコレーター
+
+        name: コマンド名（メッセージ先頭の単語と完全一致）
+        args: 引数部分全体にマッチする正規表現（省略時は引数なし）
+        aliases: 別名
+        usage: 引数が不正なときに返す使い方
+        """
+        parser = re.compile(args) if args else None
+
+        def decorator(handler: Callable) -> Callable:
+            command = Command(name, handler, parser, usage or name)
+            for key in (name, *aliases):
+                if key in self._commands:
+                    raise ValueError(f"Command '{key}' is already registered")
+                self._commands[key] = command
+            return handler
+
+        return decorator
+
+    def resolve(self, text: str) -> tuple[Optional[Command], Optional[tuple]]:
+        """メッセージからコマンドと引数を解決
+
+        コマンドが見つからなければ (None, None)、引数が不正なら (command, None)。
+        """
+        parts = text.strip().split(None, 1)
+        if not parts:
+            return None, None
+
+        command = self._commands.get(parts[0])
+        if command is None:
+            return None, None
+
+        rest = parts[1].strip() if len(parts) > 1 else ""
+        if command.parser is None:
+            return command, (() if not rest else None)
+
+        match = command.parser.fullmatch(rest)
+        return command, (match.groups() if match else None)
+
+    def dispatch(self, message: dict, say: Callable) -> bool:
+        """メッセージを対応するハンドラーに渡す（該当コマンドがなければFalse）"""
+        command, args = self.resolve(message.get("text") or "")
+        if command is None:
+            return False
+
+        if args is None:
+            say(f"使い方: `{command.usage}`")
+            return True
+
+        logger.debug(f"Dispatch command: {command.name} {args}")
+        command.handler(message=message, say=say, args=args)
+        return True
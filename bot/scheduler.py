@@ -0,0 +1,253 @@
+"""ボット内スケジューラー
+
+cron形式（分 時 日 月 曜日）の定期ジョブをボットのプロセス内で実行する。
+実行状態は scheduled_jobs テーブルに保存する。
+
+- 前回・次回の実行時刻を記録
+- running_since を条件付きUPDATEで取得してから実行するため、同じジョブが
+  重なって実行されることはない（複数プロセスで起動しても1つだけが実行）
+- 停止中に実行時刻を過ぎたジョブは、起動後に1回だけまとめて実行する
+
+    scheduler = Scheduler()
+
+    @scheduler.job("monthly_report", "0 9 1 * *")
+    def post_monthly_report(run_at):
+        ...  # run_at は本来の実行予定時刻
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import or_
+
+from database import get_db
+from metrics import metrics
+from models import ScheduledJob
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 30.0  # 実行予定を確認する間隔（秒）
+STALE_LOCK = timedelta(hours=6)  # これより古い running_since はクラッシュしたプロセスの残骸とみなす
+
+# (最小値, 最大値)
+_CRON_FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+_MAX_SEARCH_DAYS = 366 * 5
+
+
+class CronSchedule:
+    """cron式（分 時 日 月 曜日）
+
+    各フィールドは `*`, `*/n`, `a`, `a-b`, `a-b/n` とそのカンマ区切りに対応。
+    曜日は 0=日曜（7も日曜）。日と曜日が両方指定されている場合はどちらかに一致すればよい。
+    """
+
+    def __init__(self, expression: str):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Invalid cron expression: '{expression}'")
+        self.expression = expression
+        fields = []
+        for part, (low, high) in zip(parts, _CRON_FIELDS):
+            high = 7 if (low, high) == (0, 6) else high
+            fields.append(self._parse_field(part, low, high))
+        self.minutes, self.hours, self.days, self.months, weekdays = fields
+        self.weekdays = {d % 7 for d in weekdays}
+        self._any_day = parts[2] == "*"
+        self._any_weekday = parts[4] == "*"
+
+    @staticmethod
+    def _parse_field(part: str, low: int, high: int) -> set[int]:
+        values = set()
+        for item in part.split(","):
+            rng, _, step = item.partition("/")
+            if rng == "*":
+                start, end = low, high
+            elif "-" in rng:
+                start, end = (int(v) for v in rng.split("-", 1))
+            else:
+                start = int(rng)
+                end = high if step else start
+            step = int(step) if step else 1
+            if start < low or end > high or start > end or step < 1:
+                raise ValueError(f"Invalid cron field: '{part}'")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, day: datetime) -> bool:
+        if day.month not in self.months:
+            return False
+        weekday = (day.weekday() + 1) % 7  # Python: 0=月曜 → cron: 0=日曜
+        if self._any_day and self._any_weekday:
+            return True
+        if self._any_day:
+            return weekday in self.weekdays
+        if self._any_weekday:
+            return day.day in self.days
+        return day.day in self.days or weekday in self.weekdays
+
+    def next_after(self, after: datetime) -> datetime:
+        """after より後で最初に一致する時刻（分単位）"""
+        start = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = start.replace(hour=0, minute=0)
+        for _ in range(_MAX_SEARCH_DAYS):
+            if self._day_matches(day):
+                for hour in sorted(self.hours):
+                    for minute in sorted(self.minutes):
+                        candidate = day.replace(hour=hour, minute=minute)
+                        if candidate >= start:
+                            return candidate
+            day += timedelta(days=1)
+        raise ValueError(f"Cron expression never matches: '{self.expression}'")
+
+
+@dataclass(frozen=True)
+class Job:
+    """登録済みジョブ"""
+    name: str
+    schedule: CronSchedule
+    func: Callable[[datetime], None]
+
+
+class Scheduler:
+    """プロセス内の定期ジョブ実行"""
+
+    def __init__(self, poll_interval: float = POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self._jobs: dict[str, Job] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def job(self, name: str, cron: str):
+        """ジョブを登録するデコレーター"""
+        schedule = CronSchedule(cron)
+
+        def decorator(func: Callable) -> Callable:
+            if name in self._jobs:
+                raise ValueError(f"Job '{name}' is already registered")
+            self._jobs[name] = Job(name, schedule, func)
+            return func
+
+        return decorator
+
+    # ======================
+    # 起動・停止
+    # ======================
+    def start(self) -> None:
+        """スケジュールを同期して実行スレッドを開始"""
+        if self._thread and self._thread.is_alive():
+            return
+        self.sync()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """実行スレッドを停止（実行中のジョブは完了まで待たない）"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def sync(self) -> None:
+        """登録済みジョブを scheduled_jobs に反映
+
+        未登録のジョブは次回実行時刻を設定して追加し、cron式が変わったジョブは
+        次回実行時刻を計算し直す。停止中に過ぎた next_run_at はそのまま残し、
+        次の確認で1回だけ実行する（キャッチアップ）。
+        """
+        now = datetime.now()
+        with get_db() as db:
+            rows = {row.job_name: row for row in db.query(ScheduledJob).all()}
+            for job in self._jobs.values():
+                row = rows.get(job.name)
+                if row is None:
+                    db.add(ScheduledJob(
+                        job_name=job.name,
+                        cron=job.schedule.expression,
+                        next_run_at=job.schedule.next_after(now),
+                    ))
+                elif row.cron != job.schedule.expression:
+                    row.cron = job.schedule.expression
+                    row.next_run_at = job.schedule.next_after(now)
+                elif row.next_run_at and row.next_run_at <= now:
+                    logger.info(f"Job '{job.name}' missed its run at {row.next_run_at}, catching up")
+
+    # ======================
+    # 実行
+    # ======================
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_pending()
+            except Exception as e:
+                logger.error(f"Scheduler poll failed: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def run_pending(self) -> None:
+        """実行時刻を過ぎたジョブをそれぞれ別スレッドで実行"""
+        now = datetime.now()
+        with get_db() as db:
+            due = db.query(ScheduledJob.job_name, ScheduledJob.next_run_at).filter(
+                ScheduledJob.enabled.is_(True),
+                ScheduledJob.next_run_at <= now,
+            ).all()
+
+        for name, run_at in due:
+            job = self._jobs.get(name)
+            if job is None or not self._acquire(name, now):
+                continue
+            threading.Thread(
+                target=self._execute, args=(job, run_at), name=f"job-{name}", daemon=True
+            ).start()
+
+    def _acquire(self, name: str, now: datetime) -> bool:
+        """実行ロックを取得（他で実行中ならFalse）"""
+        with get_db() as db:
+            acquired = db.query(ScheduledJob).filter(
+                ScheduledJob.job_name == name,
+                ScheduledJob.next_run_at <= now,
+                or_(
+                    ScheduledJob.running_since.is_(None),
+                    ScheduledJob.running_since < now - STALE_LOCK,
+                ),
+            ).update({ScheduledJob.running_since: now}, synchronize_session=False)
+        if not acquired:
+            metrics.incr("scheduler.skipped_overlap")
+        return bool(acquired)
+
+    def _execute(self, job: Job, run_at: datetime) -> None:
+        """ジョブを実行して結果と次回実行時刻を記録"""
+        started = time.monotonic()
+        status, error = "success", None
+        logger.info(f"Running job '{job.name}' (scheduled at {run_at})")
+        try:
+            job.func(run_at)
+        except Exception as e:
+            status, error = "failed", str(e)
+            logger.error(f"Job '{job.name}' failed: {e}")
+        duration = time.monotonic() - started
+
+        metrics.incr(f"scheduler.{status}")
+        metrics.observe(f"job.{job.name}", duration)
+
+        finished = datetime.now()
+        try:
+            with get_db() as db:
+                db.query(ScheduledJob).filter(ScheduledJob.job_name == job.name).update({
+                    ScheduledJob.last_run_at: finished,
+                    ScheduledJob.last_status: status,
+                    ScheduledJob.last_error: error,
+                    ScheduledJob.last_duration: round(duration, 3),
+                    # 停止中に複数回分を過ぎていても、次回は現在時刻以降の1回だけ
+                    ScheduledJob.next_run_at: job.schedule.next_after(finished),
+                    ScheduledJob.running_since: None,
+                }, synchronize_session=False)
+        except Exception as e:
+            logger.error(f"Failed to record result of job '{job.name}': {e}")
+
+    def status(self) -> list[ScheduledJob]:
+        """ジョブの実行状態一覧"""
+        with get_db() as db:
+            return db.query(ScheduledJob).order_by(ScheduledJob.job_name).all()
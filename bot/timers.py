@@ -0,0 +1,140 @@
+"""作業タイマーのプロセス内レジストリ
+
+計測中のタイマーをメモリに持ち、「計測中か」「最後にいつ操作したか」を
+DBを引かずに判定する。DB（active_timers）への書き込みは開始・停止の1回ずつと、
+最終操作時刻の TOUCH_PERSIST_INTERVAL ごとの更新だけ。
+
+- 起動後の最初のアクセスで active_timers を読み込む（再起動しても計測は続く）
+- ユーザーのメッセージごとに touch() で最終操作時刻を更新する
+- 最終操作から TIMER_IDLE_MINUTES を過ぎたタイマーは stop_idle() で
+  最終操作時刻までを記録して停止する（無操作の時間は記録しない）
+
+    from timers import timers
+
+    stopped, state = timers.start(user_id, task_id)
+"""
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+from crm_schedule.timers import TimerState, StoppedTimer, start_timer, stop_timer, touch_timer, load_timers
+
+from config import TIMER_IDLE_MINUTES
+from database import get_db
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# 最終操作時刻をDBに書く間隔（メモリ上は毎回更新）
+TOUCH_PERSIST_INTERVAL = timedelta(minutes=10)
+
+
+class TimerRegistry:
+    """計測中のタイマー（ユーザーID → TimerState）"""
+
+    def __init__(self, idle_after: timedelta = timedelta(minutes=TIMER_IDLE_MINUTES)):
+        self.idle_after = idle_after
+        self._timers: dict[str, TimerState] = {}
+        self._persisted_at: dict[str, datetime] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            with get_db() as db:
+                states = load_timers(db)
+            for state in states:
+                self._timers[state.user_id] = state
+                self._persisted_at[state.user_id] = state.last_active_at
+            self._loaded = True
+            metrics.gauge("timers.active", len(self._timers))
+
+    def get(self, user_id: str) -> Optional[TimerState]:
+        """計測中のタイマー"""
+        self._ensure_loaded()
+        return self._timers.get(user_id)
+
+    def start(self, user_id: str, task_id: int) -> tuple[Optional[StoppedTimer], Optional[TimerState]]:
+        """タイマーを開始（計測中のタイマーは停止して記録）。(停止したタイマー, 開始したタイマー) を返す
+
+        タスクがなければ開始したタイマーは None（計測中のタイマーもそのまま）。
+        """
+        self._ensure_loaded()
+        now = datetime.now()
+        with get_db() as db:
+            stopped = stop_timer(db, user_id, now) if user_id in self._timers else None
+            state = start_timer(db, user_id, task_id, now)
+            if state is None:
+                db.rollback()
+                return None, None
+
+        with self._lock:
+            self._timers[user_id] = state
+            self._persisted_at[user_id] = now
+            metrics.gauge("timers.active", len(self._timers))
+        metrics.incr("timers.started")
+        return stopped, state
+
+    def stop(self, user_id: str, until: Optional[datetime] = None, description: str = "") -> Optional[StoppedTimer]:
+        """タイマーを停止して工数を記録（計測中でなければNone）"""
+        self._ensure_loaded()
+        with get_db() as db:
+            stopped = stop_timer(db, user_id, until, description)
+
+        with self._lock:
+            self._timers.pop(user_id, None)
+            self._persisted_at.pop(user_id, None)
+            metrics.gauge("timers.active", len(self._timers))
+        if stopped is not None:
+            metrics.incr("timers.stopped")
+        return stopped
+
+    def touch(self, user_id: Optional[str], now: Optional[datetime] = None) -> None:
+        """ユーザーの操作を記録（計測中でなければ何もしない）"""
+        if not user_id:
+            return
+        self._ensure_loaded()
+        now = now or datetime.now()
+        with self._lock:
+            state = self._timers.get(user_id)
+            if state is None:
+                return
+            self._timers[user_id] = TimerState(
+                state.user_id, state.task_id, state.project_id, state.started_at, now
+            )
+            if now - self._persisted_at.get(user_id, state.started_at) < TOUCH_PERSIST_INTERVAL:
+                return
+            self._persisted_at[user_id] = now
+
+        with get_db() as db:
+            touch_timer(db, user_id, now)
+
+    def stop_idle(self, now: Optional[datetime] = None) -> list[tuple[str, StoppedTimer]]:
+        """無操作のまま idle_after を過ぎたタイマーを最終操作時刻までで停止"""
+        self._ensure_loaded()
+        now = now or datetime.now()
+        with self._lock:
+            idle = [
+                state for state in self._timers.values()
+                if now - state.last_active_at >= self.idle_after
+            ]
+
+        stopped = []
+        for state in idle:
+            try:
+                result = self.stop(state.user_id, until=state.last_active_at, description="タイマー（自動停止）")
+            except Exception:
+                logger.exception(f"Failed to stop idle timer for {state.user_id}")
+                continue
+            if result is not None:
+                metrics.incr("timers.idle_stopped")
+                stopped.append((state.user_id, result))
+        return stopped
+
+
+timers = TimerRegistry()
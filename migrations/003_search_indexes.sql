@@ -0,0 +1,14 @@
+-- Migration: 003_search_indexes
+-- Purpose: 案件・クライアント選択肢（external_select）の検索用インデックス
+-- migrate:no-transaction
+-- 稼働中のテーブルへの書き込みを止めないよう CONCURRENTLY で作成する（文ごとに autocommit で実行）
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- 部分一致（ILIKE '%keyword%'）: 3文字以上のクエリ
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_projects_name_trgm ON projects USING gin (project_name gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_clients_name_trgm ON clients USING gin (company_name gin_trgm_ops);
+
+-- 前方一致（lower(...) LIKE 'keyword%'）: 1〜2文字のクエリ
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_projects_name_prefix ON projects (lower(project_name) text_pattern_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_clients_name_prefix ON clients (lower(company_name) text_pattern_ops);
@@ -0,0 +1,95 @@
+-- Migration: 004_client_normalized_name
+-- Purpose: クライアント名の正規化（表記ゆれの名寄せ）とあいまい検索
+
+ALTER TABLE clients ADD COLUMN IF NOT EXISTS normalized_name VARCHAR(255);
+
+-- 既存データのバックフィル（models.normalize_company_name と同じ規則）
+-- 同じ正規化名になる既存の重複クライアントは1件に名寄せする:
+-- 残すのは同じ正規化名をすでに持つクライアント、なければ最小ID。
+-- 案件の client_id を残すクライアントに付け替え、残すクライアントの空欄を重複側の値（ID順で最初のもの）で埋め、
+-- 備考は連結してから重複側を削除する
+CREATE TEMP TABLE client_merge ON COMMIT DROP AS
+WITH stripped AS (
+    SELECT
+        client_id,
+        regexp_replace(lower(normalize(company_name, NFKC)), '\s+', '', 'g') AS fallback,
+        regexp_replace(
+            regexp_replace(
+                regexp_replace(
+                    lower(normalize(company_name, NFKC)),
+                    '株式会社|有限会社|合同会社|合資会社|合名会社|一般社団法人|一般財団法人|\((?:株|有|同)\)', '', 'g'
+                ),
+                '(?:[\s,]+|(?<=[^a-z0-9]))(?:co\.?,?\s*ltd\.?|inc\.?|corp\.?|corporation|llc|ltd\.?)$', ''
+            ),
+            '\s+', '', 'g'
+        ) AS name
+    FROM clients
+    WHERE normalized_name IS NULL
+),
+named AS (
+    SELECT client_id, COALESCE(NULLIF(name, ''), fallback) AS name
+    FROM stripped
+)
+SELECT
+    n.client_id,
+    n.name,
+    COALESCE(
+        (SELECT e.client_id FROM clients e WHERE e.normalized_name = n.name),
+        MIN(n.client_id) OVER (PARTITION BY n.name)
+    ) AS survivor_id
+FROM named n;
+
+UPDATE projects p
+SET client_id = m.survivor_id
+FROM client_merge m
+WHERE p.client_id = m.client_id
+  AND m.client_id <> m.survivor_id;
+
+UPDATE clients c
+SET industry_id = COALESCE(c.industry_id, d.industry_id),
+    company_size = COALESCE(c.company_size, d.company_size),
+    contact_person = COALESCE(c.contact_person, d.contact_person),
+    contact_email = COALESCE(c.contact_email, d.contact_email),
+    payment_due_day = COALESCE(c.payment_due_day, d.payment_due_day),
+    payment_terms = COALESCE(c.payment_terms, d.payment_terms),
+    notes = NULLIF(concat_ws(E'\n', c.notes, d.notes), ''),
+    updated_at = CURRENT_TIMESTAMP
+FROM (
+    SELECT
+        m.survivor_id,
+        (array_agg(x.industry_id ORDER BY x.client_id) FILTER (WHERE x.industry_id IS NOT NULL))[1] AS industry_id,
+        (array_agg(x.company_size ORDER BY x.client_id) FILTER (WHERE x.company_size IS NOT NULL))[1] AS company_size,
+        (array_agg(x.contact_person ORDER BY x.client_id) FILTER (WHERE x.contact_person IS NOT NULL))[1] AS contact_person,
+        (array_agg(x.contact_email ORDER BY x.client_id) FILTER (WHERE x.contact_email IS NOT NULL))[1] AS contact_email,
+        (array_agg(x.payment_due_day ORDER BY x.client_id) FILTER (WHERE x.payment_due_day IS NOT NULL))[1] AS payment_due_day,
+        (array_agg(x.payment_terms ORDER BY x.client_id) FILTER (WHERE x.payment_terms IS NOT NULL))[1] AS payment_terms,
+        string_agg(x.notes, E'\n' ORDER BY x.client_id) AS notes
+    FROM client_merge m
+    JOIN clients x ON x.client_id = m.client_id
+    WHERE m.client_id <> m.survivor_id
+    GROUP BY m.survivor_id
+) d
+WHERE c.client_id = d.survivor_id;
+
+DELETE FROM clients c
+USING client_merge m
+WHERE c.client_id = m.client_id
+  AND m.client_id <> m.survivor_id;
+
+UPDATE clients c
+SET normalized_name = m.name
+FROM client_merge m
+WHERE c.client_id = m.client_id
+  AND m.client_id = m.survivor_id
+  AND c.normalized_name IS NULL;
+
+-- 完全一致（O(log n)）
+CREATE UNIQUE INDEX IF NOT EXISTS idx_clients_normalized_name ON clients (normalized_name);
+-- 前方一致
+CREATE INDEX IF NOT EXISTS idx_clients_normalized_name_prefix ON clients (normalized_name text_pattern_ops);
+-- あいまい一致（similarity / % 演算子）
+CREATE INDEX IF NOT EXISTS idx_clients_normalized_name_trgm ON clients USING gin (normalized_name gin_trgm_ops);
+
+-- 003の会社名インデックスは正規化名のインデックスに置き換え
+DROP INDEX IF EXISTS idx_clients_name_trgm;
+DROP INDEX IF EXISTS idx_clients_name_prefix;
@@ -0,0 +1,30 @@
+-- Migration: 005_keyset_pagination
+-- Purpose: タスク・見積明細・案件一覧のキーセットページング用カバリングインデックス
+-- 式は bot/handlers のソートキー（COALESCE(...)）と完全に一致させること
+-- migrate:no-transaction
+-- 稼働中のテーブルへの書き込みを止めないよう CONCURRENTLY で作成する（文ごとに autocommit で実行）
+
+-- タスク一覧: (sort_order, due_date, task_id)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tasks_project_keyset ON tasks (
+    project_id,
+    (COALESCE(sort_order, 0)),
+    (COALESCE(due_date, '9999-12-31')),
+    task_id
+) INCLUDE (task_name, status, assigned_to, estimated_hours, actual_hours, due_date);
+
+-- 見積明細: (sort_order, item_id)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_estimate_items_project_keyset ON estimate_items (
+    project_id,
+    (COALESCE(sort_order, 0)),
+    item_id
+) INCLUDE (item_name, quantity, unit, unit_price);
+
+-- 案件一覧: 新しい順 (created_at, project_id)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_projects_created_keyset ON projects (
+    created_at DESC,
+    project_id DESC
+) INCLUDE (project_name, client_id, status_id);
+
+-- project_id 単独のインデックスは上記の先頭列で代替できる
+DROP INDEX CONCURRENTLY IF EXISTS idx_tasks_project;
+DROP INDEX CONCURRENTLY IF EXISTS idx_estimate_items_project;
@@ -0,0 +1,12 @@
+-- Migration: 006_submission_keys
+-- Purpose: モーダル送信の冪等キー（Slackの再送・二重クリックによる重複登録の防止）
+
+CREATE TABLE IF NOT EXISTS submission_keys (
+    submission_key VARCHAR(64) PRIMARY KEY,  -- SHA-256(view_id + 入力値)
+    callback_id VARCHAR(100) NOT NULL,
+    user_id VARCHAR(50),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 古いキーの削除用
+CREATE INDEX IF NOT EXISTS idx_submission_keys_created_at ON submission_keys (created_at);
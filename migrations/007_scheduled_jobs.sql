@@ -0,0 +1,18 @@
+-- Migration: 007_scheduled_jobs
+-- Purpose: ボット内スケジューラーの定期ジョブ（cron形式）と実行状態
+
+CREATE TABLE IF NOT EXISTS scheduled_jobs (
+    job_name VARCHAR(100) PRIMARY KEY,
+    cron VARCHAR(100) NOT NULL,         -- 分 時 日 月 曜日
+    enabled BOOLEAN DEFAULT TRUE,
+    next_run_at TIMESTAMP,
+    last_run_at TIMESTAMP,
+    last_status VARCHAR(20),            -- success, failed
+    last_error TEXT,
+    last_duration NUMERIC(10, 3),       -- 秒
+    running_since TIMESTAMP,            -- 実行中のロック（NULLなら待機中）
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 実行予定の取得
+CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_next_run ON scheduled_jobs (next_run_at) WHERE enabled;
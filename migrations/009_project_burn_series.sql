@@ -0,0 +1,10 @@
+-- Migration: 009_project_burn_series
+-- Purpose: 案件ごとのバーンダウン・バーンアップ系列（日次配列を事前計算して保持）
+
+CREATE TABLE IF NOT EXISTS project_burn_series (
+    project_id INTEGER PRIMARY KEY REFERENCES projects(project_id) ON DELETE CASCADE,
+    start_date DATE NOT NULL,
+    done_hours BYTEA NOT NULL,   -- float32配列: 日ごとの実績工数
+    scope_hours BYTEA NOT NULL,  -- float32配列: 日ごとに追加された見積工数
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
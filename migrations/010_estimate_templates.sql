@@ -0,0 +1,47 @@
+-- Migration: 010_estimate_templates
+-- Purpose: 見積テンプレート（明細のひな形を案件に一括適用）
+
+CREATE TABLE IF NOT EXISTS estimate_templates (
+    template_id SERIAL PRIMARY KEY,
+    template_name VARCHAR(100) UNIQUE NOT NULL,
+    description TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS estimate_template_items (
+    item_id SERIAL PRIMARY KEY,
+    template_id INTEGER NOT NULL REFERENCES estimate_templates(template_id) ON DELETE CASCADE,
+    item_name VARCHAR(255) NOT NULL,
+    description TEXT,
+    quantity DECIMAL(10, 2) DEFAULT 1,
+    unit VARCHAR(50) DEFAULT '式',
+    unit_price DECIMAL(12, 2) NOT NULL,
+    sort_order INTEGER DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_estimate_template_items_template ON estimate_template_items (template_id, sort_order);
+
+-- 初期テンプレート
+INSERT INTO estimate_templates (template_name, description) VALUES
+    ('LP制作', 'ランディングページ1枚の制作'),
+    ('API開発', 'REST APIの設計・実装・テスト')
+ON CONFLICT (template_name) DO NOTHING;
+
+INSERT INTO estimate_template_items (template_id, item_name, quantity, unit, unit_price, sort_order)
+SELECT t.template_id, v.item_name, v.quantity, v.unit, v.unit_price, v.sort_order
+FROM estimate_templates t
+JOIN (VALUES
+    ('LP制作', '要件定義・構成案', 1, '式', 30000, 1),
+    ('LP制作', 'デザイン', 1, '式', 80000, 2),
+    ('LP制作', 'コーディング（レスポンシブ対応）', 1, '式', 100000, 3),
+    ('LP制作', 'フォーム実装', 1, '式', 30000, 4),
+    ('LP制作', 'テスト・公開作業', 1, '式', 20000, 5),
+    ('API開発', '要件定義・API設計', 3, '人日', 50000, 1),
+    ('API開発', '実装', 10, '人日', 50000, 2),
+    ('API開発', 'テスト', 3, '人日', 50000, 3),
+    ('API開発', 'ドキュメント作成', 1, '人日', 50000, 4)
+) AS v (template_name, item_name, quantity, unit, unit_price, sort_order)
+    ON v.template_name = t.template_name
+WHERE NOT EXISTS (
+    SELECT 1 FROM estimate_template_items i WHERE i.template_id = t.template_id
+);
@@ -0,0 +1,14 @@
+-- Migration: 012_deadline_partial_indexes
+-- Purpose: 期限チェック（crm_schedule.deadlines）用の部分インデックス
+-- 未完了の行だけを索引するため、完了済みの履歴が増えてもインデックスと走査量は増えない
+-- WHERE 句は deadlines.py の MILESTONE_OPEN / TASK_OPEN と一致させること
+-- migrate:no-transaction
+-- 稼働中のテーブルへの書き込みを止めないよう CONCURRENTLY で作成する（文ごとに autocommit で実行）
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_milestones_open_due ON milestones (due_date)
+    INCLUDE (project_id, status)
+    WHERE status <> 'completed';
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tasks_open_due ON tasks (due_date)
+    INCLUDE (project_id, status, assigned_to)
+    WHERE status <> 'done';
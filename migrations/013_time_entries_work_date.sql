@@ -0,0 +1,10 @@
+-- Migration: 013_time_entries_work_date
+-- Purpose: 工数集計（crm_schedule.timesheet）用のカバリングインデックス
+-- 期間（work_date）での絞り込みと案件・タスク別の合計を index-only scan で行う
+-- migrate:no-transaction
+-- 稼働中のテーブルへの書き込みを止めないよう CONCURRENTLY で作成する（文ごとに autocommit で実行）
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_time_entries_work_date ON time_entries (work_date, project_id)
+    INCLUDE (hours, task_id);
+
+ANALYZE time_entries;
@@ -0,0 +1,10 @@
+-- Migration: 014_active_timers
+-- Purpose: 開始・停止コマンドの計測中タイマー（ユーザーごとに1行、停止時に time_entries へ記録して削除）
+
+CREATE TABLE IF NOT EXISTS active_timers (
+    user_id VARCHAR(50) PRIMARY KEY,
+    task_id INTEGER NOT NULL REFERENCES tasks(task_id) ON DELETE CASCADE,
+    project_id INTEGER NOT NULL REFERENCES projects(project_id) ON DELETE CASCADE,
+    started_at TIMESTAMP NOT NULL,
+    last_active_at TIMESTAMP NOT NULL  -- 無操作による自動停止の判定用
+);
@@ -0,0 +1,77 @@
+-- Migration: 015_time_entries_partitioning
+-- Purpose: time_entries を work_date の月単位レンジパーティションに変換し、
+-- 保持期間を過ぎた月を圧縮する日次ロールアップ（time_entry_daily_rollups）を追加する
+-- 今月以降のパーティションは Bot の time_entry_maintenance ジョブ（crm_schedule.time_partitions）が先行して作成する
+
+-- 日 × 案件 × タスクの工数合計（圧縮後は工数記録ごとの説明・記録時刻は残らない）
+CREATE TABLE IF NOT EXISTS time_entry_daily_rollups (
+    rollup_id SERIAL PRIMARY KEY,
+    work_date DATE NOT NULL,
+    project_id INTEGER REFERENCES projects(project_id) ON DELETE CASCADE,
+    task_id INTEGER REFERENCES tasks(task_id) ON DELETE CASCADE,
+    hours DECIMAL(12,2) NOT NULL,
+    entry_count INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_time_entry_daily_rollups_work_date ON time_entry_daily_rollups (work_date, project_id)
+    INCLUDE (hours, task_id);
+CREATE INDEX IF NOT EXISTS idx_time_entry_daily_rollups_project ON time_entry_daily_rollups (project_id, work_date)
+    INCLUDE (hours);
+CREATE INDEX IF NOT EXISTS idx_time_entry_daily_rollups_task ON time_entry_daily_rollups (task_id);
+
+-- 既存の行を含む月から3か月先までのパーティションを作って移し替える
+-- 範囲外の日付（未来日付の入力など）は既定パーティションに入る
+DO $$
+DECLARE
+    first_month DATE;
+    last_month DATE := date_trunc('month', CURRENT_DATE + INTERVAL '3 months')::date;
+    month DATE;
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'time_entries'::regclass) THEN
+        RETURN;
+    END IF;
+
+    ALTER TABLE time_entries RENAME TO time_entries_unpartitioned;
+    ALTER INDEX time_entries_pkey RENAME TO time_entries_unpartitioned_pkey;
+    ALTER SEQUENCE time_entries_entry_id_seq OWNED BY NONE;
+
+    -- パーティションキーを主キーに含める必要がある（entry_id はシーケンスで一意）
+    CREATE TABLE time_entries (
+        entry_id INTEGER NOT NULL DEFAULT nextval('time_entries_entry_id_seq'),
+        task_id INTEGER REFERENCES tasks(task_id) ON DELETE CASCADE,
+        project_id INTEGER REFERENCES projects(project_id) ON DELETE CASCADE,
+        hours DECIMAL(10,2) NOT NULL,
+        description TEXT,
+        work_date DATE NOT NULL DEFAULT CURRENT_DATE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (entry_id, work_date)
+    ) PARTITION BY RANGE (work_date);
+
+    SELECT LEAST(date_trunc('month', MIN(work_date))::date, date_trunc('month', CURRENT_DATE)::date)
+        INTO first_month FROM time_entries_unpartitioned;
+    month := COALESCE(first_month, date_trunc('month', CURRENT_DATE)::date);
+    WHILE month <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF time_entries FOR VALUES FROM (%L) TO (%L)',
+            'time_entries_y' || to_char(month, 'YYYY') || 'm' || to_char(month, 'MM'),
+            month,
+            (month + INTERVAL '1 month')::date
+        );
+        month := (month + INTERVAL '1 month')::date;
+    END LOOP;
+    CREATE TABLE time_entries_default PARTITION OF time_entries DEFAULT;
+
+    INSERT INTO time_entries SELECT entry_id, task_id, project_id, hours, description, work_date, created_at
+        FROM time_entries_unpartitioned;
+    DROP TABLE time_entries_unpartitioned;
+    ALTER SEQUENCE time_entries_entry_id_seq OWNED BY time_entries.entry_id;
+END
+$$;
+
+-- 親テーブルに作成したインデックスは既存・今後のパーティションにも作成される
+CREATE INDEX IF NOT EXISTS idx_time_entries_task ON time_entries (task_id);
+CREATE INDEX IF NOT EXISTS idx_time_entries_project ON time_entries (project_id);
+CREATE INDEX IF NOT EXISTS idx_time_entries_work_date ON time_entries (work_date, project_id)
+    INCLUDE (hours, task_id);
+
+ANALYZE time_entries;
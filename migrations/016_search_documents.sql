@@ -0,0 +1,19 @@
+-- Migration: 016_search_documents
+-- Purpose: 案件の要件・メモ、タスク・見積明細の説明の全文検索（検索コマンド・ダッシュボード）
+-- tokens は正規化した文字バイグラムの tsvector（crm_core.search が行の追加・更新時に作成）
+-- 適用後に既存データを登録すること: python -m crm_core.search --rebuild
+
+CREATE TABLE IF NOT EXISTS search_documents (
+    document_id SERIAL PRIMARY KEY,
+    doc_type VARCHAR(20) NOT NULL,  -- project, task, estimate_item
+    doc_id INTEGER NOT NULL,
+    project_id INTEGER REFERENCES projects(project_id) ON DELETE CASCADE,
+    title TEXT NOT NULL,
+    content TEXT,
+    tokens TSVECTOR NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (doc_type, doc_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_search_documents_tokens ON search_documents USING gin (tokens);
+CREATE INDEX IF NOT EXISTS idx_search_documents_project ON search_documents (project_id);
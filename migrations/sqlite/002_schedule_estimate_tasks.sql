@@ -0,0 +1,89 @@
+-- Migration: 002_schedule_estimate_tasks (SQLite)
+-- Purpose: 工期管理、見積もり、作業工程機能
+-- SQLite は ADD COLUMN がないため、このファイルは新規DBにのみ適用すること
+
+-- 見積明細テーブル
+CREATE TABLE IF NOT EXISTS estimate_items (
+    item_id INTEGER PRIMARY KEY,
+    project_id INTEGER REFERENCES projects(project_id) ON DELETE CASCADE,
+    item_name VARCHAR(255) NOT NULL,
+    description TEXT,
+    quantity DECIMAL(10,2) DEFAULT 1,
+    unit VARCHAR(50) DEFAULT '式',
+    unit_price DECIMAL(12,2) NOT NULL,
+    amount DECIMAL(12,2) GENERATED ALWAYS AS (ROUND(quantity * unit_price, 2)) STORED,  -- models.EstimateItem.amount と同じ式
+    sort_order INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- マイルストーンテーブル（工期管理）
+CREATE TABLE IF NOT EXISTS milestones (
+    milestone_id INTEGER PRIMARY KEY,
+    project_id INTEGER REFERENCES projects(project_id) ON DELETE CASCADE,
+    milestone_name VARCHAR(255) NOT NULL,
+    description TEXT,
+    due_date DATE NOT NULL,
+    completed_date DATE,
+    status VARCHAR(50) DEFAULT 'pending',  -- pending, in_progress, completed, delayed
+    sort_order INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 作業工程テーブル
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id INTEGER PRIMARY KEY,
+    project_id INTEGER REFERENCES projects(project_id) ON DELETE CASCADE,
+    milestone_id INTEGER REFERENCES milestones(milestone_id) ON DELETE SET NULL,
+    task_name VARCHAR(255) NOT NULL,
+    description TEXT,
+    assigned_to VARCHAR(100),
+    estimated_hours DECIMAL(10,2),
+    actual_hours DECIMAL(10,2),
+    start_date DATE,
+    due_date DATE,
+    completed_date DATE,
+    status VARCHAR(50) DEFAULT 'todo',  -- todo, in_progress, review, done
+    priority INTEGER DEFAULT 5,  -- 1-10
+    redmine_issue_id INTEGER,
+    sort_order INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 工数記録テーブル
+CREATE TABLE IF NOT EXISTS time_entries (
+    entry_id INTEGER PRIMARY KEY,
+    task_id INTEGER REFERENCES tasks(task_id) ON DELETE CASCADE,
+    project_id INTEGER REFERENCES projects(project_id) ON DELETE CASCADE,
+    hours DECIMAL(10,2) NOT NULL,
+    description TEXT,
+    work_date DATE NOT NULL DEFAULT CURRENT_DATE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- RedMine設定テーブル
+CREATE TABLE IF NOT EXISTS redmine_config (
+    config_id INTEGER PRIMARY KEY,
+    project_id INTEGER REFERENCES projects(project_id) ON DELETE CASCADE UNIQUE,
+    redmine_url VARCHAR(500) NOT NULL,
+    redmine_project_id VARCHAR(100) NOT NULL,
+    api_key VARCHAR(255),
+    sync_enabled BOOLEAN DEFAULT TRUE,
+    last_sync_at TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- projectsテーブルに工期関連カラム追加
+ALTER TABLE projects ADD COLUMN start_date DATE;
+ALTER TABLE projects ADD COLUMN actual_end_date DATE;
+ALTER TABLE projects ADD COLUMN actual_hours DECIMAL(10,2);
+ALTER TABLE projects ADD COLUMN final_amount DECIMAL(12,2);
+
+-- インデックス
+CREATE INDEX IF NOT EXISTS idx_estimate_items_project ON estimate_items(project_id);
+CREATE INDEX IF NOT EXISTS idx_milestones_project ON milestones(project_id);
+CREATE INDEX IF NOT EXISTS idx_tasks_project ON tasks(project_id);
+CREATE INDEX IF NOT EXISTS idx_tasks_milestone ON tasks(milestone_id);
+CREATE INDEX IF NOT EXISTS idx_tasks_redmine ON tasks(redmine_issue_id);
+CREATE INDEX IF NOT EXISTS idx_time_entries_task ON time_entries(task_id);
+CREATE INDEX IF NOT EXISTS idx_time_entries_project ON time_entries(project_id);
@@ -0,0 +1,3 @@
+-- Migration: 003_search_indexes (SQLite)
+-- Purpose: 案件・クライアント選択肢（external_select）の検索用インデックス
+-- pg_trgm がないため部分一致・前方一致の索引は作らない（1人分の件数なら全件走査で十分速い）
@@ -0,0 +1,9 @@
+-- Migration: 004_client_normalized_name (SQLite)
+-- Purpose: クライアント名の正規化（表記ゆれの名寄せ）
+-- 新規DBにはクライアントがないためバックフィルは不要
+-- あいまい一致（pg_trgm）の代わりに bot/database.py の find_client_candidates がアプリ側で類似度を計算する
+
+ALTER TABLE clients ADD COLUMN normalized_name VARCHAR(255);
+
+-- 完全一致（O(log n)）
+CREATE UNIQUE INDEX IF NOT EXISTS idx_clients_normalized_name ON clients (normalized_name);
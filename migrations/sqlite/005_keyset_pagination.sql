@@ -0,0 +1,29 @@
+-- Migration: 005_keyset_pagination (SQLite)
+-- Purpose: タスク・見積明細・案件一覧のキーセットページング用インデックス
+-- SQLite は INCLUDE がないため、ソートキーだけの式インデックスにする
+-- 式は bot/handlers のソートキー（COALESCE(...)）と完全に一致させること
+
+-- タスク一覧: (sort_order, due_date, task_id)
+CREATE INDEX IF NOT EXISTS idx_tasks_project_keyset ON tasks (
+    project_id,
+    (COALESCE(sort_order, 0)),
+    (COALESCE(due_date, '9999-12-31')),
+    task_id
+);
+
+-- 見積明細: (sort_order, item_id)
+CREATE INDEX IF NOT EXISTS idx_estimate_items_project_keyset ON estimate_items (
+    project_id,
+    (COALESCE(sort_order, 0)),
+    item_id
+);
+
+-- 案件一覧: 新しい順 (created_at, project_id)
+CREATE INDEX IF NOT EXISTS idx_projects_created_keyset ON projects (
+    created_at DESC,
+    project_id DESC
+);
+
+-- project_id 単独のインデックスは上記の先頭列で代替できる
+DROP INDEX IF EXISTS idx_tasks_project;
+DROP INDEX IF EXISTS idx_estimate_items_project;
@@ -0,0 +1,17 @@
+-- Migration: 008_task_dependencies (SQLite)
+-- Purpose: タスクの依存関係（クリティカルパス計算用）
+-- INCLUDE の代わりに列をキーに含めてカバリングインデックスにする
+
+CREATE TABLE IF NOT EXISTS task_dependencies (
+    task_id INTEGER REFERENCES tasks(task_id) ON DELETE CASCADE,
+    depends_on_task_id INTEGER REFERENCES tasks(task_id) ON DELETE CASCADE,
+    project_id INTEGER NOT NULL REFERENCES projects(project_id) ON DELETE CASCADE,  -- 非正規化（案件単位で一括取得）
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (task_id, depends_on_task_id),
+    CHECK (task_id <> depends_on_task_id)
+);
+
+-- 案件のタスクグラフを1クエリで取得
+CREATE INDEX IF NOT EXISTS idx_task_dependencies_project ON task_dependencies (project_id, task_id, depends_on_task_id);
+-- 先行タスク削除時のカスケード
+CREATE INDEX IF NOT EXISTS idx_task_dependencies_depends_on ON task_dependencies (depends_on_task_id);
@@ -0,0 +1,19 @@
+-- Migration: 011_estimate_versions (SQLite)
+-- Purpose: 見積の版管理（前の版からの差分を1版1行で保存）
+
+CREATE TABLE IF NOT EXISTS estimate_versions (
+    version_id INTEGER PRIMARY KEY,
+    project_id INTEGER NOT NULL REFERENCES projects(project_id) ON DELETE CASCADE,
+    version_no INTEGER NOT NULL,
+    is_snapshot BOOLEAN DEFAULT FALSE,  -- TRUEなら全明細を保持（復元の起点）
+    changes TEXT NOT NULL,              -- JSON: {"a": 追加, "c": [[旧, 新]], "r": 削除}
+    total_amount DECIMAL(12, 2),
+    item_count INTEGER DEFAULT 0,
+    added_count INTEGER DEFAULT 0,
+    changed_count INTEGER DEFAULT 0,
+    removed_count INTEGER DEFAULT 0,
+    note TEXT,
+    created_by VARCHAR(50),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (project_id, version_no)
+);
@@ -0,0 +1,10 @@
+-- Migration: 012_deadline_partial_indexes (SQLite)
+-- Purpose: 期限チェック（crm_schedule.deadlines）用の部分インデックス
+-- INCLUDE の代わりに列をキーに含めてカバリングインデックスにする
+-- WHERE 句は deadlines.py の MILESTONE_OPEN / TASK_OPEN と一致させること
+
+CREATE INDEX IF NOT EXISTS idx_milestones_open_due ON milestones (due_date, project_id, status)
+    WHERE status <> 'completed';
+
+CREATE INDEX IF NOT EXISTS idx_tasks_open_due ON tasks (due_date, project_id, status, assigned_to)
+    WHERE status <> 'done';
@@ -0,0 +1,7 @@
+-- Migration: 013_time_entries_work_date (SQLite)
+-- Purpose: 工数集計（crm_schedule.timesheet）用のカバリングインデックス
+-- INCLUDE の代わりに列をキーに含めてカバリングインデックスにする
+
+CREATE INDEX IF NOT EXISTS idx_time_entries_work_date ON time_entries (work_date, project_id, hours, task_id);
+
+ANALYZE time_entries;
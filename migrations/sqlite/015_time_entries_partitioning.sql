@@ -0,0 +1,16 @@
+-- Migration: 015_time_entries_partitioning (SQLite)
+-- Purpose: 保持期間を過ぎた工数記録を圧縮する日次ロールアップ（time_entry_daily_rollups）を追加する
+-- SQLite にはパーティションがないため time_entries はそのまま（圧縮は古い行の DELETE で行う）
+
+CREATE TABLE IF NOT EXISTS time_entry_daily_rollups (
+    rollup_id INTEGER PRIMARY KEY,
+    work_date DATE NOT NULL,
+    project_id INTEGER REFERENCES projects(project_id) ON DELETE CASCADE,
+    task_id INTEGER REFERENCES tasks(task_id) ON DELETE CASCADE,
+    hours DECIMAL(12,2) NOT NULL,
+    entry_count INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_time_entry_daily_rollups_work_date ON time_entry_daily_rollups (work_date, project_id, hours, task_id);
+CREATE INDEX IF NOT EXISTS idx_time_entry_daily_rollups_project ON time_entry_daily_rollups (project_id, work_date, hours);
+CREATE INDEX IF NOT EXISTS idx_time_entry_daily_rollups_task ON time_entry_daily_rollups (task_id);
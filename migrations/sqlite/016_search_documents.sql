@@ -0,0 +1,18 @@
+-- Migration: 016_search_documents (SQLite)
+-- Purpose: 案件の要件・メモ、タスク・見積明細の説明の全文検索（検索コマンド・ダッシュボード）
+-- tsvector がないため tokens には正規化した名前・本文を入れ、部分一致で検索する（1人分の件数なら全件走査で十分速い）
+-- 適用後に既存データを登録すること: python -m crm_core.search --rebuild
+
+CREATE TABLE IF NOT EXISTS search_documents (
+    document_id INTEGER PRIMARY KEY,
+    doc_type VARCHAR(20) NOT NULL,  -- project, task, estimate_item
+    doc_id INTEGER NOT NULL,
+    project_id INTEGER REFERENCES projects(project_id) ON DELETE CASCADE,
+    title TEXT NOT NULL,
+    content TEXT,
+    tokens TEXT NOT NULL,  -- 正規化（NFKC・小文字）した名前と本文
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (doc_type, doc_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_search_documents_project ON search_documents (project_id);
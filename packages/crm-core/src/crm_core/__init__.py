@@ -7,12 +7,43 @@ from .models import (
     Client,
     Project,
     EstimateItem,
+    EstimateTemplate,
+    EstimateTemplateItem,
+    EstimateVersion,
     Milestone,
     Task,
+    TaskDependency,
     TimeEntry,
+    TimeEntryDailyRollup,
+    ActiveTimer,
+    ProjectBurnSeries,
     RedmineConfig,
+    SubmissionKey,
+    ScheduledJob,
+    SearchDocument,
+    normalize_company_name,
+)
+from .rows import (
+    ChannelRow,
+    IndustryRow,
+    StatusRow,
+    ClientRow,
+    ProjectRow,
+    MilestoneRow,
+    TaskRow,
+    EstimateItemRow,
+)
+from .database import get_db, init_database, get_engine, get_read_db, get_read_engine, check_replica
+from .query_budget import query_budget, QueryBudgetExceeded, set_query_budget_mode
+from .migrations import migrate, MigrationError, MigrationResult
+from .search import search_query, reindex_project, rebuild_search_index
+from .loading import (
+    set_strict_loading,
+    is_strict_loading,
+    hot_path,
+    query_projects_with_client,
+    get_project_with_client,
 )
-from .database import get_db, init_database, get_engine
 
 __all__ = [
     "Base",
@@ -22,11 +53,47 @@ __all__ = [
     "Client",
     "Project",
     "EstimateItem",
+    "EstimateTemplate",
+    "EstimateTemplateItem",
+    "EstimateVersion",
     "Milestone",
     "Task",
+    "TaskDependency",
     "TimeEntry",
+    "TimeEntryDailyRollup",
+    "ActiveTimer",
+    "ProjectBurnSeries",
     "RedmineConfig",
+    "SubmissionKey",
+    "ScheduledJob",
+    "SearchDocument",
+    "normalize_company_name",
+    "ChannelRow",
+    "IndustryRow",
+    "StatusRow",
+    "ClientRow",
+    "ProjectRow",
+    "MilestoneRow",
+    "TaskRow",
+    "EstimateItemRow",
     "get_db",
     "init_database",
     "get_engine",
+    "get_read_db",
+    "get_read_engine",
+    "check_replica",
+    "query_budget",
+    "QueryBudgetExceeded",
+    "set_query_budget_mode",
+    "migrate",
+    "MigrationError",
+    "MigrationResult",
+    "search_query",
+    "reindex_project",
+    "rebuild_search_index",
+    "set_strict_loading",
+    "is_strict_loading",
+    "hot_path",
+    "query_projects_with_client",
+    "get_project_with_client",
 ]
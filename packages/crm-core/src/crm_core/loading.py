@@ -0,0 +1,84 @@
+"""関連オブジェクトのロード戦略（N+1対策）
+
+一覧・レポート・ダッシュボードなど行数の多い経路（ホットパス）では、
+必要な関連を明示的に先読みするクエリヘルパーを使う。
+
+- 単一の案件: joinedload（1クエリ）
+- 案件の一覧: selectinload（案件1クエリ + クライアントIN句1クエリ）
+
+strictモード（CRM_STRICT_LOADING=true またはテストで set_strict_loading(True)）では
+ヘルパーのクエリに raiseload('*') を付け、先読みしていない関連へのアクセスを例外にする。
+通常モードでは、ホットパスで読み込んだオブジェクトの遅延ロードを警告ログに記録する。
+"""
+import logging
+import os
+
+from sqlalchemy import event
+from sqlalchemy.orm import Query, Session, joinedload, selectinload, raiseload
+
+from .models import Base, Project
+
+logger = logging.getLogger(__name__)
+
+HOT_PATH_OPTION = "crm_hot_path"
+_HOT_PATH_ATTR = "_crm_hot_path"
+
+_strict = os.environ.get("CRM_STRICT_LOADING", "False").lower() == "true"
+
+
+def set_strict_loading(enabled: bool) -> None:
+    """strictモードを切り替え（テスト用）"""
+    global _strict
+    _strict = enabled
+
+
+def is_strict_loading() -> bool:
+    """strictモードかどうか"""
+    return _strict
+
+
+def hot_path(query: Query, name: str, *options) -> Query:
+    """ホットパスのクエリにロード戦略を適用
+
+    options 以外の関連は、strictモードでは raiseload('*') で禁止し、
+    通常モードでは遅延ロード時に警告する。
+    """
+    query = query.options(*options)
+    if _strict:
+        query = query.options(raiseload("*"))
+    return query.execution_options(**{HOT_PATH_OPTION: name})
+
+
+def query_projects_with_client(db: Session, name: str = "projects") -> Query:
+    """クライアントを先読みした案件一覧クエリ（selectin）"""
+    return hot_path(db.query(Project), name, selectinload(Project.client))
+
+
+def get_project_with_client(db: Session, project_id: int, name: str = "project") -> Project | None:
+    """クライアントを結合して案件を1件取得（joined）"""
+    return hot_path(
+        db.query(Project), name, joinedload(Project.client)
+    ).filter(Project.project_id == project_id).first()
+
+
+@event.listens_for(Base, "load", propagate=True)
+def _mark_hot_path(target, context):
+    """ホットパスのクエリで読み込んだオブジェクトに印を付ける"""
+    name = context.execution_options.get(HOT_PATH_OPTION)
+    if name:
+        setattr(target, _HOT_PATH_ATTR, name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _warn_hot_path_lazy_load(orm_execute_state):
+    """ホットパスのオブジェクトから遅延ロードが発生したら警告"""
+    if not orm_execute_state.is_select:
+        return
+    state = orm_execute_state.lazy_loaded_from
+    if state is None:
+        return
+    name = getattr(state.obj(), _HOT_PATH_ATTR, None)
+    if name:
+        logger.warning(
+            f"Lazy load on hot path '{name}': {orm_execute_state.loader_strategy_path}"
+        )
@@ -0,0 +1,43 @@
+"""マイグレーションのコマンドライン
+
+crm_core/__init__ から import しないモジュールに置く（python -m で実行したとき
+crm_core.migrations が二重に読み込まれないようにするため）。
+
+    python -m crm_core.migrate_cli              # 未適用のマイグレーションを適用
+    python -m crm_core.migrate_cli --status     # 適用状況を表示
+    python -m crm_core.migrate_cli --baseline 011  # 手動で適用済みの011までを記録だけする
+"""
+import argparse
+import logging
+import sys
+from typing import Optional
+
+from .migrations import MIGRATIONS_DIR, MigrationError, baseline, format_report, migrate, status
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m crm_core.migrate_cli", description="Apply SQL migrations")
+    parser.add_argument("--dir", default=MIGRATIONS_DIR, help="migrations directory")
+    parser.add_argument("--target", help="apply up to this version")
+    parser.add_argument("--status", action="store_true", help="show applied / pending migrations")
+    parser.add_argument("--baseline", metavar="VERSION", help="record migrations up to VERSION as applied")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    try:
+        if args.status:
+            for migration, state in status(args.dir):
+                print(f"{state:<8} {migration.path.name}")
+        elif args.baseline:
+            for migration in baseline(args.baseline, args.dir):
+                print(f"baseline {migration.path.name}")
+        else:
+            print(format_report(migrate(args.dir, args.target)))
+    except MigrationError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,322 @@
+"""マイグレーションの適用
+
+migrations/NNN_名前.sql を番号順に適用し、適用済みの番号・チェックサム・所要時間を
+schema_migrations テーブルに記録する。
+
+- 通常のマイグレーションはファイル全体を1トランザクションで適用する
+- `-- migrate:no-transaction` を含むファイル、または CREATE/DROP INDEX CONCURRENTLY・
+  VACUUM を含むファイルは、文ごとに autocommit で実行する（書き込みを止めずに
+  インデックスを作成できる）。途中で失敗した場合は IF NOT EXISTS で再実行できるよう書くこと
+- 適用済みのファイルが変更されていたら（チェックサム不一致）エラーにする
+- PostgreSQL では advisory lock で同時実行を防ぐ
+- migrations/<dialect>/ に同じ番号のファイルがあれば、そのDBではそちらを適用する
+  （例: migrations/sqlite/002_*.sql は組み込みSQLite用。ないものは共通のファイルを使う）
+
+    python -m crm_core.migrate_cli              # 未適用のマイグレーションを適用
+    python -m crm_core.migrate_cli --status     # 適用状況を表示
+    python -m crm_core.migrate_cli --baseline 011  # 手動で適用済みの011までを記録だけする
+"""
+import hashlib
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import Boolean, Column, DateTime, Integer, MetaData, String, Table, insert, select, text
+
+from .database import get_engine
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.environ.get("CRM_MIGRATIONS_DIR", "migrations")
+NO_TRANSACTION_DIRECTIVE = "-- migrate:no-transaction"
+
+# 同時実行防止の advisory lock のキー（任意の固定値）
+_ADVISORY_LOCK_KEY = 7_310_043
+_FILE_PATTERN = re.compile(r"^(\d+)_([\w\-]+)\.sql$")
+_NON_TRANSACTIONAL = re.compile(r"\bINDEX\s+CONCURRENTLY\b|^\s*VACUUM\b", re.IGNORECASE | re.MULTILINE)
+
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", String(20), primary_key=True),
+    Column("name", String(255), nullable=False),
+    Column("checksum", String(64), nullable=False),
+    Column("transactional", Boolean, nullable=False),
+    Column("duration_ms", Integer, nullable=False),
+    Column("applied_at", DateTime, nullable=False, default=datetime.utcnow),
+)
+
+
+class MigrationError(RuntimeError):
+    """マイグレーションを適用できない"""
+
+
+@dataclass(frozen=True)
+class Migration:
+    """マイグレーションファイル"""
+    version: str
+    name: str
+    path: Path
+    sql: str
+    checksum: str
+
+    @property
+    def transactional(self) -> bool:
+        return NO_TRANSACTION_DIRECTIVE not in self.sql and not _NON_TRANSACTIONAL.search(
+            _strip_comments(self.sql)
+        )
+
+
+@dataclass(frozen=True)
+class MigrationResult:
+    """適用結果"""
+    version: str
+    name: str
+    transactional: bool
+    seconds: float
+    statements: int
+
+
+def discover(directory: str = MIGRATIONS_DIR, dialect: Optional[str] = None) -> list[Migration]:
+    """マイグレーションファイルを番号順に取得（dialect 用のファイルがあればそちらを使う）"""
+    overrides = {}
+    if dialect:
+        for path in Path(directory, dialect).glob("*.sql"):
+            match = _FILE_PATTERN.match(path.name)
+            if match:
+                overrides[match.group(1)] = path
+
+    migrations = []
+    for path in sorted(Path(directory).glob("*.sql")):
+        match = _FILE_PATTERN.match(path.name)
+        if not match:
+            continue
+        path = overrides.get(match.group(1), path)
+        sql = path.read_text(encoding="utf-8")
+        migrations.append(Migration(
+            version=match.group(1),
+            name=match.group(2),
+            path=path,
+            sql=sql,
+            checksum=hashlib.sha256(sql.encode("utf-8")).hexdigest(),
+        ))
+    versions = [m.version for m in migrations]
+    duplicates = sorted({v for v in versions if versions.count(v) > 1})
+    if duplicates:
+        raise MigrationError(f"Duplicate migration versions: {duplicates}")
+    return migrations
+
+
+def split_statements(sql: str) -> list[str]:
+    """SQLを文ごとに分割（文字列・引用符付き識別子・$$本体・コメント内の ; は区切りにしない）"""
+    statements = []
+    current = []
+    i = 0
+    length = len(sql)
+    while i < length:
+        ch = sql[i]
+        if sql.startswith("--", i):
+            end = sql.find("\n", i)
+            end = length if end == -1 else end
+            current.append(sql[i:end])
+            i = end
+        elif sql.startswith("/*", i):
+            end = sql.find("*/", i + 2)
+            end = length if end == -1 else end + 2
+            current.append(sql[i:end])
+            i = end
+        elif ch in ("'", '"'):
+            end = i + 1
+            while end < length:
+                if sql[end] == ch:
+                    if end + 1 < length and sql[end + 1] == ch:  # '' / "" のエスケープ
+                        end += 2
+                        continue
+                    break
+                end += 1
+            current.append(sql[i:end + 1])
+            i = end + 1
+        elif ch == "$":
+            tag = re.match(r"\$[A-Za-z_]*\$", sql[i:])
+            if tag:
+                end = sql.find(tag.group(0), i + len(tag.group(0)))
+                end = length if end == -1 else end + len(tag.group(0))
+                current.append(sql[i:end])
+                i = end
+            else:
+                current.append(ch)
+                i += 1
+        elif ch == ";":
+            statements.append("".join(current))
+            current = []
+            i += 1
+        else:
+            current.append(ch)
+            i += 1
+    statements.append("".join(current))
+    return [s.strip() for s in statements if _strip_comments(s).strip()]
+
+
+def _strip_comments(sql: str) -> str:
+    return re.sub(r"--[^\n]*", "", sql)
+
+
+# ======================
+# 適用
+# ======================
+def _ensure_table(engine) -> None:
+    _metadata.create_all(engine, tables=[schema_migrations])
+
+
+def applied_migrations(engine=None) -> dict[str, dict]:
+    """適用済みのマイグレーション {version: 行}"""
+    engine = engine or get_engine()
+    _ensure_table(engine)
+    with engine.connect() as conn:
+        return {row.version: row._asdict() for row in conn.execute(select(schema_migrations))}
+
+
+def _check_checksums(migrations: list[Migration], applied: dict[str, dict]) -> None:
+    changed = [
+        f"{m.version}_{m.name}" for m in migrations
+        if m.version in applied and applied[m.version]["checksum"] != m.checksum
+    ]
+    if changed:
+        raise MigrationError(
+            f"Applied migrations have been modified: {changed}. "
+            "Add a new migration instead of editing an applied one."
+        )
+
+
+def _record(conn, migration: Migration, seconds: float) -> None:
+    conn.execute(insert(schema_migrations).values(
+        version=migration.version,
+        name=migration.name,
+        checksum=migration.checksum,
+        transactional=migration.transactional,
+        duration_ms=int(seconds * 1000),
+        applied_at=datetime.utcnow(),
+    ))
+
+
+def _invalid_indexes(conn) -> list[str]:
+    """CREATE INDEX CONCURRENTLY の失敗で残った無効なインデックス（PostgreSQLのみ）"""
+    rows = conn.execute(text(
+        "SELECT indexrelid::regclass::text FROM pg_index WHERE NOT indisvalid"
+    ))
+    return [row[0] for row in rows]
+
+
+def apply_migration(engine, migration: Migration) -> MigrationResult:
+    """マイグレーションを1つ適用して記録"""
+    statements = split_statements(migration.sql)
+    started = time.perf_counter()
+    if migration.transactional:
+        with engine.begin() as conn:
+            if engine.dialect.name == "sqlite":
+                # pysqlite は DML の前にしか BEGIN しないため、DDL も含めて1トランザクションにする
+                conn.exec_driver_sql("BEGIN")
+            for statement in statements:
+                conn.exec_driver_sql(statement)
+            seconds = time.perf_counter() - started
+            _record(conn, migration, seconds)
+    else:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for statement in statements:
+                conn.exec_driver_sql(statement)
+            seconds = time.perf_counter() - started
+            if engine.dialect.name == "postgresql":
+                invalid = _invalid_indexes(conn)
+                if invalid:
+                    raise MigrationError(
+                        f"{migration.path.name}: invalid indexes left behind {invalid}; "
+                        "drop them and run the migration again"
+                    )
+            _record(conn, migration, seconds)
+    return MigrationResult(migration.version, migration.name, migration.transactional, seconds, len(statements))
+
+
+def migrate(
+    directory: str = MIGRATIONS_DIR, target: Optional[str] = None, engine=None
+) -> list[MigrationResult]:
+    """未適用のマイグレーションを番号順に適用（target 指定時はその番号まで）"""
+    engine = engine or get_engine()
+    migrations = discover(directory, engine.dialect.name)
+    _ensure_table(engine)
+
+    lock = None
+    if engine.dialect.name == "postgresql":
+        # ロック用の接続でトランザクションを開いたままにすると CONCURRENTLY がその終了を待ち続けるため autocommit
+        lock = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        lock.exec_driver_sql(f"SELECT pg_advisory_lock({_ADVISORY_LOCK_KEY})")
+    try:
+        applied = applied_migrations(engine)
+        _check_checksums(migrations, applied)
+        results = []
+        for migration in migrations:
+            if migration.version in applied:
+                continue
+            if target is not None and int(migration.version) > int(target):
+                break
+            logger.info(f"Applying {migration.path.name}")
+            result = apply_migration(engine, migration)
+            logger.info(f"Applied {migration.path.name} in {result.seconds:.2f}s")
+            results.append(result)
+        return results
+    finally:
+        if lock is not None:
+            lock.exec_driver_sql(f"SELECT pg_advisory_unlock({_ADVISORY_LOCK_KEY})")
+            lock.close()
+
+
+def baseline(up_to: str, directory: str = MIGRATIONS_DIR, engine=None) -> list[Migration]:
+    """up_to までのマイグレーションを実行せずに適用済みとして記録（手動で適用済みのDB用）"""
+    engine = engine or get_engine()
+    applied = applied_migrations(engine)
+    recorded = []
+    with engine.begin() as conn:
+        for migration in discover(directory, engine.dialect.name):
+            if int(migration.version) > int(up_to):
+                break
+            if migration.version in applied:
+                continue
+            _record(conn, migration, 0.0)
+            recorded.append(migration)
+    return recorded
+
+
+def status(directory: str = MIGRATIONS_DIR, engine=None) -> list[tuple[Migration, str]]:
+    """各マイグレーションの状態（applied / pending / changed）"""
+    engine = engine or get_engine()
+    applied = applied_migrations(engine)
+    result = []
+    for migration in discover(directory, engine.dialect.name):
+        row = applied.get(migration.version)
+        if row is None:
+            state = "pending"
+        elif row["checksum"] != migration.checksum:
+            state = "changed"
+        else:
+            state = "applied"
+        result.append((migration, state))
+    return result
+
+
+def format_report(results: list[MigrationResult]) -> str:
+    """所要時間の一覧"""
+    if not results:
+        return "No pending migrations."
+    lines = [
+        f"{r.version}_{r.name:<40} {r.seconds:8.2f}s  {r.statements:3d} stmts"
+        + ("" if r.transactional else "  (no transaction)")
+        for r in results
+    ]
+    lines.append(f"{len(results)} migrations applied in {sum(r.seconds for r in results):.2f}s")
+    return "\n".join(lines)
+
@@ -1,14 +1,38 @@
 """SQLAlchemy Models for Freelance CRM"""
+import re
+import unicodedata
 from datetime import datetime
 from sqlalchemy import (
     Column, Integer, String, Text, Boolean, Date, DateTime,
-    Numeric, ForeignKey, create_engine, Computed
+    Numeric, ForeignKey, LargeBinary, UniqueConstraint, create_engine, Computed
 )
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 
 Base = declarative_base()
 
+# 法人格（前株・後株どちらも除去）
+_CORPORATE_AFFIXES = re.compile(
+    r"株式会社|有限会社|合同会社|合資会社|合名会社|一般社団法人|一般財団法人|\((?:株|有|同)\)"
+)
+# 英字の法人格は空白・カンマか英数字以外の直後にあるときだけ除去（"Zinc" の "inc" は残す）
+_ENGLISH_SUFFIX = re.compile(
+    r"(?:[\s,]+|(?<=[^a-z0-9]))(?:co\.?,?\s*ltd\.?|inc\.?|corp\.?|corporation|llc|ltd\.?)$"
+)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_company_name(name: str) -> str:
+    """会社名を照合用に正規化（NFKC・法人格除去・小文字化・空白除去）
+
+    "株式会社ABC" / "(株)ABC" / "ＡＢＣ" はいずれも "abc" になる。
+    migrations/004_client_normalized_name.sql のバックフィルと同じ規則。
+    """
+    text = unicodedata.normalize("NFKC", name).lower()
+    stripped = _WHITESPACE.sub("", _ENGLISH_SUFFIX.sub("", _CORPORATE_AFFIXES.sub("", text)))
+    return stripped or _WHITESPACE.sub("", text)
+
 
 class AcquisitionChannel(Base):
     """獲得チャネルマスタ"""
@@ -52,6 +76,7 @@ class Client(Base):
 
     client_id = Column(Integer, primary_key=True)
     company_name = Column(String(255), nullable=False)
+    normalized_name = Column(String(255), unique=True)
     industry_id = Column(Integer, ForeignKey('industries.industry_id'))
     company_size = Column(String(50))
     contact_person = Column(String(100))
@@ -65,6 +90,12 @@ class Client(Base):
     industry = relationship("Industry", back_populates="clients")
     projects = relationship("Project", back_populates="client")
 
+    @validates("company_name")
+    def _normalize_company_name(self, key, value):
+        """会社名の変更時に正規化名を同期"""
+        self.normalized_name = normalize_company_name(value) if value else None
+        return value
+
 
 class Project(Base):
     """案件"""
@@ -113,13 +144,69 @@ class EstimateItem(Base):
     quantity = Column(Numeric(10, 2), default=1)
     unit = Column(String(50), default='式')
     unit_price = Column(Numeric(12, 2), nullable=False)
-    amount = Column(Numeric(12, 2), Computed('quantity * unit_price'))
+    # ROUND は PostgreSQL の numeric(12,2) への丸めと同じ値をSQLite（浮動小数点）でも得るため
+    amount = Column(Numeric(12, 2), Computed('ROUND(quantity * unit_price, 2)'))
     sort_order = Column(Integer, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     project = relationship("Project", back_populates="estimate_items")
 
 
+class EstimateVersion(Base):
+    """見積の版（クライアント提出ごとのスナップショット）
+
+    changes は前の版からの差分（JSON）: 追加 "a"、変更 "c"（[旧, 新]）、削除 "r"。
+    is_snapshot の版は全明細を "a" に持ち、途中の版の復元はここから差分を適用する。
+    """
+    __tablename__ = 'estimate_versions'
+    __table_args__ = (UniqueConstraint('project_id', 'version_no'),)
+
+    version_id = Column(Integer, primary_key=True)
+    project_id = Column(Integer, ForeignKey('projects.project_id', ondelete='CASCADE'), nullable=False)
+    version_no = Column(Integer, nullable=False)
+    is_snapshot = Column(Boolean, default=False)
+    changes = Column(Text, nullable=False)
+    total_amount = Column(Numeric(12, 2))
+    item_count = Column(Integer, default=0)
+    added_count = Column(Integer, default=0)
+    changed_count = Column(Integer, default=0)
+    removed_count = Column(Integer, default=0)
+    note = Column(Text)
+    created_by = Column(String(50))
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class EstimateTemplate(Base):
+    """見積テンプレート（LP制作・API開発 など）"""
+    __tablename__ = 'estimate_templates'
+
+    template_id = Column(Integer, primary_key=True)
+    template_name = Column(String(100), unique=True, nullable=False)
+    description = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    items = relationship(
+        "EstimateTemplateItem", back_populates="template",
+        cascade="all, delete-orphan", order_by="EstimateTemplateItem.sort_order"
+    )
+
+
+class EstimateTemplateItem(Base):
+    """見積テンプレートの明細"""
+    __tablename__ = 'estimate_template_items'
+
+    item_id = Column(Integer, primary_key=True)
+    template_id = Column(Integer, ForeignKey('estimate_templates.template_id', ondelete='CASCADE'), nullable=False)
+    item_name = Column(String(255), nullable=False)
+    description = Column(Text)
+    quantity = Column(Numeric(10, 2), default=1)
+    unit = Column(String(50), default='式')
+    unit_price = Column(Numeric(12, 2), nullable=False)
+    sort_order = Column(Integer, default=0)
+
+    template = relationship("EstimateTemplate", back_populates="items")
+
+
 class Milestone(Base):
     """マイルストーン（工期管理）"""
     __tablename__ = 'milestones'
@@ -163,10 +250,33 @@ class Task(Base):
     project = relationship("Project", back_populates="tasks")
     milestone = relationship("Milestone", back_populates="tasks")
     time_entries = relationship("TimeEntry", back_populates="task", cascade="all, delete-orphan")
+    dependencies = relationship(
+        "TaskDependency", foreign_keys="TaskDependency.task_id",
+        back_populates="task", cascade="all, delete-orphan"
+    )
+
+
+class TaskDependency(Base):
+    """タスクの依存関係（task_id は depends_on_task_id の完了後に着手）"""
+    __tablename__ = 'task_dependencies'
+
+    task_id = Column(Integer, ForeignKey('tasks.task_id', ondelete='CASCADE'), primary_key=True)
+    depends_on_task_id = Column(Integer, ForeignKey('tasks.task_id', ondelete='CASCADE'), primary_key=True)
+    # 案件のタスクグラフを1クエリで読み込むため非正規化して持つ
+    project_id = Column(Integer, ForeignKey('projects.project_id', ondelete='CASCADE'), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    task = relationship("Task", foreign_keys=[task_id], back_populates="dependencies")
+    depends_on = relationship("Task", foreign_keys=[depends_on_task_id])
 
 
 class TimeEntry(Base):
-    """工数記録"""
+    """工数記録
+
+    PostgreSQL では work_date の月単位レンジパーティション（テーブル上の主キーは
+    (entry_id, work_date)、entry_id はシーケンスで一意）。保持期間を過ぎた月は
+    TimeEntryDailyRollup に圧縮される。
+    """
     __tablename__ = 'time_entries'
 
     entry_id = Column(Integer, primary_key=True)
@@ -181,6 +291,47 @@ class TimeEntry(Base):
     project = relationship("Project", back_populates="time_entries")
 
 
+class TimeEntryDailyRollup(Base):
+    """保持期間を過ぎた工数記録の日 × 案件 × タスクごとの合計（crm_schedule.time_partitions が作成）"""
+    __tablename__ = 'time_entry_daily_rollups'
+
+    rollup_id = Column(Integer, primary_key=True)
+    work_date = Column(Date, nullable=False)
+    project_id = Column(Integer, ForeignKey('projects.project_id', ondelete='CASCADE'))
+    task_id = Column(Integer, ForeignKey('tasks.task_id', ondelete='CASCADE'))
+    hours = Column(Numeric(12, 2), nullable=False)
+    entry_count = Column(Integer, nullable=False)
+
+
+class ActiveTimer(Base):
+    """計測中のタイマー（ユーザーごとに1つ）
+
+    開始で1行追加し、停止で削除して工数記録にする。last_active_at は
+    無操作による自動停止の判定に使う最終操作時刻（一定間隔でだけ更新）。
+    """
+    __tablename__ = 'active_timers'
+
+    user_id = Column(String(50), primary_key=True)
+    task_id = Column(Integer, ForeignKey('tasks.task_id', ondelete='CASCADE'), nullable=False)
+    project_id = Column(Integer, ForeignKey('projects.project_id', ondelete='CASCADE'), nullable=False)
+    started_at = Column(DateTime, nullable=False)
+    last_active_at = Column(DateTime, nullable=False)
+
+
+class ProjectBurnSeries(Base):
+    """案件のバーンダウン・バーンアップ用の日次系列（事前計算）
+
+    start_date からの日ごとの値を float32 配列のバイト列で持つ（累積前の日次増分）。
+    """
+    __tablename__ = 'project_burn_series'
+
+    project_id = Column(Integer, ForeignKey('projects.project_id', ondelete='CASCADE'), primary_key=True)
+    start_date = Column(Date, nullable=False)
+    done_hours = Column(LargeBinary, nullable=False)   # 日ごとの実績工数
+    scope_hours = Column(LargeBinary, nullable=False)  # 日ごとに追加された見積工数
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 class RedmineConfig(Base):
     """Redmine設定"""
     __tablename__ = 'redmine_config'
@@ -195,3 +346,45 @@ class RedmineConfig(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
     project = relationship("Project", back_populates="redmine_config")
+
+
+class SubmissionKey(Base):
+    """処理済みのモーダル送信（冪等キー）"""
+    __tablename__ = 'submission_keys'
+
+    submission_key = Column(String(64), primary_key=True)  # SHA-256(view_id + 入力値)
+    callback_id = Column(String(100), nullable=False)
+    user_id = Column(String(50))
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class ScheduledJob(Base):
+    """定期ジョブの実行状態"""
+    __tablename__ = 'scheduled_jobs'
+
+    job_name = Column(String(100), primary_key=True)
+    cron = Column(String(100), nullable=False)  # 分 時 日 月 曜日
+    enabled = Column(Boolean, default=True)
+    next_run_at = Column(DateTime)
+    last_run_at = Column(DateTime)
+    last_status = Column(String(20))  # success, failed
+    last_error = Column(Text)
+    last_duration = Column(Numeric(10, 3))  # 秒
+    running_since = Column(DateTime)  # 実行中のロック（NULLなら待機中）
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class SearchDocument(Base):
+    """全文検索用の文書（案件・タスク・見積明細ごとに1行、crm_core.search が更新）"""
+    __tablename__ = 'search_documents'
+    __table_args__ = (UniqueConstraint('doc_type', 'doc_id'),)
+
+    document_id = Column(Integer, primary_key=True)
+    doc_type = Column(String(20), nullable=False)  # project, task, estimate_item
+    doc_id = Column(Integer, nullable=False)
+    project_id = Column(Integer, ForeignKey('projects.project_id', ondelete='CASCADE'))
+    title = Column(Text, nullable=False)
+    content = Column(Text)
+    # 文字バイグラムの tsvector（SQLiteでは未使用のテキスト）
+    tokens = Column(TSVECTOR().with_variant(Text(), "sqlite"), nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
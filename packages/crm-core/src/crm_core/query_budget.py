@@ -0,0 +1,158 @@
+"""クエリ数の上限チェック（N+1検出）
+
+ブロック内で発行されたSQL文を数え、上限を超えた場合や、同じSQL文がパラメータだけ
+変えて繰り返し発行された（N+1）場合に報告する。
+
+    with query_budget("案件一覧", max_statements=2):
+        page = fetch_project_page(db)
+
+    @query_budget("月次レポート", max_statements=3)
+    def collect_stats(self, year, month):
+        ...
+
+モード（CRM_QUERY_BUDGET=off|warn|raise またはテストで set_query_budget_mode()）:
+- off（既定）: 何もしない
+- warn: 違反を発行元の呼び出し箇所とともに警告ログに記録（Botの DEBUG モードで既定）
+- raise: QueryBudgetExceeded を送出（テスト用）
+
+数えるのは同じスレッドで発行された文だけ（他スレッドのジョブ等は含めない）。
+"""
+import logging
+import os
+import sys
+import threading
+from contextlib import ContextDecorator
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+MODES = ("off", "warn", "raise")
+
+# 同じ文がこの回数を超えてパラメータ違いで発行されたらN+1とみなす
+REPEAT_LIMIT = 3
+
+# 呼び出し箇所として表示しないモジュール
+_SKIP_MODULES = ("sqlalchemy", __name__, "contextlib")
+
+_mode = os.environ.get("CRM_QUERY_BUDGET", "off").lower()
+_local = threading.local()
+
+
+def set_query_budget_mode(mode: str) -> None:
+    """モードを切り替え（off / warn / raise）"""
+    global _mode
+    if mode not in MODES:
+        raise ValueError(f"Unknown query budget mode: '{mode}'")
+    _mode = mode
+
+
+def get_query_budget_mode() -> str:
+    """現在のモード"""
+    return _mode
+
+
+class QueryBudgetExceeded(AssertionError):
+    """クエリ数の上限超過またはN+1"""
+
+
+@dataclass
+class _Statement:
+    """発行されたSQL文ごとの記録"""
+    count: int = 0
+    params: set = field(default_factory=set)
+    call_sites: list = field(default_factory=list)
+
+
+@dataclass
+class _Recorder:
+    """1回のブロック実行中に発行された文"""
+    total: int = 0
+    statements: dict = field(default_factory=dict)
+
+
+def _call_site() -> str:
+    """SQLAlchemy の外で最初に見つかった呼び出し元"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if not module.startswith(_SKIP_MODULES):
+            return f"{frame.f_code.co_filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "?"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    recorders = [r for r in getattr(_local, "recorders", ()) if r is not None]
+    if not recorders:
+        return
+    site = _call_site()
+    key = repr(parameters)
+    for recorder in recorders:
+        recorder.total += 1
+        entry = recorder.statements.setdefault(statement, _Statement())
+        entry.count += 1
+        entry.params.add(key)
+        if site not in entry.call_sites:
+            entry.call_sites.append(site)
+
+
+class query_budget(ContextDecorator):
+    """ブロック（または関数）が発行するSQL文の数を制限する
+
+    name: 報告に使う名前
+    max_statements: 文の数の上限（None なら数は制限しない）
+    max_repeats: 同じ文をパラメータ違いで発行してよい回数（超えたらN+1）
+    """
+
+    def __init__(self, name: str, max_statements: Optional[int] = None, max_repeats: int = REPEAT_LIMIT):
+        self.name = name
+        self.max_statements = max_statements
+        self.max_repeats = max_repeats
+
+    def __enter__(self):
+        recorders = getattr(_local, "recorders", None)
+        if recorders is None:
+            recorders = _local.recorders = []
+        # off のときも None を積み、抜けるときに同じ位置を外す（途中でモードが変わっても崩れない）
+        recorders.append(_Recorder() if _mode != "off" else None)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        recorder = _local.recorders.pop()
+        if recorder is None or exc_type is not None:
+            return False
+        problems = self._problems(recorder)
+        if not problems:
+            return False
+        message = f"Query budget '{self.name}' exceeded:\n" + "\n".join(problems)
+        if _mode == "raise":
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+        return False
+
+    def _problems(self, recorder: _Recorder) -> list[str]:
+        problems = []
+        if self.max_statements is not None and recorder.total > self.max_statements:
+            sites = {site for entry in recorder.statements.values() for site in entry.call_sites}
+            problems.append(
+                f"  {recorder.total} statements (max {self.max_statements}) from:\n"
+                + "\n".join(f"    {site}" for site in sorted(sites))
+            )
+        for statement, entry in recorder.statements.items():
+            if len(entry.params) > self.max_repeats:
+                problems.append(
+                    f"  N+1: {entry.count} executions of {_shorten(statement)} from:\n"
+                    + "\n".join(f"    {site}" for site in entry.call_sites)
+                )
+        return problems
+
+
+def _shorten(statement: str, width: int = 120) -> str:
+    text = " ".join(statement.split())
+    return text if len(text) <= width else text[:width - 3] + "..."
+
@@ -0,0 +1,155 @@
+"""読み取り用の軽量な行（サービスの戻り値）
+
+セッションを閉じた後にORMオブジェクトを返す代わりに、必要な列だけを SELECT して
+frozen・__slots__ のデータクラスに詰める。identity map の状態を持たず、属性アクセスで
+SQLが発行されることもないため、キャッシュやスレッド間の受け渡しにもそのまま使える。
+
+    stmt = TaskRow.select().where(Task.project_id == bindparam("project_id"))
+    tasks = [TaskRow(*row) for row in db.execute(stmt, {"project_id": 1})]
+
+フィールド名はモデルの列名と同じにし、フィールドの順に列を SELECT する。
+長文の列（案件の requirements・notes など）は含めない。
+"""
+from dataclasses import dataclass, fields
+from datetime import date, datetime
+from decimal import Decimal
+from functools import cache
+from typing import ClassVar, Optional
+
+from sqlalchemy import Select, select
+
+from .models import AcquisitionChannel, Client, EstimateItem, Industry, Milestone, Project, ProjectStatus, Task
+
+
+class _Row:
+    """行クラスの共通処理（model の列をフィールドの順に取り出す）"""
+    __slots__ = ()
+    model: ClassVar[type]
+
+    @classmethod
+    def columns(cls) -> tuple:
+        """フィールドに対応するモデルの列"""
+        return _columns(cls)
+
+    @classmethod
+    def select(cls) -> Select:
+        """フィールドの順に列を取り出す SELECT"""
+        return select(*_columns(cls))
+
+    @classmethod
+    def from_instance(cls, instance):
+        """読み込み済みのORMオブジェクトから作成（flush 直後の登録結果を返すときなど）"""
+        return cls(*(getattr(instance, f.name) for f in fields(cls)))
+
+
+@cache
+def _columns(row_type: type) -> tuple:
+    return tuple(getattr(row_type.model, f.name) for f in fields(row_type))
+
+
+@dataclass(frozen=True, slots=True)
+class ChannelRow(_Row):
+    """獲得チャネル"""
+    model: ClassVar[type] = AcquisitionChannel
+    channel_id: int
+    channel_name: str
+    channel_category: Optional[str]
+
+
+@dataclass(frozen=True, slots=True)
+class IndustryRow(_Row):
+    """業種"""
+    model: ClassVar[type] = Industry
+    industry_id: int
+    industry_name: str
+
+
+@dataclass(frozen=True, slots=True)
+class StatusRow(_Row):
+    """案件ステータス"""
+    model: ClassVar[type] = ProjectStatus
+    status_id: int
+    status_name: str
+    status_order: Optional[int]
+    is_terminal: Optional[bool]
+
+
+@dataclass(frozen=True, slots=True)
+class ClientRow(_Row):
+    """クライアント"""
+    model: ClassVar[type] = Client
+    client_id: int
+    company_name: str
+    normalized_name: Optional[str]
+    industry_id: Optional[int]
+    company_size: Optional[str]
+    contact_person: Optional[str]
+    contact_email: Optional[str]
+
+
+@dataclass(frozen=True, slots=True)
+class ProjectRow(_Row):
+    """案件"""
+    model: ClassVar[type] = Project
+    project_id: int
+    project_name: str
+    client_id: Optional[int]
+    acquisition_channel_id: Optional[int]
+    status_id: Optional[int]
+    request_date: Optional[date]
+    start_date: Optional[date]
+    deadline: Optional[date]
+    estimated_hours: Optional[Decimal]
+    actual_hours: Optional[Decimal]
+    estimated_amount: Optional[Decimal]
+    final_amount: Optional[Decimal]
+    created_at: Optional[datetime]
+
+
+@dataclass(frozen=True, slots=True)
+class MilestoneRow(_Row):
+    """マイルストーン"""
+    model: ClassVar[type] = Milestone
+    milestone_id: int
+    project_id: int
+    milestone_name: str
+    description: Optional[str]
+    due_date: date
+    completed_date: Optional[date]
+    status: Optional[str]
+    sort_order: Optional[int]
+
+
+@dataclass(frozen=True, slots=True)
+class TaskRow(_Row):
+    """タスク"""
+    model: ClassVar[type] = Task
+    task_id: int
+    project_id: int
+    milestone_id: Optional[int]
+    task_name: str
+    assigned_to: Optional[str]
+    estimated_hours: Optional[Decimal]
+    actual_hours: Optional[Decimal]
+    start_date: Optional[date]
+    due_date: Optional[date]
+    completed_date: Optional[date]
+    status: Optional[str]
+    priority: Optional[int]
+    redmine_issue_id: Optional[int]
+    sort_order: Optional[int]
+
+
+@dataclass(frozen=True, slots=True)
+class EstimateItemRow(_Row):
+    """見積明細"""
+    model: ClassVar[type] = EstimateItem
+    item_id: int
+    project_id: int
+    item_name: str
+    description: Optional[str]
+    quantity: Optional[Decimal]
+    unit: Optional[str]
+    unit_price: Decimal
+    amount: Optional[Decimal]
+    sort_order: Optional[int]
@@ -0,0 +1,252 @@
+"""全文検索（案件の要件・メモ、タスク・見積明細の説明）
+
+案件・タスク・見積明細ごとに search_documents に1行を持ち、名前と本文を
+NFKC正規化・小文字化した文字バイグラム（連続する2文字）の tsvector にして
+GINインデックス（migrations/016_search_documents.sql）で引く。
+形態素解析の辞書を使わないため、日本語でも英数字でも ILIKE と同じ「部分一致」になる。
+
+- 文書: 名前は重み A、本文は重み D。語（文字・数字の連続）ごとにバイグラムを並べ、
+  語の最後の1文字も加える（1文字の検索語を前方一致で拾うため）
+- 検索語: 空白区切りの各語をバイグラムの隣接（<->）で並べ、語どうしは AND。1文字の語は前方一致
+- 並び順: ts_rank（文書の長さで正規化）の降順、同点は document_id の降順（キーセットページングのキー）
+
+案件・タスク・見積明細の追加・更新・削除は Session の flush で検知して文書を作り直す。
+Core の INSERT・DELETE（見積明細の一括登録・テンプレート適用・版の復元）は flush を通らないため、
+書き込んだ側が直後に reindex_project() を呼ぶ。
+既存データの登録・作り直しは python -m crm_core.search_cli --rebuild。
+PostgreSQL 以外（SQLite）は tsvector がないため、tokens に正規化した名前・本文をそのまま入れて部分一致で検索する。
+"""
+import re
+import unicodedata
+from typing import Optional
+
+from sqlalchemy import Float, and_, case, cast, delete, event, func, inspect, insert, literal, select, tuple_
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION, TSQUERY
+from sqlalchemy.orm import Query, Session
+
+from .models import EstimateItem, Project, SearchDocument, Task
+
+# 文書の種類 → 表示名
+DOC_TYPES = {"project": "案件", "task": "タスク", "estimate_item": "見積明細"}
+
+# tsvector の位置の上限（これより後ろの語は位置が丸められ、隣接の判定に使えない）
+_MAX_POSITION = 16383
+# 1つの語彙素に記録する位置の上限
+_MAX_POSITIONS_PER_TOKEN = 256
+# 文字・数字の連続（アンダースコアは区切りにする）
+_WORD = re.compile(r"[^\W_]+")
+
+# モデル → (doc_type, 主キーの属性)
+_DOC_KEYS = {
+    Project: ("project", "project_id"),
+    Task: ("task", "task_id"),
+    EstimateItem: ("estimate_item", "item_id"),
+}
+# 変更されたら文書を作り直す属性
+_WATCHED_ATTRS = {
+    Project: ("project_name", "requirements", "notes"),
+    Task: ("task_name", "description", "project_id"),
+    EstimateItem: ("item_name", "description", "project_id"),
+}
+
+
+def normalize(text: Optional[str]) -> str:
+    """全角英数・半角カナを揃え、小文字にする"""
+    return unicodedata.normalize("NFKC", text or "").lower()
+
+
+def _words(text: Optional[str]) -> list[str]:
+    return _WORD.findall(normalize(text))
+
+
+def _bigrams(word: str) -> list[str]:
+    return [word[i:i + 2] for i in range(len(word) - 1)]
+
+
+def to_tsvector_literal(title: str, body: Optional[str] = None) -> str:
+    """名前（重み A）と本文（重み D）のバイグラム tsvector を入力形式の文字列で返す"""
+    positions: dict[str, list[str]] = {}
+    position = 0
+    for text, weight in ((title, "A"), (body, "")):
+        for word in _words(text):
+            tokens = _bigrams(word) + [word[-1]]
+            for token in tokens:
+                position = min(position + 1, _MAX_POSITION)
+                entries = positions.setdefault(token, [])
+                if len(entries) < _MAX_POSITIONS_PER_TOKEN:
+                    entries.append(f"{position}{weight}")
+    return " ".join(f"'{token}':{','.join(entries)}" for token, entries in positions.items())
+
+
+def to_tsquery_literal(keyword: str) -> Optional[str]:
+    """検索語を tsquery の入力形式の文字列にする（検索できる語がなければ None）"""
+    terms = []
+    for word in _words(keyword):
+        if len(word) == 1:
+            terms.append(f"'{word}':*")
+        else:
+            terms.append("(" + " <-> ".join(f"'{bigram}'" for bigram in _bigrams(word)) + ")")
+    return " & ".join(terms) or None
+
+
+def search_query(db: Session, keyword: str) -> tuple[Optional[Query], list]:
+    """検索語に一致する文書のクエリと、キーセットページング用のソートキーの列
+
+    クエリの行: document_id, doc_type, doc_id, project_id, title, content, rank
+    ソートキー (rank, document_id) の降順で並べる。検索できる語がなければ (None, [])。
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return _like_query(db, keyword)
+
+    tsquery = to_tsquery_literal(keyword)
+    if tsquery is None:
+        return None, []
+    query_expr = cast(literal(tsquery), TSQUERY)
+    # ts_rank は real。カーソルで往復しても同じ値になるよう double precision にする
+    rank = cast(func.ts_rank(SearchDocument.tokens, query_expr, 1), DOUBLE_PRECISION)
+    query = db.query(
+        SearchDocument.document_id,
+        SearchDocument.doc_type,
+        SearchDocument.doc_id,
+        SearchDocument.project_id,
+        SearchDocument.title,
+        SearchDocument.content,
+        rank.label("rank"),
+    ).filter(SearchDocument.tokens.bool_op("@@")(query_expr))
+    return query, [rank, SearchDocument.document_id]
+
+
+def _like_query(db: Session, keyword: str) -> tuple[Optional[Query], list]:
+    """tsvector がないDB用の検索（正規化した名前・本文の部分一致、名前に一致すれば上位）"""
+    words = _words(keyword)
+    if not words:
+        return None, []
+    conditions = [SearchDocument.tokens.like(f"%{word}%") for word in words]
+    rank = cast(case((SearchDocument.title.ilike(f"%{words[0]}%"), 1.0), else_=0.5), Float)
+    query = db.query(
+        SearchDocument.document_id,
+        SearchDocument.doc_type,
+        SearchDocument.doc_id,
+        SearchDocument.project_id,
+        SearchDocument.title,
+        SearchDocument.content,
+        rank.label("rank"),
+    ).filter(and_(*conditions))
+    return query, [rank, SearchDocument.document_id]
+
+
+def snippet(content: Optional[str], keyword: str, width: int = 80) -> str:
+    """本文のうち検索語が最初に現れるあたりを width 文字で切り出す"""
+    text = " ".join((content or "").split())
+    if len(text) <= width:
+        return text
+    lowered = normalize(text)
+    hits = [lowered.find(word) for word in _words(keyword)]
+    hits = [hit for hit in hits if hit >= 0]
+    start = max(min(hits) - width // 4, 0) if hits else 0
+    end = min(start + width, len(text))
+    start = max(end - width, 0)
+    return ("…" if start else "") + text[start:end] + ("…" if end < len(text) else "")
+
+
+# ======================
+# 文書の作成・更新
+# ======================
+def _doc_key(obj) -> tuple[str, int]:
+    doc_type, id_attr = _DOC_KEYS[type(obj)]
+    return doc_type, getattr(obj, id_attr)
+
+
+def _document(obj, dialect: str) -> dict:
+    """案件・タスク・見積明細から search_documents の1行を作る"""
+    if isinstance(obj, Project):
+        title = obj.project_name
+        body = "\n".join(part for part in (obj.requirements, obj.notes) if part)
+    elif isinstance(obj, Task):
+        title, body = obj.task_name, obj.description
+    else:
+        title, body = obj.item_name, obj.description
+    doc_type, doc_id = _doc_key(obj)
+    return {
+        "doc_type": doc_type,
+        "doc_id": doc_id,
+        "project_id": obj.project_id,
+        "title": title or "",
+        "content": body,
+        "tokens": (
+            to_tsvector_literal(title or "", body) if dialect == "postgresql"
+            else normalize(title) + "\n" + normalize(body)
+        ),
+    }
+
+
+def _changed(obj) -> bool:
+    attrs = inspect(obj).attrs
+    return any(attrs[name].history.has_changes() for name in _WATCHED_ATTRS[type(obj)])
+
+
+def _replace_documents(connection, stale: set, documents: list[dict]) -> None:
+    """stale の (doc_type, doc_id) の文書を削除し、documents を登録"""
+    table = SearchDocument.__table__
+    if stale:
+        connection.execute(delete(table).where(tuple_(table.c.doc_type, table.c.doc_id).in_(sorted(stale))))
+    if documents:
+        connection.execute(insert(table), documents)
+
+
+@event.listens_for(Session, "after_flush")
+def _update_search_documents(session, flush_context):
+    """案件・タスク・見積明細の追加・変更・削除を search_documents に反映"""
+    stale = set()
+    changed = [obj for obj in session.new if type(obj) in _WATCHED_ATTRS]
+    for obj in session.dirty:
+        if type(obj) in _WATCHED_ATTRS and _changed(obj):
+            stale.add(_doc_key(obj))
+            changed.append(obj)
+    for obj in session.deleted:
+        if type(obj) in _WATCHED_ATTRS:
+            stale.add(_doc_key(obj))
+    if not stale and not changed:
+        return
+    connection = session.connection()
+    documents = [_document(obj, connection.dialect.name) for obj in changed]
+    _replace_documents(connection, stale, documents)
+
+
+def reindex_project(db: Session, project_id: int) -> int:
+    """案件とそのタスク・見積明細の文書を作り直し、登録した文書数を返す
+
+    削除された明細の文書も残らないよう、案件の文書をすべて消してから登録する。
+    """
+    connection = db.connection()
+    db.execute(delete(SearchDocument).where(SearchDocument.project_id == project_id))
+    documents = []
+    for model in (Project, Task, EstimateItem):
+        # Core で書き換えた行は identity map の古い値を使わないよう読み直す
+        rows = db.scalars(
+            select(model).where(model.project_id == project_id).execution_options(populate_existing=True)
+        )
+        documents.extend(_document(obj, connection.dialect.name) for obj in rows)
+    _replace_documents(connection, set(), documents)
+    return len(documents)
+
+
+def rebuild_search_index(db: Session, batch_size: int = 500) -> int:
+    """search_documents を全件作り直し、登録した文書数を返す"""
+    connection = db.connection()
+    db.execute(delete(SearchDocument))
+    count = 0
+    for model in (Project, Task, EstimateItem):
+        batch = []
+        for obj in db.scalars(select(model).execution_options(yield_per=batch_size)):
+            batch.append(_document(obj, connection.dialect.name))
+            if len(batch) >= batch_size:
+                _replace_documents(connection, set(), batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            _replace_documents(connection, set(), batch)
+            count += len(batch)
+        db.expunge_all()
+    return count
+
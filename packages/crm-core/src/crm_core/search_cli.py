@@ -0,0 +1,37 @@
+"""全文検索のコマンドライン
+
+crm_core/__init__ から import しないモジュールに置く（python -m で実行したとき
+crm_core.search が二重に読み込まれないようにするため）。
+
+    python -m crm_core.search_cli --rebuild     # 既存データの文書を作り直す
+    python -m crm_core.search_cli キーワード     # 検索結果の上位20件を表示
+"""
+import argparse
+import sys
+from typing import Optional
+
+from .database import get_db, get_read_db
+from .search import DOC_TYPES, rebuild_search_index, search_query, snippet
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m crm_core.search_cli", description="Full-text search")
+    parser.add_argument("keyword", nargs="*", help="search keywords")
+    parser.add_argument("--rebuild", action="store_true", help="rebuild search_documents from all rows")
+    args = parser.parse_args(argv)
+
+    if args.rebuild:
+        with get_db() as db:
+            print(f"indexed {rebuild_search_index(db)} documents")
+    if args.keyword:
+        keyword = " ".join(args.keyword)
+        with get_read_db() as db:
+            query, columns = search_query(db, keyword)
+            rows = query.order_by(*(c.desc() for c in columns)).limit(20).all() if query is not None else []
+        for row in rows:
+            print(f"{row.rank:.4f} {DOC_TYPES[row.doc_type]} {row.doc_id} {row.title}: {snippet(row.content, keyword, 60)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
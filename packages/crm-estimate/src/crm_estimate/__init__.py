@@ -1,4 +1,60 @@
 """CRM Estimate - Quotation management"""
 from .service import EstimateService
+from .bulk import (
+    recompute_estimate_total,
+    insert_estimate_items,
+    apply_template_items,
+    save_template_from_project,
+    list_templates,
+    parse_item_lines,
+)
+from .versions import (
+    VersionDiff,
+    create_version,
+    restore_version,
+    list_versions,
+    get_version,
+    version_items,
+    stored_diff,
+    diff_items,
+)
+from .accuracy import (
+    AccuracyFrame,
+    GroupAccuracy,
+    BufferSuggestion,
+    EstimateAccuracy,
+    load_accuracy_frame,
+    group_percentiles,
+    analyze_accuracy,
+    get_estimate_accuracy,
+    suggest_project_buffer,
+    invalidate_estimate_accuracy,
+)
 
-__all__ = ["EstimateService"]
+__all__ = [
+    "EstimateService",
+    "recompute_estimate_total",
+    "insert_estimate_items",
+    "apply_template_items",
+    "save_template_from_project",
+    "list_templates",
+    "parse_item_lines",
+    "VersionDiff",
+    "create_version",
+    "restore_version",
+    "list_versions",
+    "get_version",
+    "version_items",
+    "stored_diff",
+    "diff_items",
+    "AccuracyFrame",
+    "GroupAccuracy",
+    "BufferSuggestion",
+    "EstimateAccuracy",
+    "load_accuracy_frame",
+    "group_percentiles",
+    "analyze_accuracy",
+    "get_estimate_accuracy",
+    "suggest_project_buffer",
+    "invalidate_estimate_accuracy",
+]
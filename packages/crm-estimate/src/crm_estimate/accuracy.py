@@ -0,0 +1,327 @@
+"""見積精度の分析（見積工数と実績工数のずれ）
+
+納品済・完了の案件を、クライアント・業種・獲得チャネルと工数合計を結合した
+1クエリで読み込み、列ごとの NumPy 配列（AccuracyFrame）にする。
+工数は案件の値を優先し、未入力ならタスクの合計を使う。
+
+グループ（チャネル・クライアント・業種）ごとの超過率の分位点は、
+(グループ, 値) でソートした配列上の位置を一度に計算して補間する（グループ単位のループなし）。
+
+推奨バッファは超過率の BUFFER_PERCENTILE 分位点。実績の少ないグループは
+全体 → チャネル → 業種 → クライアント の順に、上位の値へ件数に応じて寄せる
+（件数 n のとき n / (n + BUFFER_PRIOR_WEIGHT) だけグループの値を使う）。
+
+分析結果はキャッシュし、案件・クライアント・タスク工数・工数記録の変更を Session の flush で検知して破棄する。
+"""
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+from crm_core import get_db, AcquisitionChannel, Client, Industry, Project, Task, TimeEntry
+
+# 実績が確定している案件（納品済・完了）
+COMPLETED_PROJECT_STATUSES = (8, 9)
+
+# 推奨バッファに使う超過率の分位点
+BUFFER_PERCENTILE = 80
+# 件数の少ないグループを上位グループの値に寄せる強さ（件数換算）
+BUFFER_PRIOR_WEIGHT = 3
+
+PERCENTILES = (50, 80, 90)
+
+DIMENSIONS = ("channel", "industry", "client")
+DIMENSION_LABELS = {"channel": "チャネル", "industry": "業種", "client": "クライアント"}
+
+# 変更されたら分析結果を破棄する属性
+_PROJECT_ATTRS = (
+    "estimated_hours", "actual_hours", "final_amount", "status_id", "client_id", "acquisition_channel_id",
+)
+_TASK_ATTRS = ("project_id", "estimated_hours", "actual_hours")
+
+
+@dataclass(frozen=True)
+class AccuracyFrame:
+    """案件ごとの見積・実績（列ごとの配列）"""
+    project_ids: np.ndarray
+    keys: dict[str, np.ndarray]       # 次元 → グループID（未設定は0）
+    names: dict[str, dict[int, str]]  # 次元 → {グループID: 名前}
+    estimated_hours: np.ndarray
+    actual_hours: np.ndarray
+    final_amount: np.ndarray          # 未確定は NaN
+
+    @property
+    def overrun(self) -> np.ndarray:
+        """工数の超過率（実績 / 見積 − 1）"""
+        return self.actual_hours / self.estimated_hours - 1
+
+    @property
+    def hourly_rate(self) -> np.ndarray:
+        """実質時給（確定金額 / 実績工数）"""
+        return self.final_amount / self.actual_hours
+
+
+@dataclass(frozen=True)
+class GroupAccuracy:
+    """グループの見積精度"""
+    key: int
+    name: str
+    count: int
+    overrun: dict[int, float]  # 分位点 → 超過率
+    hourly_rate: float         # 実質時給の中央値（金額未確定のみなら NaN）
+    buffer: float              # 推奨バッファ（全体の値に寄せたもの）
+
+
+@dataclass(frozen=True)
+class BufferSuggestion:
+    """案件への推奨バッファ"""
+    buffer: float
+    basis: list[tuple[str, str, int]]  # [(次元の表示名, グループ名, 件数)]（使った実績）
+    estimated_hours: Optional[float]
+
+    @property
+    def suggested_hours(self) -> Optional[float]:
+        if self.estimated_hours is None:
+            return None
+        return self.estimated_hours * (1 + self.buffer)
+
+
+@dataclass(frozen=True)
+class EstimateAccuracy:
+    """見積精度の分析結果"""
+    overall: GroupAccuracy
+    groups: dict[str, dict[int, GroupAccuracy]]
+
+    def ranked(self, dimension: str, limit: int = 10) -> list[GroupAccuracy]:
+        """件数の多い順"""
+        groups = sorted(self.groups[dimension].values(), key=lambda g: (-g.count, g.name))
+        return groups[:limit]
+
+    def suggest_buffer(
+        self,
+        channel_id: Optional[int] = None,
+        industry_id: Optional[int] = None,
+        client_id: Optional[int] = None,
+        estimated_hours: Optional[float] = None,
+    ) -> BufferSuggestion:
+        """該当する最も細かいグループの推奨バッファ"""
+        buffer = self.overall.buffer
+        basis = []
+        for dimension, key in zip(DIMENSIONS, (channel_id, industry_id, client_id)):
+            group = self.groups[dimension].get(key) if key else None
+            if group is None:
+                continue
+            # group.buffer は全体の値に寄せたもの。ここでは指定された次元の順に寄せていく
+            weight = group.count / (group.count + BUFFER_PRIOR_WEIGHT)
+            buffer = weight * max(group.overrun[BUFFER_PERCENTILE], 0.0) + (1 - weight) * buffer
+            basis.append((DIMENSION_LABELS[dimension], group.name, group.count))
+        return BufferSuggestion(buffer=buffer, basis=basis, estimated_hours=estimated_hours)
+
+
+# ======================
+# 読み込み・集計
+# ======================
+def load_accuracy_frame(db: Session) -> AccuracyFrame:
+    """納品済・完了案件の見積と実績を1クエリで取得"""
+    task_totals = (
+        select(
+            Task.project_id,
+            func.sum(Task.estimated_hours).label("estimated_hours"),
+            func.sum(Task.actual_hours).label("actual_hours"),
+        )
+        .group_by(Task.project_id)
+        .subquery()
+    )
+    estimated = func.coalesce(Project.estimated_hours, task_totals.c.estimated_hours)
+    actual = func.coalesce(Project.actual_hours, task_totals.c.actual_hours)
+    rows = db.execute(
+        select(
+            Project.project_id,
+            Project.acquisition_channel_id,
+            AcquisitionChannel.channel_name,
+            Client.industry_id,
+            Industry.industry_name,
+            Project.client_id,
+            Client.company_name,
+            estimated,
+            actual,
+            Project.final_amount,
+        )
+        .outerjoin(task_totals, task_totals.c.project_id == Project.project_id)
+        .outerjoin(Client, Client.client_id == Project.client_id)
+        .outerjoin(Industry, Industry.industry_id == Client.industry_id)
+        .outerjoin(AcquisitionChannel, AcquisitionChannel.channel_id == Project.acquisition_channel_id)
+        .where(
+            Project.status_id.in_(COMPLETED_PROJECT_STATUSES),
+            estimated > 0,
+            actual > 0,
+        )
+    ).all()
+
+    columns = list(zip(*rows)) if rows else [()] * 10
+    names = {dimension: {} for dimension in DIMENSIONS}
+    for row in rows:
+        for dimension, key, name in zip(DIMENSIONS, row[1:7:2], row[2:7:2]):
+            if key is not None:
+                names[dimension].setdefault(key, name or f"ID {key}")
+
+    def ids(values):
+        return np.array([v or 0 for v in values], dtype="int64")
+
+    def floats(values):
+        return np.array([np.nan if v is None else float(v) for v in values], dtype=float)
+
+    return AccuracyFrame(
+        project_ids=ids(columns[0]),
+        keys={dimension: ids(columns[i]) for dimension, i in zip(DIMENSIONS, (1, 3, 5))},
+        names=names,
+        estimated_hours=floats(columns[7]),
+        actual_hours=floats(columns[8]),
+        final_amount=floats(columns[9]),
+    )
+
+
+def group_percentiles(
+    keys: np.ndarray, values: np.ndarray, percentiles
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """グループごとの分位点（線形補間、NaNは除外）を (グループ, 件数, 値[グループ, 分位点]) で返す"""
+    valid = ~np.isnan(values)
+    keys, values = keys[valid], values[valid]
+    order = np.lexsort((values, keys))
+    keys, values = keys[order], values[order]
+    groups, starts, counts = np.unique(keys, return_index=True, return_counts=True)
+
+    q = np.asarray(percentiles, dtype=float) / 100
+    position = starts[:, None] + q[None, :] * (counts[:, None] - 1)
+    lower = np.floor(position).astype("int64")
+    upper = np.ceil(position).astype("int64")
+    fraction = position - lower
+    return groups, counts, values[lower] * (1 - fraction) + values[upper] * fraction
+
+
+def analyze_accuracy(frame: AccuracyFrame) -> EstimateAccuracy:
+    """全体と次元ごとの超過率の分位点・実質時給・推奨バッファを計算"""
+    overrun = frame.overrun
+    rate = frame.hourly_rate
+    everything = np.zeros(len(overrun), dtype="int64")
+
+    def summarize(keys):
+        groups, counts, values = group_percentiles(keys, overrun, PERCENTILES)
+        rate_groups, _, rate_values = group_percentiles(keys, rate, (50,))
+        rates = dict(zip(rate_groups.tolist(), rate_values[:, 0].tolist()))
+        return [
+            (key, count, dict(zip(PERCENTILES, row)), rates.get(key, float("nan")))
+            for key, count, row in zip(groups.tolist(), counts.tolist(), values.tolist())
+        ]
+
+    empty = {p: 0.0 for p in PERCENTILES}
+    key, count, percentiles, hourly_rate = next(iter(summarize(everything)), (0, 0, empty, float("nan")))
+    overall = GroupAccuracy(
+        key=key,
+        name="全体",
+        count=count,
+        overrun=percentiles,
+        hourly_rate=hourly_rate,
+        buffer=max(percentiles[BUFFER_PERCENTILE], 0.0),
+    )
+
+    groups = {}
+    for dimension in DIMENSIONS:
+        groups[dimension] = {
+            key: GroupAccuracy(
+                key=key,
+                name=frame.names[dimension].get(key, "未設定"),
+                count=count,
+                overrun=percentiles,
+                hourly_rate=hourly_rate,
+                buffer=(
+                    count * max(percentiles[BUFFER_PERCENTILE], 0.0) + BUFFER_PRIOR_WEIGHT * overall.buffer
+                ) / (count + BUFFER_PRIOR_WEIGHT),
+            )
+            for key, count, percentiles, hourly_rate in summarize(frame.keys[dimension])
+        }
+    return EstimateAccuracy(overall=overall, groups=groups)
+
+
+# ======================
+# 取得とキャッシュ
+# ======================
+_cache: dict[str, EstimateAccuracy] = {}
+_cache_lock = threading.Lock()
+
+
+def get_estimate_accuracy() -> EstimateAccuracy:
+    """見積精度の分析結果を取得（案件・タスクの工数が変わるまでキャッシュ）"""
+    with _cache_lock:
+        cached = _cache.get("all")
+    if cached is not None:
+        return cached
+
+    with get_db() as db:
+        frame = load_accuracy_frame(db)
+    result = analyze_accuracy(frame)
+
+    with _cache_lock:
+        _cache["all"] = result
+    return result
+
+
+def suggest_project_buffer(project_id: int) -> Optional[BufferSuggestion]:
+    """案件のクライアント・業種・チャネルの実績から推奨バッファを計算（案件がなければNone）"""
+    with get_db() as db:
+        row = db.execute(
+            select(
+                Project.acquisition_channel_id,
+                Client.industry_id,
+                Project.client_id,
+                Project.estimated_hours,
+            )
+            .outerjoin(Client, Client.client_id == Project.client_id)
+            .where(Project.project_id == project_id)
+        ).first()
+    if row is None:
+        return None
+
+    channel_id, industry_id, client_id, estimated_hours = row
+    return get_estimate_accuracy().suggest_buffer(
+        channel_id=channel_id,
+        industry_id=industry_id,
+        client_id=client_id,
+        estimated_hours=float(estimated_hours) if estimated_hours else None,
+    )
+
+
+def invalidate_estimate_accuracy() -> None:
+    """キャッシュを破棄"""
+    with _cache_lock:
+        _cache.clear()
+
+
+def _changed(obj, names) -> bool:
+    attrs = inspect(obj).attrs
+    return any(attrs[name].history.has_changes() for name in names)
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_on_change(session, flush_context):
+    """案件・クライアント・タスク工数の変更を検知してキャッシュを破棄
+
+    工数記録（crm_schedule.record_time）はタスクの実績工数を Core の UPDATE で加算し、
+    flush を通らないため、工数記録の追加・削除でも破棄する。
+    """
+    if not _cache:
+        return
+    for obj in session.new | session.deleted:
+        if isinstance(obj, (Project, Client, Task, TimeEntry)):
+            invalidate_estimate_accuracy()
+            return
+    for obj in session.dirty:
+        if (
+            (isinstance(obj, Project) and _changed(obj, _PROJECT_ATTRS))
+            or (isinstance(obj, Task) and _changed(obj, _TASK_ATTRS))
+            or (isinstance(obj, Client) and _changed(obj, ("industry_id", "company_name")))
+        ):
+            invalidate_estimate_accuracy()
+            return
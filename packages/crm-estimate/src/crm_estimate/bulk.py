@@ -0,0 +1,187 @@
+"""見積明細の一括登録とテンプレート
+
+明細はまとめて1回の INSERT（テンプレートは INSERT ... SELECT）で登録し、
+見積総額は登録後に1回の UPDATE で再計算する。
+Core の INSERT は全文検索の自動更新（flush）を通らないため、登録後に案件の検索文書を作り直す。
+"""
+import re
+from typing import Optional
+
+from sqlalchemy import func, insert, literal, select, update
+from sqlalchemy.orm import Session
+from crm_core import Project, EstimateItem, EstimateTemplate, EstimateTemplateItem, reindex_project
+
+_ITEM_COLUMNS = ["project_id", "item_name", "description", "quantity", "unit", "unit_price", "sort_order"]
+_NUMBER = re.compile(r"[¥￥,，円\s]")
+
+
+def recompute_estimate_total(db: Session, project_id: int) -> float:
+    """案件の見積総額を明細から再計算して保存（1回のUPDATE）"""
+    total = select(
+        func.coalesce(func.sum(EstimateItem.quantity * EstimateItem.unit_price), 0)
+    ).where(EstimateItem.project_id == project_id).scalar_subquery()
+    amount = db.execute(
+        update(Project)
+        .where(Project.project_id == project_id)
+        .values(estimated_amount=total)
+        .returning(Project.estimated_amount)
+    ).scalar()
+    return float(amount or 0)
+
+
+def _next_sort_order(db: Session, project_id: int) -> int:
+    """既存明細の後ろに並べるための sort_order の基準値"""
+    return db.scalar(
+        select(func.coalesce(func.max(EstimateItem.sort_order), 0))
+        .where(EstimateItem.project_id == project_id)
+    )
+
+
+def insert_estimate_items(db: Session, project_id: int, items: list[dict]) -> int:
+    """明細をまとめて登録（複数行VALUESのINSERT1回）"""
+    if not items:
+        return 0
+    base = _next_sort_order(db, project_id)
+    rows = [
+        {
+            "project_id": project_id,
+            "item_name": item["item_name"],
+            "description": item.get("description") or "",
+            "quantity": item.get("quantity", 1),
+            "unit": item.get("unit") or "式",
+            "unit_price": item["unit_price"],
+            "sort_order": base + i + 1,
+        }
+        for i, item in enumerate(items)
+    ]
+    db.execute(insert(EstimateItem).values(rows))
+    reindex_project(db, project_id)
+    return len(rows)
+
+
+def apply_template_items(db: Session, project_id: int, template_name: str) -> int:
+    """テンプレートの明細を案件に登録（INSERT ... SELECT 1回）"""
+    template_id = db.scalar(
+        select(EstimateTemplate.template_id).where(EstimateTemplate.template_name == template_name)
+    )
+    if template_id is None:
+        raise ValueError(f"テンプレート「{template_name}」が見つかりません")
+
+    base = _next_sort_order(db, project_id)
+    item = EstimateTemplateItem
+    result = db.execute(
+        insert(EstimateItem).from_select(
+            _ITEM_COLUMNS,
+            select(
+                literal(project_id),
+                item.item_name,
+                func.coalesce(item.description, ""),
+                item.quantity,
+                item.unit,
+                item.unit_price,
+                func.coalesce(item.sort_order, 0) + base,
+            ).where(item.template_id == template_id),
+        )
+    )
+    reindex_project(db, project_id)
+    return result.rowcount
+
+
+def save_template_from_project(
+    db: Session, project_id: int, template_name: str, description: str = ""
+) -> int:
+    """案件の現在の見積明細をテンプレートとして保存（INSERT ... SELECT 1回）"""
+    exists = db.scalar(
+        select(EstimateTemplate.template_id).where(EstimateTemplate.template_name == template_name)
+    )
+    if exists is not None:
+        raise ValueError(f"テンプレート「{template_name}」は既に存在します")
+
+    template = EstimateTemplate(template_name=template_name, description=description)
+    db.add(template)
+    db.flush()
+
+    result = db.execute(
+        insert(EstimateTemplateItem).from_select(
+            ["template_id", "item_name", "description", "quantity", "unit", "unit_price", "sort_order"],
+            select(
+                literal(template.template_id),
+                EstimateItem.item_name,
+                EstimateItem.description,
+                EstimateItem.quantity,
+                EstimateItem.unit,
+                EstimateItem.unit_price,
+                func.coalesce(EstimateItem.sort_order, 0),
+            ).where(EstimateItem.project_id == project_id),
+        )
+    )
+    if not result.rowcount:
+        raise ValueError(f"案件ID {project_id} に見積明細がありません")
+    return result.rowcount
+
+
+def list_templates(db: Session) -> list[tuple[str, Optional[str], int, float]]:
+    """テンプレート一覧 [(名前, 説明, 明細数, 合計金額)]"""
+    item = EstimateTemplateItem
+    return [
+        (name, description, count, float(total or 0))
+        for name, description, count, total in db.execute(
+            select(
+                EstimateTemplate.template_name,
+                EstimateTemplate.description,
+                func.count(item.item_id),
+                func.sum(item.quantity * item.unit_price),
+            )
+            .outerjoin(item, item.template_id == EstimateTemplate.template_id)
+            .group_by(EstimateTemplate.template_id, EstimateTemplate.template_name, EstimateTemplate.description)
+            .order_by(EstimateTemplate.template_name)
+        )
+    ]
+
+
+def parse_item_lines(text: str) -> tuple[list[dict], list[str]]:
+    """貼り付けた明細（1行1明細）を解析して (明細, エラー) を返す
+
+    区切りはタブ（スプレッドシートから貼り付け）、| またはカンマ:
+        項目名, 単価
+        項目名, 数量, 単価
+        項目名, 数量, 単位, 単価
+    カンマ区切りの場合、金額に桁区切りのカンマは使えない。
+    """
+    items = []
+    errors = []
+    for line_no, line in enumerate(text.splitlines(), start=1):
+        line = line.strip()
+        if not line:
+            continue
+        if "\t" in line:
+            fields = line.split("\t")
+        elif "|" in line:
+            fields = line.split("|")
+        else:
+            fields = re.split(r"[,，、]", line)
+        fields = [f.strip() for f in fields]
+
+        if len(fields) not in (2, 3, 4):
+            errors.append(f"{line_no}行目: 項目名, 数量, 単位, 単価 の形式で入力してください")
+            continue
+        name, price = fields[0], fields[-1]
+        quantity = fields[1] if len(fields) >= 3 else ""
+        unit = fields[2] if len(fields) == 4 else ""
+        if not name:
+            errors.append(f"{line_no}行目: 項目名がありません")
+            continue
+        try:
+            quantity_value = float(_NUMBER.sub("", quantity) or 1)
+            price_value = float(_NUMBER.sub("", price))
+        except ValueError:
+            errors.append(f"{line_no}行目: 数量・単価は数値で入力してください")
+            continue
+
+        items.append({
+            "item_name": name[:255],
+            "quantity": quantity_value,
+            "unit": unit[:50] or "式",
+            "unit_price": price_value,
+        })
+    return items, errors
@@ -1,22 +1,40 @@
-"""見積サービス"""
+"""見積サービス
+
+よく使う検索はモジュール読み込み時に組み立てた文にパラメータだけを渡して実行する。
+"""
 from typing import Optional
-from crm_core import get_db, Project, EstimateItem
+from sqlalchemy import bindparam, select
+from crm_core import get_db, Project, EstimateItem, ProjectRow, EstimateItemRow
+
+from .bulk import (
+    recompute_estimate_total,
+    insert_estimate_items,
+    apply_template_items,
+    save_template_from_project,
+    list_templates,
+)
+
+_PROJECT_ROW_BY_ID = ProjectRow.select().where(Project.project_id == bindparam("project_id"))
+_ITEM_BY_ID = select(EstimateItem).where(EstimateItem.item_id == bindparam("item_id"))
+_ITEMS_BY_PROJECT = (
+    EstimateItemRow.select()
+    .where(EstimateItem.project_id == bindparam("project_id"))
+    .order_by(EstimateItem.sort_order)
+)
 
 
 class EstimateService:
     """見積管理サービス"""
 
     @staticmethod
-    def get_estimate(project_id: int) -> tuple[Optional[Project], list[EstimateItem]]:
+    def get_estimate(project_id: int) -> tuple[Optional[ProjectRow], list[EstimateItemRow]]:
         """案件の見積を取得"""
         with get_db() as db:
-            project = db.query(Project).filter(Project.project_id == project_id).first()
-            if not project:
+            row = db.execute(_PROJECT_ROW_BY_ID, {"project_id": project_id}).first()
+            if row is None:
                 return None, []
-            items = db.query(EstimateItem).filter(
-                EstimateItem.project_id == project_id
-            ).order_by(EstimateItem.sort_order).all()
-            return project, items
+            items = db.execute(_ITEMS_BY_PROJECT, {"project_id": project_id})
+            return ProjectRow(*row), [EstimateItemRow(*item) for item in items]
 
     @staticmethod
     def add_item(
@@ -26,7 +44,7 @@ class EstimateService:
         quantity: float = 1,
         unit: str = "式",
         description: str = ""
-    ) -> EstimateItem:
+    ) -> EstimateItemRow:
         """見積明細を追加"""
         with get_db() as db:
             item = EstimateItem(
@@ -41,23 +59,15 @@ class EstimateService:
             db.flush()
 
             # 見積総額を更新
-            total = sum(
-                float(i.quantity) * float(i.unit_price)
-                for i in db.query(EstimateItem).filter(
-                    EstimateItem.project_id == project_id
-                ).all()
-            )
-            project = db.query(Project).filter(Project.project_id == project_id).first()
-            if project:
-                project.estimated_amount = total
+            recompute_estimate_total(db, project_id)
 
-            return item
+            return EstimateItemRow.from_instance(item)
 
     @staticmethod
     def delete_item(item_id: int) -> tuple[bool, float]:
         """見積明細を削除し、新しい合計を返す"""
         with get_db() as db:
-            item = db.query(EstimateItem).filter(EstimateItem.item_id == item_id).first()
+            item = db.scalar(_ITEM_BY_ID, {"item_id": item_id})
             if not item:
                 return False, 0
 
@@ -66,14 +76,7 @@ class EstimateService:
             db.flush()
 
             # 見積総額を再計算
-            remaining = db.query(EstimateItem).filter(
-                EstimateItem.project_id == project_id
-            ).all()
-            total = sum(float(i.quantity) * float(i.unit_price) for i in remaining)
-
-            project = db.query(Project).filter(Project.project_id == project_id).first()
-            if project:
-                project.estimated_amount = total
+            total = recompute_estimate_total(db, project_id)
 
             return True, total
 
@@ -81,7 +84,31 @@ class EstimateService:
     def calculate_total(project_id: int) -> float:
         """見積合計を計算"""
         with get_db() as db:
-            items = db.query(EstimateItem).filter(
-                EstimateItem.project_id == project_id
-            ).all()
+            items = db.execute(_ITEMS_BY_PROJECT, {"project_id": project_id})
             return sum(float(i.quantity) * float(i.unit_price) for i in items)
+
+    @staticmethod
+    def add_items(project_id: int, items: list[dict]) -> tuple[int, float]:
+        """見積明細をまとめて追加し、(追加件数, 新しい合計) を返す"""
+        with get_db() as db:
+            count = insert_estimate_items(db, project_id, items)
+            return count, recompute_estimate_total(db, project_id)
+
+    @staticmethod
+    def apply_template(project_id: int, template_name: str) -> tuple[int, float]:
+        """テンプレートの明細を案件に追加し、(追加件数, 新しい合計) を返す"""
+        with get_db() as db:
+            count = apply_template_items(db, project_id, template_name)
+            return count, recompute_estimate_total(db, project_id)
+
+    @staticmethod
+    def save_template(project_id: int, template_name: str, description: str = "") -> int:
+        """案件の見積明細をテンプレートとして保存し、明細数を返す"""
+        with get_db() as db:
+            return save_template_from_project(db, project_id, template_name, description)
+
+    @staticmethod
+    def get_templates() -> list[tuple[str, Optional[str], int, float]]:
+        """テンプレート一覧 [(名前, 説明, 明細数, 合計金額)]"""
+        with get_db() as db:
+            return list_templates(db)
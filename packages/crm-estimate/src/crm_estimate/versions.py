@@ -0,0 +1,210 @@
+"""見積の版管理
+
+クライアントに見積を提出するたびに明細の版を保存する。各版は前の版からの
+差分だけを1行に持ち、SNAPSHOT_INTERVAL 版ごとに全明細を持つ版（スナップショット）を挟む。
+
+- 一覧・前の版との差分表示: 各版の1行だけを読む
+- 版の明細の復元: 直前のスナップショットから対象の版までの行（最大 SNAPSHOT_INTERVAL 行）を
+  1クエリで読み、差分を順に適用する
+"""
+import json
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+from crm_core import EstimateItem, EstimateVersion, reindex_project
+
+from .bulk import recompute_estimate_total
+
+SNAPSHOT_INTERVAL = 10
+
+# 明細の行: [item_id, 項目名, 数量, 単位, 単価, 並び順, 説明]
+_ID, _NAME, _QUANTITY, _UNIT, _PRICE, _SORT, _DESCRIPTION = range(7)
+
+
+@dataclass(frozen=True)
+class VersionDiff:
+    """2つの版の差分"""
+    added: list
+    changed: list  # [(旧, 新)]
+    removed: list
+
+
+def item_amount(row: list) -> float:
+    return row[_QUANTITY] * row[_PRICE]
+
+
+def current_items(db: Session, project_id: int) -> list[list]:
+    """案件の現在の明細を行リストで取得"""
+    rows = db.execute(
+        select(
+            EstimateItem.item_id,
+            EstimateItem.item_name,
+            EstimateItem.quantity,
+            EstimateItem.unit,
+            EstimateItem.unit_price,
+            EstimateItem.sort_order,
+            EstimateItem.description,
+        )
+        .where(EstimateItem.project_id == project_id)
+        .order_by(func.coalesce(EstimateItem.sort_order, 0), EstimateItem.item_id)
+    ).all()
+    return [
+        [item_id, name, float(quantity or 0), unit or "", float(price or 0), sort_order or 0, description or ""]
+        for item_id, name, quantity, unit, price, sort_order, description in rows
+    ]
+
+
+def diff_items(old: list[list], new: list[list]) -> VersionDiff:
+    """明細の差分（item_id で対応付け）"""
+    old_by_id = {row[_ID]: row for row in old}
+    new_by_id = {row[_ID]: row for row in new}
+    return VersionDiff(
+        added=[row for row in new if row[_ID] not in old_by_id],
+        changed=[
+            (old_by_id[row[_ID]], row) for row in new
+            if row[_ID] in old_by_id and old_by_id[row[_ID]] != row
+        ],
+        removed=[row for row in old if row[_ID] not in new_by_id],
+    )
+
+
+def _apply(items: dict, changes: dict) -> None:
+    for row in changes.get("a", ()):
+        items[row[_ID]] = row
+    for _, row in changes.get("c", ()):
+        items[row[_ID]] = row
+    for row in changes.get("r", ()):
+        items.pop(row[_ID], None)
+
+
+def _sorted(items) -> list[list]:
+    return sorted(items, key=lambda row: (row[_SORT], row[_ID]))
+
+
+def version_items(db: Session, project_id: int, version_no: int) -> Optional[list[list]]:
+    """版の明細を復元（版がなければNone）"""
+    base = select(func.max(EstimateVersion.version_no)).where(
+        EstimateVersion.project_id == project_id,
+        EstimateVersion.is_snapshot.is_(True),
+        EstimateVersion.version_no <= version_no,
+    ).scalar_subquery()
+    rows = db.execute(
+        select(EstimateVersion.version_no, EstimateVersion.changes)
+        .where(
+            EstimateVersion.project_id == project_id,
+            EstimateVersion.version_no.between(base, version_no),
+        )
+        .order_by(EstimateVersion.version_no)
+    ).all()
+    if not rows or rows[-1].version_no != version_no:
+        return None
+
+    items: dict = {}
+    for _, changes in rows:
+        _apply(items, json.loads(changes))
+    return _sorted(items.values())
+
+
+def get_version(db: Session, project_id: int, version_no: int) -> Optional[EstimateVersion]:
+    """版の1行を取得"""
+    return db.execute(
+        select(EstimateVersion).where(
+            EstimateVersion.project_id == project_id,
+            EstimateVersion.version_no == version_no,
+        )
+    ).scalar_one_or_none()
+
+
+def list_versions(db: Session, project_id: int) -> list[EstimateVersion]:
+    """案件の版一覧（新しい順）"""
+    return db.execute(
+        select(EstimateVersion)
+        .where(EstimateVersion.project_id == project_id)
+        .order_by(EstimateVersion.version_no.desc())
+    ).scalars().all()
+
+
+def stored_diff(version: EstimateVersion) -> VersionDiff:
+    """版に保存された前の版からの差分（スナップショット版は全明細が追加扱い）"""
+    changes = json.loads(version.changes)
+    return VersionDiff(
+        added=changes.get("a", []),
+        changed=[tuple(pair) for pair in changes.get("c", [])],
+        removed=changes.get("r", []),
+    )
+
+
+def create_version(
+    db: Session, project_id: int, note: str = "", created_by: Optional[str] = None
+) -> Optional[EstimateVersion]:
+    """現在の明細を新しい版として保存（前の版から変更がなければNone）"""
+    latest = db.execute(
+        select(EstimateVersion.version_no)
+        .where(EstimateVersion.project_id == project_id)
+        .order_by(EstimateVersion.version_no.desc())
+        .limit(1)
+        .with_for_update()
+    ).scalar()
+    items = current_items(db, project_id)
+
+    version_no = (latest or 0) + 1
+    is_snapshot = latest is None or (version_no - 1) % SNAPSHOT_INTERVAL == 0
+    previous = version_items(db, project_id, latest) if latest else []
+    diff = diff_items(previous, items)
+    if latest and not (diff.added or diff.changed or diff.removed):
+        return None
+
+    if is_snapshot:
+        changes = {"a": items}
+    else:
+        changes = {"a": diff.added, "c": diff.changed, "r": diff.removed}
+        changes = {key: value for key, value in changes.items() if value}
+
+    version = EstimateVersion(
+        project_id=project_id,
+        version_no=version_no,
+        is_snapshot=is_snapshot,
+        changes=json.dumps(changes, ensure_ascii=False, separators=(",", ":")),
+        total_amount=sum(item_amount(row) for row in items),
+        item_count=len(items),
+        added_count=len(diff.added),
+        changed_count=len(diff.changed),
+        removed_count=len(diff.removed),
+        note=note,
+        created_by=created_by,
+    )
+    db.add(version)
+    db.flush()
+    return version
+
+
+def restore_version(
+    db: Session, project_id: int, version_no: int, created_by: Optional[str] = None
+) -> tuple[Optional[EstimateVersion], float]:
+    """版の明細に戻し、復元後の状態を新しい版として保存して (版, 見積総額) を返す"""
+    items = version_items(db, project_id, version_no)
+    if items is None:
+        raise ValueError(f"版 v{version_no} が見つかりません")
+
+    # 明細IDも元に戻すため、版の間で同じ明細として差分が取れる
+    db.execute(delete(EstimateItem).where(EstimateItem.project_id == project_id))
+    if items:
+        db.execute(insert(EstimateItem).values([
+            {
+                "item_id": row[_ID],
+                "project_id": project_id,
+                "item_name": row[_NAME],
+                "quantity": row[_QUANTITY],
+                "unit": row[_UNIT],
+                "unit_price": row[_PRICE],
+                "sort_order": row[_SORT],
+                "description": row[_DESCRIPTION],
+            }
+            for row in items
+        ]))
+    reindex_project(db, project_id)
+    total = recompute_estimate_total(db, project_id)
+    version = create_version(db, project_id, note=f"v{version_no} から復元", created_by=created_by)
+    return version, total
@@ -1,9 +1,18 @@
 """Redmine連携サービス"""
 from datetime import datetime
 from typing import Optional
+from sqlalchemy import bindparam, select
 from crm_core import get_db, Task, RedmineConfig
 from .client import RedmineClient
 
+# 呼び出しごとに組み立て直さないよう、検索文はモジュールで1回だけ作る
+_TASK_BY_ID = select(Task).where(Task.task_id == bindparam("task_id"))
+_CONFIG_BY_PROJECT = select(RedmineConfig).where(RedmineConfig.project_id == bindparam("project_id"))
+_UNSYNCED_TASKS = select(Task).where(
+    Task.project_id == bindparam("project_id"),
+    Task.redmine_issue_id.is_(None),
+)
+
 
 class RedmineService:
     """Redmine連携サービス"""
@@ -27,9 +36,7 @@ class RedmineService:
             return False, f"プロジェクト '{redmine_project_id}' が見つかりません"
 
         with get_db() as db:
-            config = db.query(RedmineConfig).filter(
-                RedmineConfig.project_id == project_id
-            ).first()
+            config = db.scalar(_CONFIG_BY_PROJECT, {"project_id": project_id})
 
             if config:
                 config.redmine_url = redmine_url
@@ -51,13 +58,11 @@ class RedmineService:
     def sync_task(task_id: int) -> tuple[bool, str, Optional[int]]:
         """タスクをRedmineに同期"""
         with get_db() as db:
-            task = db.query(Task).filter(Task.task_id == task_id).first()
+            task = db.scalar(_TASK_BY_ID, {"task_id": task_id})
             if not task:
                 return False, "タスクが見つかりません", None
 
-            config = db.query(RedmineConfig).filter(
-                RedmineConfig.project_id == task.project_id
-            ).first()
+            config = db.scalar(_CONFIG_BY_PROJECT, {"project_id": task.project_id})
             if not config:
                 return False, "Redmine連携が設定されていません", None
 
@@ -84,16 +89,11 @@ class RedmineService:
         """案件の全タスクをRedmineに同期"""
         results = []
         with get_db() as db:
-            config = db.query(RedmineConfig).filter(
-                RedmineConfig.project_id == project_id
-            ).first()
+            config = db.scalar(_CONFIG_BY_PROJECT, {"project_id": project_id})
             if not config:
                 return [("", False, "Redmine連携が設定されていません")]
 
-            tasks = db.query(Task).filter(
-                Task.project_id == project_id,
-                Task.redmine_issue_id.is_(None)
-            ).all()
+            tasks = db.scalars(_UNSYNCED_TASKS, {"project_id": project_id}).all()
 
             if not tasks:
                 return [("", False, "同期対象のタスクがありません")]
@@ -1,4 +1,53 @@
 """CRM Schedule - Milestone and task management"""
 from .service import ScheduleService, TaskService
+from .critical_path import (
+    CriticalPath,
+    TaskTiming,
+    CyclicDependencyError,
+    compute_critical_path,
+    get_critical_path,
+    invalidate_critical_path,
+)
+from .capacity import CapacityPlan, allocate_capacity, get_capacity_plan
+from .burndown import BurnSeries, build_burn_series, get_burn_series, sparkline
+from .deadlines import DeadlineItem, scan_deadlines, mark_delayed_milestones, group_by_assignee
+from .timesheet import HoursRow, aggregate_hours, period_bounds, period_start
+from .time_partitions import CompactionResult, ensure_partitions, compact_time_entries, worked_hours
+from .timers import TimerState, StoppedTimer, record_time, start_timer, stop_timer, touch_timer, load_timers
 
-__all__ = ["ScheduleService", "TaskService"]
+__all__ = [
+    "ScheduleService",
+    "TaskService",
+    "CriticalPath",
+    "TaskTiming",
+    "CyclicDependencyError",
+    "compute_critical_path",
+    "get_critical_path",
+    "invalidate_critical_path",
+    "CapacityPlan",
+    "allocate_capacity",
+    "get_capacity_plan",
+    "BurnSeries",
+    "build_burn_series",
+    "get_burn_series",
+    "sparkline",
+    "DeadlineItem",
+    "scan_deadlines",
+    "mark_delayed_milestones",
+    "group_by_assignee",
+    "HoursRow",
+    "aggregate_hours",
+    "period_bounds",
+    "period_start",
+    "CompactionResult",
+    "ensure_partitions",
+    "compact_time_entries",
+    "worked_hours",
+    "TimerState",
+    "StoppedTimer",
+    "record_time",
+    "start_timer",
+    "stop_timer",
+    "touch_timer",
+    "load_timers",
+]
@@ -0,0 +1,231 @@
+"""バーンダウン・バーンアップ系列
+
+案件ごとに「日ごとの実績工数」と「日ごとに追加された見積工数」を日次配列として
+project_burn_series に保存し、表示時は累積和を取るだけにする。
+
+- 作成: 工数記録（work_date、圧縮済みの日次ロールアップを含む）とタスク（作成日・見積工数）を
+  日付で集計する1クエリ（UNION ALL）から作る
+- 工数記録・タスク追加: Session の flush で検知して該当日の値だけを加算（増分更新）
+- 見積工数の変更・工数記録の修正や削除: 系列を破棄し、次の表示時に作り直す
+"""
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import delete, event, func, inspect, literal, select, union_all, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from crm_core import get_db, ProjectBurnSeries, Task, TimeEntry
+from .time_partitions import worked_hours
+
+_SPARK_CHARS = "▁▂▃▄▅▆▇█"
+_DTYPE = np.float32
+
+# 変更されたら系列を作り直す属性
+_TASK_SCOPE_ATTRS = ("project_id", "estimated_hours", "created_at")
+_TIME_ENTRY_ATTRS = ("project_id", "hours", "work_date")
+
+
+@dataclass(frozen=True)
+class BurnSeries:
+    """案件の日次系列（start_date から1日ずつ）"""
+    project_id: int
+    start_date: date
+    done: np.ndarray   # 日ごとの実績工数
+    scope: np.ndarray  # 日ごとに追加された見積工数
+
+    @property
+    def days(self) -> np.ndarray:
+        return np.datetime64(self.start_date, "D") + np.arange(len(self.done))
+
+    @property
+    def burnup(self) -> np.ndarray:
+        """累積実績工数"""
+        return np.cumsum(self.done, dtype=float)
+
+    @property
+    def total_scope(self) -> np.ndarray:
+        """累積見積工数"""
+        return np.cumsum(self.scope, dtype=float)
+
+    @property
+    def burndown(self) -> np.ndarray:
+        """残工数（見積 − 実績、0未満は0）"""
+        return np.clip(self.total_scope - self.burnup, 0, None)
+
+
+# ======================
+# 作成・取得
+# ======================
+def build_burn_series(db: Session, project_id: int) -> Optional[BurnSeries]:
+    """工数記録とタスクを日付で集計して系列を作成（データがなければNone）"""
+    task_day = func.date(Task.created_at)
+    worked = worked_hours(project_id=project_id)
+    rows = db.execute(union_all(
+        select(
+            worked.c.work_date.label("day"),
+            func.sum(worked.c.hours).label("done"),
+            literal(0).label("scope"),
+        ).group_by(worked.c.work_date),
+        select(
+            task_day.label("day"),
+            literal(0).label("done"),
+            func.sum(Task.estimated_hours).label("scope"),
+        ).where(Task.project_id == project_id).group_by(task_day),
+    )).all()
+
+    dated = [(_as_date(day), float(done or 0), float(scope or 0)) for day, done, scope in rows]
+    known = [day for day, _, _ in dated if day is not None]
+    if not known:
+        return None
+
+    start = min(known)
+    length = (max(known) - start).days + 1
+    offsets = np.array([(day - start).days if day else 0 for day, _, _ in dated])
+    done = np.zeros(length, dtype=_DTYPE)
+    scope = np.zeros(length, dtype=_DTYPE)
+    np.add.at(done, offsets, np.array([d for _, d, _ in dated], dtype=_DTYPE))
+    np.add.at(scope, offsets, np.array([s for _, _, s in dated], dtype=_DTYPE))
+    return BurnSeries(project_id, start, done, scope)
+
+
+def get_burn_series(project_id: int, until: Optional[date] = None) -> Optional[BurnSeries]:
+    """保存済みの系列を取得（なければ作成して保存）。until（既定は今日）まで0で延長する"""
+    with get_db() as db:
+        row = db.get(ProjectBurnSeries, project_id)
+        if row is not None:
+            series = BurnSeries(
+                project_id,
+                row.start_date,
+                np.frombuffer(row.done_hours, dtype=_DTYPE),
+                np.frombuffer(row.scope_hours, dtype=_DTYPE),
+            )
+        else:
+            series = build_burn_series(db, project_id)
+            if series is None:
+                return None
+
+    if row is None:
+        try:
+            with get_db() as db:
+                db.add(ProjectBurnSeries(
+                    project_id=project_id,
+                    start_date=series.start_date,
+                    done_hours=series.done.tobytes(),
+                    scope_hours=series.scope.tobytes(),
+                ))
+        except IntegrityError:
+            pass  # 同時に作成された（作成済みの系列をそのまま使う）
+
+    length = ((until or date.today()) - series.start_date).days + 1
+    if length > len(series.done):
+        pad = length - len(series.done)
+        series = BurnSeries(
+            project_id,
+            series.start_date,
+            np.pad(series.done, (0, pad)),
+            np.pad(series.scope, (0, pad)),
+        )
+    return series
+
+
+def sparkline(values, width: int = 24) -> str:
+    """値の推移をテキストのスパークラインにする（width点に間引き）"""
+    values = np.asarray(values, dtype=float)
+    if not len(values):
+        return ""
+    if len(values) > width:
+        values = values[np.linspace(0, len(values) - 1, width).round().astype(int)]
+    low, high = values.min(), values.max()
+    if high - low < 1e-9:
+        return _SPARK_CHARS[0] * len(values)
+    levels = ((values - low) / (high - low) * (len(_SPARK_CHARS) - 1)).round().astype(int)
+    return "".join(_SPARK_CHARS[i] for i in levels)
+
+
+# ======================
+# 増分更新
+# ======================
+def _as_date(value) -> Optional[date]:
+    """func.date() の結果（SQLiteでは文字列）を date にする"""
+    if value is None or isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _add_to_series(connection, project_id: int, day: date, done: float, scope: float) -> None:
+    """保存済みの系列の1日分に加算（未作成なら何もしない）"""
+    table = ProjectBurnSeries.__table__
+    row = connection.execute(
+        select(table.c.start_date, table.c.done_hours, table.c.scope_hours)
+        .where(table.c.project_id == project_id)
+        .with_for_update()
+    ).first()
+    if row is None:
+        return
+
+    start = row.start_date
+    done_hours = np.frombuffer(row.done_hours, dtype=_DTYPE)
+    scope_hours = np.frombuffer(row.scope_hours, dtype=_DTYPE)
+    if day < start:
+        pad = (start - day).days
+        done_hours = np.pad(done_hours, (pad, 0))
+        scope_hours = np.pad(scope_hours, (pad, 0))
+        start = day
+    index = (day - start).days
+    if index >= len(done_hours):
+        pad = index - len(done_hours) + 1
+        done_hours = np.pad(done_hours, (0, pad))
+        scope_hours = np.pad(scope_hours, (0, pad))
+    else:
+        done_hours = done_hours.copy()
+        scope_hours = scope_hours.copy()
+    done_hours[index] += done
+    scope_hours[index] += scope
+
+    connection.execute(
+        update(table).where(table.c.project_id == project_id).values(
+            start_date=start,
+            done_hours=done_hours.tobytes(),
+            scope_hours=scope_hours.tobytes(),
+        )
+    )
+
+
+def _changed(obj, names) -> bool:
+    attrs = inspect(obj).attrs
+    return any(attrs[name].history.has_changes() for name in names)
+
+
+@event.listens_for(Session, "after_flush")
+def _update_burn_series(session, flush_context):
+    """工数記録・タスクの追加は増分で加算し、それ以外の変更は系列を破棄"""
+    additions = []  # (project_id, day, done, scope)
+    stale = set()
+    for obj in session.new:
+        if isinstance(obj, TimeEntry):
+            additions.append((obj.project_id, obj.work_date, float(obj.hours or 0), 0.0))
+        elif isinstance(obj, Task) and obj.estimated_hours:
+            day = obj.created_at.date() if obj.created_at else date.today()
+            additions.append((obj.project_id, day, 0.0, float(obj.estimated_hours)))
+    for obj in session.deleted:
+        if isinstance(obj, (TimeEntry, Task)):
+            stale.add(obj.project_id)
+    for obj in session.dirty:
+        names = _TIME_ENTRY_ATTRS if isinstance(obj, TimeEntry) else _TASK_SCOPE_ATTRS
+        if isinstance(obj, (TimeEntry, Task)) and _changed(obj, names):
+            stale.add(obj.project_id)
+            stale.update(inspect(obj).attrs.project_id.history.deleted or ())
+
+    stale.discard(None)
+    additions = [a for a in additions if a[0] is not None and a[0] not in stale]
+    if not stale and not additions:
+        return
+
+    connection = session.connection()
+    if stale:
+        table = ProjectBurnSeries.__table__
+        connection.execute(delete(table).where(table.c.project_id.in_(stale)))
+    for project_id, day, done, scope in additions:
+        _add_to_series(connection, project_id, day, done, scope)
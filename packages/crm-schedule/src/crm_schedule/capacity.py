@@ -0,0 +1,182 @@
+"""案件横断の稼働計画（キャパシティ）
+
+全案件の未完了タスクの残工数（見積工数 − 実績工数）を、開始日〜期限の営業日に
+均等に割り付け、営業日 × 案件 の行列にする。1日の稼働上限を超える日を過負荷とする。
+
+割り付けはタスク単位・日単位のループを使わず、差分配列（開始日に+、終了翌日に−）への
+np.add.at と累積和で全タスクを一度に計算する（O(タスク数 + 日数 × 案件数)）。
+
+- 開始日が未設定・過去のタスクは今日から
+- 期限切れのタスクは残工数をすべて今日に計上
+- 期限が未設定のタスクは開始日から1日の稼働上限で消化する前提で終了日を決める
+"""
+import os
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import select
+from crm_core import get_db, Project, Task
+
+from .critical_path import WORKING_HOURS_PER_DAY
+
+# 1日の稼働上限（時間）
+DAILY_CAPACITY_HOURS = float(os.environ.get("CRM_DAILY_CAPACITY_HOURS", str(WORKING_HOURS_PER_DAY)))
+
+# 完了・失注・キャンセルの案件は対象外
+CLOSED_PROJECT_STATUSES = (9, 10, 11)
+
+
+@dataclass(frozen=True)
+class CapacityPlan:
+    """営業日 × 案件 の稼働計画"""
+    days: np.ndarray          # datetime64[D]（営業日のみ）
+    project_ids: np.ndarray   # int
+    project_names: list[str]
+    hours: np.ndarray         # shape = (日数, 案件数)
+    capacity: float
+
+    @property
+    def daily_totals(self) -> np.ndarray:
+        return self.hours.sum(axis=1)
+
+    @property
+    def overbooked(self) -> np.ndarray:
+        """稼働上限を超える日のマスク"""
+        return self.daily_totals > self.capacity + 1e-9
+
+    def overbooked_days(self) -> list[tuple[date, float]]:
+        """過負荷日と合計時間"""
+        mask = self.overbooked
+        return [
+            (day.astype(date), float(total))
+            for day, total in zip(self.days[mask], self.daily_totals[mask])
+        ]
+
+    def weekly(self) -> list[dict]:
+        """週（月曜始まり）ごとの集計"""
+        if not len(self.days):
+            return []
+        # 1970-01-01 は木曜日なので3日ずらして月曜始まりの週番号にする
+        week_index = (self.days.astype("int64") + 3) // 7
+        weeks, inverse = np.unique(week_index, return_inverse=True)
+        totals = np.zeros((len(weeks), self.hours.shape[1]))
+        np.add.at(totals, inverse, self.hours)
+        business_days = np.bincount(inverse, minlength=len(weeks))
+        overbooked_days = np.bincount(inverse, weights=self.overbooked, minlength=len(weeks))
+
+        result = []
+        for i, week in enumerate(weeks):
+            start = np.datetime64(int(week) * 7 - 3, "D").astype(date)
+            result.append({
+                "week_start": start,
+                "hours": float(totals[i].sum()),
+                "capacity": float(business_days[i] * self.capacity),
+                "overbooked_days": int(overbooked_days[i]),
+                "by_project": {
+                    self.project_names[j]: float(totals[i, j])
+                    for j in np.flatnonzero(totals[i] > 0)
+                },
+            })
+        return result
+
+
+def allocate_capacity(
+    project_idx: np.ndarray,
+    remaining: np.ndarray,
+    start: np.ndarray,
+    end: np.ndarray,
+    n_projects: int,
+    today: np.datetime64,
+    capacity: float = DAILY_CAPACITY_HOURS,
+    holidays: Optional[list] = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """残工数を営業日に均等割り付けした (営業日, 時間行列) を返す
+
+    project_idx: タスクの案件列番号
+    remaining: 残工数（時間）
+    start, end: 開始日・期限（datetime64[D]、未設定は NaT）
+    """
+    holidays = holidays or []
+    today = np.busday_offset(today, 0, roll="forward", holidays=holidays)
+
+    start = np.where(np.isnat(start) | (start < today), today, start)
+    start = np.busday_offset(start, 0, roll="forward", holidays=holidays)
+
+    # 期限未設定: 開始日から上限いっぱいで消化した場合の終了日
+    needed_days = np.maximum(np.ceil(remaining / capacity), 1).astype("int64")
+    default_end = np.busday_offset(start, needed_days - 1, holidays=holidays)
+    end = np.where(np.isnat(end), default_end, end)
+    end = np.busday_offset(end, 0, roll="backward", holidays=holidays)
+    end = np.maximum(end, start)  # 期限切れ・開始日より前の期限は開始日1日に集約
+
+    # 今日を0とした営業日番号（終了は排他的）
+    first = np.busday_count(today, start, holidays=holidays)
+    last = np.busday_count(today, end, holidays=holidays) + 1
+    per_day = remaining / (last - first)
+
+    n_days = int(last.max()) if len(last) else 0
+    diff = np.zeros((n_days + 1, n_projects))
+    np.add.at(diff, (first, project_idx), per_day)
+    np.add.at(diff, (last, project_idx), -per_day)
+    hours = np.cumsum(diff[:-1], axis=0)
+
+    days = np.busday_offset(today, np.arange(n_days), holidays=holidays)
+    return days, hours
+
+
+def get_capacity_plan(
+    capacity: float = DAILY_CAPACITY_HOURS,
+    today: Optional[date] = None,
+    holidays: Optional[list] = None,
+) -> CapacityPlan:
+    """全案件の未完了タスクから稼働計画を作成"""
+    with get_db() as db:
+        rows = db.execute(
+            select(
+                Task.project_id,
+                Project.project_name,
+                Task.estimated_hours,
+                Task.actual_hours,
+                Task.start_date,
+                Task.due_date,
+            )
+            .join(Project, Project.project_id == Task.project_id)
+            .where(
+                Task.status != "done",
+                Task.estimated_hours > 0,
+                Project.status_id.notin_(CLOSED_PROJECT_STATUSES),
+            )
+        ).all()
+
+    names = {}
+    for project_id, project_name, *_ in rows:
+        names.setdefault(project_id, project_name)
+    project_ids = np.array(sorted(names), dtype="int64")
+
+    if rows:
+        columns = list(zip(*rows))
+        estimated = np.array(columns[2], dtype=float)
+        actual = np.array([h or 0 for h in columns[3]], dtype=float)
+        remaining = np.clip(estimated - actual, 0, None)
+        keep = remaining > 0
+        project_idx = np.searchsorted(project_ids, np.array(columns[0], dtype="int64"))
+        start = np.array(columns[4], dtype="datetime64[D]")
+        end = np.array(columns[5], dtype="datetime64[D]")
+        days, hours = allocate_capacity(
+            project_idx[keep], remaining[keep], start[keep], end[keep],
+            len(project_ids), np.datetime64(today or date.today(), "D"),
+            capacity, holidays,
+        )
+    else:
+        days = np.array([], dtype="datetime64[D]")
+        hours = np.zeros((0, 0))
+
+    return CapacityPlan(
+        days=days,
+        project_ids=project_ids,
+        project_names=[names[pid] for pid in project_ids.tolist()],
+        hours=hours,
+        capacity=capacity,
+    )
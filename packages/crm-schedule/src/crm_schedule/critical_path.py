@@ -0,0 +1,235 @@
+"""クリティカルパス計算
+
+案件のタスクと依存関係（task_dependencies）を1クエリで読み込み、
+見積工数（estimated_hours）から各タスクの最早・最遅開始、余裕（スラック）と
+クリティカルパスをトポロジカル順の前進・後退計算で求める（O(V+E)）。
+
+計算結果は案件ごとにキャッシュし、タスク・依存関係の追加・変更・削除を
+Session の flush で検知して破棄する（Query.update() などの一括更新は検知しないため、
+その場合は invalidate_critical_path() を呼ぶこと）。
+"""
+import os
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+from crm_core import get_db, Task, TaskDependency
+
+# 1日あたりの稼働時間（工数→日数の換算）
+WORKING_HOURS_PER_DAY = float(os.environ.get("CRM_WORKING_HOURS_PER_DAY", "8"))
+
+# 変更されたらキャッシュを破棄するタスクの属性
+_TASK_GRAPH_ATTRS = ("project_id", "task_name", "estimated_hours", "status")
+
+
+@dataclass(frozen=True)
+class TaskTiming:
+    """タスクの日程（時間は案件開始からの稼働時間）"""
+    task_id: int
+    task_name: str
+    status: str
+    duration: float
+    earliest_start: float
+    earliest_finish: float
+    latest_start: float
+    latest_finish: float
+
+    @property
+    def slack(self) -> float:
+        return self.latest_start - self.earliest_start
+
+    @property
+    def is_critical(self) -> bool:
+        return self.slack <= 1e-9
+
+
+@dataclass(frozen=True)
+class CriticalPath:
+    """案件のクリティカルパス計算結果"""
+    project_id: int
+    timings: dict[int, TaskTiming]
+    path: list[int]  # クリティカルパス上のタスクID（着手順）
+    total_hours: float
+    hours_per_day: float
+
+    @property
+    def total_days(self) -> float:
+        return self.total_hours / self.hours_per_day
+
+    def critical_tasks(self) -> list[TaskTiming]:
+        return [self.timings[task_id] for task_id in self.path]
+
+
+class CyclicDependencyError(ValueError):
+    """依存関係が循環している"""
+
+
+def compute_critical_path(
+    project_id: int,
+    tasks: dict[int, tuple[str, str, float]],
+    edges: list[tuple[int, int]],
+    hours_per_day: float = WORKING_HOURS_PER_DAY,
+) -> CriticalPath:
+    """タスクと依存関係からクリティカルパスを計算
+
+    tasks: {task_id: (task_name, status, 所要時間)}
+    edges: [(先行タスクID, 後続タスクID)]
+    """
+    successors: dict[int, list[int]] = {task_id: [] for task_id in tasks}
+    predecessors: dict[int, list[int]] = {task_id: [] for task_id in tasks}
+    for before, after in edges:
+        if before in tasks and after in tasks:
+            successors[before].append(after)
+            predecessors[after].append(before)
+
+    # トポロジカルソート（Kahn）
+    indegree = {task_id: len(preds) for task_id, preds in predecessors.items()}
+    queue = deque(sorted(task_id for task_id, n in indegree.items() if n == 0))
+    order = []
+    while queue:
+        task_id = queue.popleft()
+        order.append(task_id)
+        for succ in successors[task_id]:
+            indegree[succ] -= 1
+            if indegree[succ] == 0:
+                queue.append(succ)
+    if len(order) != len(tasks):
+        cyclic = sorted(task_id for task_id, n in indegree.items() if n > 0)
+        raise CyclicDependencyError(f"依存関係が循環しています: {cyclic[:10]}")
+
+    # 前進計算: 最早開始・最早終了
+    duration = {task_id: tasks[task_id][2] for task_id in tasks}
+    es = {}
+    ef = {}
+    for task_id in order:
+        es[task_id] = max((ef[p] for p in predecessors[task_id]), default=0.0)
+        ef[task_id] = es[task_id] + duration[task_id]
+    total = max(ef.values(), default=0.0)
+
+    # 後退計算: 最遅終了・最遅開始
+    lf = {}
+    ls = {}
+    for task_id in reversed(order):
+        lf[task_id] = min((ls[s] for s in successors[task_id]), default=total)
+        ls[task_id] = lf[task_id] - duration[task_id]
+
+    timings = {
+        task_id: TaskTiming(
+            task_id=task_id,
+            task_name=tasks[task_id][0],
+            status=tasks[task_id][1],
+            duration=duration[task_id],
+            earliest_start=es[task_id],
+            earliest_finish=ef[task_id],
+            latest_start=ls[task_id],
+            latest_finish=lf[task_id],
+        )
+        for task_id in order
+    }
+
+    # 終了が最も遅いクリティカルタスクから、クリティカルな先行タスクをたどる
+    path = []
+    current = max(
+        (t for t in order if timings[t].is_critical and ef[t] >= total - 1e-9),
+        key=lambda t: (duration[t] > 0, -t),
+        default=None,
+    )
+    while current is not None:
+        path.append(current)
+        current = next(
+            (p for p in predecessors[current]
+             if timings[p].is_critical and abs(ef[p] - es[current]) <= 1e-9),
+            None,
+        )
+    path.reverse()
+
+    return CriticalPath(
+        project_id=project_id,
+        timings=timings,
+        path=path,
+        total_hours=total,
+        hours_per_day=hours_per_day,
+    )
+
+
+# ======================
+# 読み込みとキャッシュ
+# ======================
+_cache: dict[tuple[int, float], CriticalPath] = {}
+_cache_lock = threading.Lock()
+
+
+def load_task_graph(db: Session, project_id: int) -> tuple[dict, list]:
+    """案件のタスクと依存関係を1クエリで取得"""
+    rows = db.execute(
+        select(
+            Task.task_id,
+            Task.task_name,
+            Task.status,
+            Task.estimated_hours,
+            TaskDependency.depends_on_task_id,
+        )
+        .outerjoin(TaskDependency, TaskDependency.task_id == Task.task_id)
+        .where(Task.project_id == project_id)
+    ).all()
+
+    tasks = {}
+    edges = []
+    for task_id, task_name, status, estimated_hours, depends_on in rows:
+        if task_id not in tasks:
+            tasks[task_id] = (task_name, status or "todo", float(estimated_hours or 0))
+        if depends_on is not None:
+            edges.append((depends_on, task_id))
+    return tasks, edges
+
+
+def get_critical_path(
+    project_id: int, hours_per_day: float = WORKING_HOURS_PER_DAY
+) -> CriticalPath:
+    """案件のクリティカルパスを取得（タスクが変わるまでキャッシュ）"""
+    key = (project_id, hours_per_day)
+    with _cache_lock:
+        cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    with get_db() as db:
+        tasks, edges = load_task_graph(db, project_id)
+    result = compute_critical_path(project_id, tasks, edges, hours_per_day)
+
+    with _cache_lock:
+        _cache[key] = result
+    return result
+
+
+def invalidate_critical_path(project_id: Optional[int] = None) -> None:
+    """キャッシュを破棄（project_id 省略時は全案件）"""
+    with _cache_lock:
+        if project_id is None:
+            _cache.clear()
+            return
+        for key in [k for k in _cache if k[0] == project_id]:
+            del _cache[key]
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_on_task_change(session, flush_context):
+    """タスク・依存関係の変更を検知してキャッシュを破棄"""
+    project_ids = set()
+    for obj in session.new | session.deleted:
+        if isinstance(obj, (Task, TaskDependency)):
+            project_ids.add(obj.project_id)
+    for obj in session.dirty:
+        if isinstance(obj, Task):
+            attrs = inspect(obj).attrs
+            if any(attrs[name].history.has_changes() for name in _TASK_GRAPH_ATTRS):
+                project_ids.add(obj.project_id)
+                project_ids.update(attrs.project_id.history.deleted or ())
+        elif isinstance(obj, TaskDependency):
+            project_ids.add(obj.project_id)
+    for project_id in project_ids:
+        if project_id is not None:
+            invalidate_critical_path(project_id)
@@ -0,0 +1,141 @@
+"""期限切れ・期限間近のマイルストーンとタスクの一括検出
+
+全案件の未完了マイルストーン・タスクのうち、期限が RISK_DAYS 日以内のものを
+1クエリ（UNION ALL）で取得する。条件は部分インデックス
+（milestones: status <> 'completed'、tasks: status <> 'done' の due_date）と
+一致させているため、完了済みの履歴が増えても走査量は未完了分だけで済む。
+
+進行中の案件の期限切れのマイルストーンは一括UPDATEで delayed にし、期限が延びて
+期限内に戻った delayed は pending に戻す。
+"""
+import os
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import literal, select, union_all, update
+from sqlalchemy.orm import Session
+from crm_core import Milestone, Project, Task
+
+# この日数以内に期限が来る未完了のものを「期限間近」とする
+RISK_DAYS = int(os.environ.get("CRM_DEADLINE_RISK_DAYS", "3"))
+
+# 完了・失注・キャンセルの案件は対象外
+CLOSED_PROJECT_STATUSES = (9, 10, 11)
+
+# 部分インデックスの条件と一致させること（migrations/012_deadline_partial_indexes.sql）
+MILESTONE_OPEN = Milestone.status != "completed"
+TASK_OPEN = Task.status != "done"
+
+
+@dataclass(frozen=True)
+class DeadlineItem:
+    """期限切れ・期限間近のマイルストーン・タスク"""
+    kind: str  # "milestone" / "task"
+    item_id: int
+    name: str
+    project_id: int
+    project_name: str
+    due_date: date
+    status: str
+    assigned_to: Optional[str]
+    days_left: int  # 期限までの日数（期限切れは負）
+
+    @property
+    def overdue(self) -> bool:
+        return self.days_left < 0
+
+
+def scan_deadlines(
+    db: Session, today: Optional[date] = None, risk_days: int = RISK_DAYS
+) -> list[DeadlineItem]:
+    """期限切れ・期限間近の未完了マイルストーンとタスクを1クエリで取得（期限の早い順）"""
+    today = today or date.today()
+    horizon = today + timedelta(days=risk_days)
+    milestones = (
+        select(
+            literal("milestone").label("kind"),
+            Milestone.milestone_id.label("item_id"),
+            Milestone.milestone_name.label("name"),
+            Milestone.project_id,
+            Milestone.due_date,
+            Milestone.status,
+            literal(None).label("assigned_to"),
+        )
+        .where(MILESTONE_OPEN, Milestone.due_date <= horizon)
+    )
+    tasks = (
+        select(
+            literal("task").label("kind"),
+            Task.task_id.label("item_id"),
+            Task.task_name.label("name"),
+            Task.project_id,
+            Task.due_date,
+            Task.status,
+            Task.assigned_to,
+        )
+        .where(TASK_OPEN, Task.due_date <= horizon)
+    )
+    items = union_all(milestones, tasks).subquery()
+    rows = db.execute(
+        select(items, Project.project_name)
+        .join(Project, Project.project_id == items.c.project_id)
+        .where(Project.status_id.notin_(CLOSED_PROJECT_STATUSES))
+        .order_by(items.c.due_date, items.c.kind, items.c.item_id)
+    ).all()
+
+    return [
+        DeadlineItem(
+            kind=kind,
+            item_id=item_id,
+            name=name,
+            project_id=project_id,
+            project_name=project_name,
+            due_date=due_date,
+            status=status or "",
+            assigned_to=assigned_to,
+            days_left=(due_date - today).days,
+        )
+        for kind, item_id, name, project_id, due_date, status, assigned_to, project_name in rows
+    ]
+
+
+def mark_delayed_milestones(db: Session, today: Optional[date] = None) -> tuple[int, int]:
+    """期限切れのマイルストーンを delayed に、期限内に戻ったものを pending に一括更新
+
+    (delayed にした件数, pending に戻した件数) を返す。
+    """
+    today = today or date.today()
+    open_projects = select(Project.project_id).where(Project.status_id.notin_(CLOSED_PROJECT_STATUSES))
+    delayed = db.execute(
+        update(Milestone)
+        .where(
+            MILESTONE_OPEN,
+            Milestone.status != "delayed",
+            Milestone.due_date < today,
+            Milestone.project_id.in_(open_projects),
+        )
+        .values(status="delayed")
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    recovered = db.execute(
+        update(Milestone)
+        .where(MILESTONE_OPEN, Milestone.status == "delayed", Milestone.due_date >= today)
+        .values(status="pending")
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    return delayed, recovered
+
+
+def group_by_assignee(
+    items: list[DeadlineItem], normalize: Callable[[str], str] = str.strip
+) -> dict[Optional[str], list[DeadlineItem]]:
+    """担当者ごとにまとめる（マイルストーン・担当者未設定のタスクは None）
+
+    normalize: 担当者欄の表記ゆれをそろえる関数（同じ結果になる担当者は1つにまとめる）
+    """
+    groups: dict[Optional[str], list[DeadlineItem]] = {}
+    for item in items:
+        key = normalize(item.assigned_to) if item.assigned_to else None
+        groups.setdefault(key or None, []).append(item)
+    return groups
@@ -1,23 +1,51 @@
-"""工程・タスク管理サービス"""
+"""工程・タスク管理サービス
+
+よく使う検索はモジュール読み込み時に1回だけ文を組み立て、呼び出しごとには
+パラメータだけを渡す（文の組み立てとキャッシュキーの計算を毎回行わない）。
+呼び出しごとに新しいセッションを使うため、主キー検索も Session.get() より速い
+（benchmarks/query_construction.py）。
+"""
 from datetime import date
 from typing import Optional
-from crm_core import get_db, Project, Milestone, Task, TimeEntry
+from sqlalchemy import bindparam, select
+from crm_core import get_db, Project, Milestone, Task, TaskDependency, TimeEntry, ProjectRow, MilestoneRow, TaskRow
+
+from .timers import record_time
+
+_PROJECT_ROW_BY_ID = ProjectRow.select().where(Project.project_id == bindparam("project_id"))
+_MILESTONE_BY_ID = select(Milestone).where(Milestone.milestone_id == bindparam("milestone_id"))
+_TASK_BY_ID = select(Task).where(Task.task_id == bindparam("task_id"))
+_MILESTONES_BY_PROJECT = (
+    MilestoneRow.select()
+    .where(Milestone.project_id == bindparam("project_id"))
+    .order_by(Milestone.due_date)
+)
+_TASKS_BY_PROJECT = (
+    TaskRow.select()
+    .where(Task.project_id == bindparam("project_id"))
+    .order_by(Task.sort_order, Task.due_date)
+)
+_TASK_PROJECT_ID = select(Task.project_id).where(Task.task_id == bindparam("task_id"))
+_TASK_PROJECT_IDS = select(Task.task_id, Task.project_id).where(
+    Task.task_id.in_(bindparam("task_ids", expanding=True))
+)
+_DEPENDENCIES_BY_PROJECT = select(TaskDependency.task_id, TaskDependency.depends_on_task_id).where(
+    TaskDependency.project_id == bindparam("project_id")
+)
 
 
 class ScheduleService:
     """工程管理サービス"""
 
     @staticmethod
-    def get_schedule(project_id: int) -> tuple[Optional[Project], list[Milestone]]:
+    def get_schedule(project_id: int) -> tuple[Optional[ProjectRow], list[MilestoneRow]]:
         """案件の工程を取得"""
         with get_db() as db:
-            project = db.query(Project).filter(Project.project_id == project_id).first()
-            if not project:
+            row = db.execute(_PROJECT_ROW_BY_ID, {"project_id": project_id}).first()
+            if row is None:
                 return None, []
-            milestones = db.query(Milestone).filter(
-                Milestone.project_id == project_id
-            ).order_by(Milestone.due_date).all()
-            return project, milestones
+            milestones = db.execute(_MILESTONES_BY_PROJECT, {"project_id": project_id})
+            return ProjectRow(*row), [MilestoneRow(*m) for m in milestones]
 
     @staticmethod
     def add_milestone(
@@ -25,7 +53,7 @@ class ScheduleService:
         milestone_name: str,
         due_date: date,
         description: str = ""
-    ) -> Milestone:
+    ) -> MilestoneRow:
         """マイルストーンを追加"""
         with get_db() as db:
             milestone = Milestone(
@@ -37,15 +65,13 @@ class ScheduleService:
             )
             db.add(milestone)
             db.flush()
-            return milestone
+            return MilestoneRow.from_instance(milestone)
 
     @staticmethod
     def update_milestone_status(milestone_id: int, status: str) -> Optional[Milestone]:
         """マイルストーンステータスを更新"""
         with get_db() as db:
-            milestone = db.query(Milestone).filter(
-                Milestone.milestone_id == milestone_id
-            ).first()
+            milestone = db.scalar(_MILESTONE_BY_ID, {"milestone_id": milestone_id})
             if milestone:
                 milestone.status = status
                 if status == "completed":
@@ -57,12 +83,10 @@ class TaskService:
     """タスク管理サービス"""
 
     @staticmethod
-    def get_tasks(project_id: int) -> list[Task]:
+    def get_tasks(project_id: int) -> list[TaskRow]:
         """案件のタスク一覧を取得"""
         with get_db() as db:
-            return db.query(Task).filter(
-                Task.project_id == project_id
-            ).order_by(Task.sort_order, Task.due_date).all()
+            return [TaskRow(*row) for row in db.execute(_TASKS_BY_PROJECT, {"project_id": project_id})]
 
     @staticmethod
     def add_task(
@@ -72,7 +96,7 @@ class TaskService:
         due_date: date = None,
         description: str = "",
         milestone_id: int = None
-    ) -> Task:
+    ) -> TaskRow:
         """タスクを追加"""
         with get_db() as db:
             task = Task(
@@ -86,13 +110,13 @@ class TaskService:
             )
             db.add(task)
             db.flush()
-            return task
+            return TaskRow.from_instance(task)
 
     @staticmethod
     def update_task_status(task_id: int, status: str) -> Optional[Task]:
         """タスクステータスを更新"""
         with get_db() as db:
-            task = db.query(Task).filter(Task.task_id == task_id).first()
+            task = db.scalar(_TASK_BY_ID, {"task_id": task_id})
             if task:
                 task.status = status
                 if status == "done":
@@ -103,22 +127,49 @@ class TaskService:
     def log_time(task_id: int, hours: float, description: str = "") -> tuple[TimeEntry, float]:
         """工数を記録"""
         with get_db() as db:
-            task = db.query(Task).filter(Task.task_id == task_id).first()
-            if not task:
+            project_id = db.scalar(_TASK_PROJECT_ID, {"task_id": task_id})
+            if project_id is None:
                 raise ValueError(f"Task {task_id} not found")
 
-            entry = TimeEntry(
-                task_id=task_id,
-                project_id=task.project_id,
-                hours=hours,
-                description=description,
-                work_date=date.today()
-            )
-            db.add(entry)
+            # 工数記録の追加とタスクの実績工数への加算（UPDATE 1回）
+            return record_time(db, task_id, project_id, hours, description)
 
-            # タスクの実績工数を更新
-            total_hours = sum(float(e.hours) for e in task.time_entries) + hours
-            task.actual_hours = total_hours
-            db.flush()
+    @staticmethod
+    def add_dependency(task_id: int, depends_on_task_id: int) -> TaskDependency:
+        """依存関係を追加（task_id は depends_on_task_id の完了後に着手）"""
+        if task_id == depends_on_task_id:
+            raise ValueError("タスク自身には依存できません")
+        with get_db() as db:
+            tasks = db.execute(_TASK_PROJECT_IDS, {"task_ids": [task_id, depends_on_task_id]}).all()
+            project_ids = {tid: pid for tid, pid in tasks}
+            for tid in (task_id, depends_on_task_id):
+                if tid not in project_ids:
+                    raise ValueError(f"Task {tid} not found")
+            project_id = project_ids[task_id]
+            if project_ids[depends_on_task_id] != project_id:
+                raise ValueError("別の案件のタスクには依存できません")
+
+            # 後続側から先行タスクへ到達できるなら循環になる
+            successors: dict[int, list[int]] = {}
+            for after, before in db.execute(_DEPENDENCIES_BY_PROJECT, {"project_id": project_id}):
+                successors.setdefault(before, []).append(after)
+            stack, seen = [task_id], {task_id}
+            while stack:
+                current = stack.pop()
+                if current == depends_on_task_id:
+                    raise ValueError("依存関係が循環します")
+                for succ in successors.get(current, ()):
+                    if succ not in seen:
+                        seen.add(succ)
+                        stack.append(succ)
 
-            return entry, total_hours
+            dependency = db.get(TaskDependency, (task_id, depends_on_task_id))
+            if dependency is None:
+                dependency = TaskDependency(
+                    task_id=task_id,
+                    depends_on_task_id=depends_on_task_id,
+                    project_id=project_id,
+                )
+                db.add(dependency)
+                db.flush()
+            return dependency
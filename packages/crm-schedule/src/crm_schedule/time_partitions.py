@@ -0,0 +1,197 @@
+"""工数記録の月次パーティションと日次ロールアップ
+
+PostgreSQL の time_entries は work_date の月単位レンジパーティション
+（migrations/015_time_entries_partitioning.sql、名前は time_entries_y2025m04）。
+
+- ensure_partitions: 今月から数か月先までのパーティションを作成（Botの日次ジョブ）
+- compact_time_entries: 保持期間を過ぎた月を 日 × 案件 × タスク の合計として
+  time_entry_daily_rollups に移し、パーティションごと削除する。DELETE と違って
+  不要タプルが残らないため、古い月が VACUUM の対象になることもない
+- worked_hours: 集計（timesheet・burndown）用に工数記録とロールアップを UNION ALL した副問い合わせ。
+  期間で絞り込むと、古い期間は生の行の側がパーティションの除外で空になり、
+  直近の期間はロールアップの側がインデックスで空になる
+
+パーティションのないDB（SQLite・マイグレーション未適用）では、圧縮は古い行の集計と DELETE で行う。
+圧縮後は工数記録ごとの説明（description）と記録時刻は残らない。
+"""
+import re
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import column, delete, func, insert, select, table, text, union_all
+from sqlalchemy.orm import Session
+from crm_core import TimeEntry, TimeEntryDailyRollup
+
+# 何か月先までパーティションを用意しておくか
+PARTITION_MONTHS_AHEAD = 3
+
+_PARTITION_NAME = re.compile(r"^time_entries_y(\d{4})m(\d{2})$")
+_ROLLUP_COLUMNS = ("work_date", "project_id", "task_id", "hours", "entry_count")
+
+
+@dataclass(frozen=True)
+class CompactionResult:
+    """圧縮の結果"""
+    before: date                 # この日より前の工数記録を圧縮した
+    partitions: tuple[str, ...]  # 削除したパーティション
+    entries: int                 # 圧縮した工数記録の件数
+    rollups: int                 # 作成したロールアップの行数
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    """月初の日付を months か月ずらす"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"time_entries_y{month.year}m{month.month:02d}"
+
+
+def is_partitioned(db: Session) -> bool:
+    """time_entries がパーティションテーブルか"""
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return bool(db.scalar(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('time_entries'))"
+    )))
+
+
+def list_partitions(db: Session) -> dict[date, str]:
+    """月次パーティション（月初 → テーブル名、既定パーティションは含めない）"""
+    names = db.scalars(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'time_entries'::regclass"
+    ))
+    partitions = {}
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            partitions[date(int(match[1]), int(match[2]), 1)] = name
+    return partitions
+
+
+def default_partition(db: Session) -> Optional[str]:
+    """既定パーティションのテーブル名（なければ None）"""
+    return db.scalar(text(
+        "SELECT c.relname FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partdefid "
+        "WHERE p.partrelid = 'time_entries'::regclass"
+    ))
+
+
+def ensure_partitions(db: Session, today: Optional[date] = None, months_ahead: int = PARTITION_MONTHS_AHEAD) -> list[str]:
+    """今月から months_ahead か月先までのパーティションを作成し、作成したテーブル名を返す
+
+    既定パーティションにその月の行があると、そのままでは作成できない（行が新しい範囲と重なる）。
+    その場合は既定パーティションを切り離してから作成し、行を移して付け直す。
+    切り離している間は time_entries への書き込みがロックで待たされる（同じトランザクション内で行う）。
+    """
+    if not is_partitioned(db):
+        return []
+    existing = list_partitions(db)
+    default = default_partition(db)
+    this_month = month_start(today or date.today())
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(this_month, offset)
+        if month in existing:
+            continue
+        name = partition_name(month)
+        bounds = {"start": month, "end": add_months(month, 1)}
+        create = text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF time_entries "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        )
+        stranded = default is not None and db.scalar(
+            text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE work_date >= :start AND work_date < :end)"),
+            bounds,
+        )
+        if stranded:
+            columns = ", ".join(c.name for c in TimeEntry.__table__.columns)
+            db.execute(text(f"ALTER TABLE time_entries DETACH PARTITION {default}"))
+            db.execute(create)
+            db.execute(
+                text(
+                    f"INSERT INTO time_entries ({columns}) SELECT {columns} FROM {default} "
+                    "WHERE work_date >= :start AND work_date < :end"
+                ),
+                bounds,
+            )
+            db.execute(text(f"DELETE FROM {default} WHERE work_date >= :start AND work_date < :end"), bounds)
+            db.execute(text(f"ALTER TABLE time_entries ATTACH PARTITION {default} DEFAULT"))
+        else:
+            db.execute(create)
+        created.append(name)
+    return created
+
+
+def _rollup_from(source, *conditions):
+    """source の行を日 × 案件 × タスクで合計してロールアップを作る文（作成した行の entry_count を返す）"""
+    return insert(TimeEntryDailyRollup).from_select(
+        list(_ROLLUP_COLUMNS),
+        select(
+            source.c.work_date,
+            source.c.project_id,
+            source.c.task_id,
+            func.sum(source.c.hours),
+            func.count(),
+        ).where(*conditions).group_by(source.c.work_date, source.c.project_id, source.c.task_id),
+    ).returning(TimeEntryDailyRollup.entry_count)
+
+
+def compact_time_entries(db: Session, retention_months: int, today: Optional[date] = None) -> CompactionResult:
+    """retention_months か月より前の月の工数記録を日次ロールアップに圧縮
+
+    例: retention_months=24 で今日が 2026-10-19 なら 2024-10-01 より前が対象。
+    パーティションは集計して削除し、既定パーティションなどに残った古い行は集計して DELETE する。
+    """
+    if retention_months < 1:
+        raise ValueError("retention_months must be at least 1")
+    before = add_months(month_start(today or date.today()), -retention_months)
+    entries = rollups = 0
+
+    dropped = []
+    if is_partitioned(db):
+        for month, name in sorted(list_partitions(db).items()):
+            if add_months(month, 1) > before:
+                continue
+            partition = table(name, *(column(c) for c in ("work_date", "project_id", "task_id", "hours")))
+            counts = db.scalars(_rollup_from(partition)).all()
+            entries += sum(counts)
+            rollups += len(counts)
+            db.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+
+    source = TimeEntry.__table__
+    counts = db.scalars(_rollup_from(source, source.c.work_date < before)).all()
+    if counts:
+        db.execute(delete(TimeEntry).where(TimeEntry.work_date < before).execution_options(synchronize_session=False))
+        entries += sum(counts)
+        rollups += len(counts)
+
+    return CompactionResult(before, tuple(dropped), entries, rollups)
+
+
+def worked_hours(start: Optional[date] = None, end: Optional[date] = None, project_id: Optional[int] = None):
+    """工数記録とロールアップを合わせた (work_date, project_id, task_id, hours) の副問い合わせ
+
+    start〜end（両端含む）・案件で絞り込む。同じ日に両方の行があっても合計すれば正しい値になる。
+    """
+    branches = []
+    for source in (TimeEntry, TimeEntryDailyRollup):
+        conditions = []
+        if start is not None:
+            conditions.append(source.work_date >= start)
+        if end is not None:
+            conditions.append(source.work_date <= end)
+        if project_id is not None:
+            conditions.append(source.project_id == project_id)
+        branches.append(
+            select(source.work_date, source.project_id, source.task_id, source.hours).where(*conditions)
+        )
+    return union_all(*branches).subquery("worked_hours")
@@ -0,0 +1,133 @@
+"""作業タイマー（開始・停止による工数記録）
+
+計測中のタイマーは active_timers にユーザーごとの1行として保存する。
+
+- 開始: タスクを主キーで引く INSERT ... SELECT 1回（タスクがなければ0行）
+- 停止: 主キーでの DELETE ... RETURNING 1回 → 工数記録の INSERT と
+  タスクの実績工数への加算（UPDATE ... SET actual_hours = actual_hours + 時間）
+- 最終操作時刻の更新: 主キーでの UPDATE 1回
+
+時刻はローカル時刻（naive）で扱い、工数記録の作業日は開始日とする。
+"""
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, String, delete, func, insert, literal, select, update
+from sqlalchemy.orm import Session
+from crm_core import ActiveTimer, Task, TimeEntry
+
+
+@dataclass(frozen=True)
+class TimerState:
+    """計測中のタイマー"""
+    user_id: str
+    task_id: int
+    project_id: int
+    started_at: datetime
+    last_active_at: datetime
+
+
+@dataclass(frozen=True)
+class StoppedTimer:
+    """停止したタイマー"""
+    task_id: int
+    project_id: int
+    started_at: datetime
+    stopped_at: datetime
+    hours: float
+    total_hours: Optional[float]  # 加算後のタスクの実績工数（記録なしならNone）
+
+
+def record_time(
+    db: Session,
+    task_id: int,
+    project_id: int,
+    hours: float,
+    description: str = "",
+    work_date: Optional[date] = None,
+) -> tuple[TimeEntry, float]:
+    """工数記録を1件追加し、タスクの実績工数に加算して (工数記録, 加算後の実績工数) を返す"""
+    entry = TimeEntry(
+        task_id=task_id,
+        project_id=project_id,
+        hours=hours,
+        description=description,
+        work_date=work_date or date.today(),
+    )
+    db.add(entry)
+    db.flush()
+    total = db.execute(
+        update(Task)
+        .where(Task.task_id == task_id)
+        .values(actual_hours=func.coalesce(Task.actual_hours, 0) + hours)
+        .returning(Task.actual_hours)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    return entry, float(total or 0)
+
+
+def start_timer(db: Session, user_id: str, task_id: int, now: Optional[datetime] = None) -> Optional[TimerState]:
+    """タイマーを開始（タスクがなければNone）。計測中のタイマーがあれば先に stop_timer() すること"""
+    now = now or datetime.now()
+    project_id = db.execute(
+        insert(ActiveTimer)
+        .from_select(
+            ["user_id", "task_id", "project_id", "started_at", "last_active_at"],
+            select(
+                literal(user_id, String),
+                Task.task_id,
+                Task.project_id,
+                literal(now, DateTime),
+                literal(now, DateTime),
+            ).where(Task.task_id == task_id),
+        )
+        .returning(ActiveTimer.project_id)
+    ).scalar()
+    if project_id is None:
+        return None
+    return TimerState(user_id, task_id, project_id, now, now)
+
+
+def stop_timer(
+    db: Session, user_id: str, until: Optional[datetime] = None, description: str = ""
+) -> Optional[StoppedTimer]:
+    """タイマーを停止して工数を記録（計測中でなければNone）。until までの時間を記録する"""
+    row = db.execute(
+        delete(ActiveTimer)
+        .where(ActiveTimer.user_id == user_id)
+        .returning(ActiveTimer.task_id, ActiveTimer.project_id, ActiveTimer.started_at)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if row is None:
+        return None
+
+    task_id, project_id, started_at = row
+    stopped_at = max(until or datetime.now(), started_at)
+    hours = round((stopped_at - started_at).total_seconds() / 3600, 2)
+    total = None
+    if hours > 0:
+        _, total = record_time(
+            db, task_id, project_id, hours,
+            description=description or "タイマー",
+            work_date=started_at.date(),
+        )
+    return StoppedTimer(task_id, project_id, started_at, stopped_at, hours, total)
+
+
+def touch_timer(db: Session, user_id: str, at: datetime) -> None:
+    """最終操作時刻を更新"""
+    db.execute(
+        update(ActiveTimer)
+        .where(ActiveTimer.user_id == user_id)
+        .values(last_active_at=at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def load_timers(db: Session) -> list[TimerState]:
+    """計測中のタイマーをすべて取得（起動時の読み込み用）"""
+    return [
+        TimerState(row.user_id, row.task_id, row.project_id, row.started_at, row.last_active_at)
+        for row in db.execute(select(ActiveTimer)).scalars()
+    ]
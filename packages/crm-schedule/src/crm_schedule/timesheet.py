@@ -0,0 +1,116 @@
+"""工数集計（日・週・月 × 案件・タスク）
+
+工数記録（time_entries）と保持期間を過ぎて圧縮された日次ロールアップ
+（time_entry_daily_rollups）を合わせ、期間の先頭日（PostgreSQL は date_trunc）と
+案件またはタスクで GROUP BY して合計する（crm_schedule.time_partitions.worked_hours）。
+どちらも期間の絞り込みと集計に使う列は (work_date, project_id) INCLUDE (hours, task_id) の
+カバリングインデックス（migrations/013・015）に収まり、time_entries は月次パーティションの
+除外も効くため、工数記録が何年分たまっても index-only scan で済む。案件名・タスク名は集計後に結合する。
+"""
+from calendar import monthrange
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Optional
+
+from sqlalchemy import Date, cast, func, select
+from sqlalchemy.orm import Session
+from crm_core import Project, Task
+from .time_partitions import worked_hours
+
+PERIODS = ("day", "week", "month")
+GROUPINGS = ("project", "task")
+
+
+@dataclass(frozen=True)
+class HoursRow:
+    """期間 × 案件（またはタスク）の工数合計"""
+    period_start: date
+    key: Optional[int]  # 案件ID / タスクID（タスクなしの工数記録は None）
+    name: str
+    project_id: int
+    hours: float
+
+
+def period_start(column, period: str, dialect: str):
+    """期間（日・週・月）の先頭日を求めるSQL式（週は月曜始まり）"""
+    if period not in PERIODS:
+        raise ValueError(f"Unknown period: '{period}'")
+    if dialect == "postgresql":
+        return cast(func.date_trunc(period, column), Date)
+    # SQLite（開発・テスト用）
+    if period == "day":
+        return func.date(column)
+    if period == "week":
+        return func.date(column, "-6 days", "weekday 1")
+    return func.date(column, "start of month")
+
+
+def period_bounds(period: str, today: Optional[date] = None, offset: int = 0) -> tuple[date, date]:
+    """today を含む期間から offset 個ずらした期間の (開始日, 終了日)
+
+    例: period_bounds("week", offset=-1) は先週の月曜〜日曜
+    """
+    today = today or date.today()
+    if period == "day":
+        day = today + timedelta(days=offset)
+        return day, day
+    if period == "week":
+        start = today - timedelta(days=today.weekday()) + timedelta(weeks=offset)
+        return start, start + timedelta(days=6)
+    if period == "month":
+        month_index = today.year * 12 + today.month - 1 + offset
+        year, month = divmod(month_index, 12)
+        start = date(year, month + 1, 1)
+        return start, date(start.year, start.month, monthrange(start.year, start.month)[1])
+    raise ValueError(f"Unknown period: '{period}'")
+
+
+def _as_date(value) -> date:
+    """SQLiteでは日付関数の結果が文字列になる"""
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def aggregate_hours(
+    db: Session,
+    start: date,
+    end: date,
+    period: str = "day",
+    by: str = "project",
+    project_id: Optional[int] = None,
+) -> list[HoursRow]:
+    """start〜end（両端含む）の工数を期間 × 案件（by="task" ならタスク）で集計"""
+    if by not in GROUPINGS:
+        raise ValueError(f"Unknown grouping: '{by}'")
+
+    source = worked_hours(start, end, project_id)
+    bucket = period_start(source.c.work_date, period, db.get_bind().dialect.name).label("period_start")
+    group_columns = [source.c.project_id] if by == "project" else [source.c.task_id, source.c.project_id]
+
+    totals = (
+        select(
+            bucket,
+            group_columns[0].label("key"),
+            source.c.project_id.label("project_id"),
+            func.sum(source.c.hours).label("hours"),
+        )
+        .group_by(bucket, *group_columns)
+        .subquery()
+    )
+    if by == "project":
+        name = Project.project_name
+        joined = select(totals, name).outerjoin(Project, Project.project_id == totals.c.key)
+    else:
+        name = Task.task_name
+        joined = select(totals, name).outerjoin(Task, Task.task_id == totals.c.key)
+
+    rows = db.execute(joined.order_by(totals.c.period_start, totals.c.key)).all()
+    return [
+        HoursRow(
+            period_start=_as_date(start_day),
+            key=key,
+            name=label or ("タスクなし" if key is None else f"ID {key}"),
+            project_id=owner,
+            hours=float(hours or 0),
+        )
+        for start_day, key, owner, hours, label in rows
+    ]
@@ -0,0 +1,67 @@
+"""テスト共通設定
+
+一時ディレクトリの SQLite（組み込みバックエンド）に migrations/ を適用して使う。
+crm_core はエンジンを最初の接続時に作るため、DATABASE_URL は import より前に設定する。
+"""
+import glob
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_DB_DIR = tempfile.mkdtemp(prefix="crm-test-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'crm.db')}"
+os.environ.pop("DATABASE_READ_URL", None)
+
+# Bot・ダッシュボードと同じく bot/ を import パスに入れる（packages/ は未インストールでも使えるようにする）
+sys.path[:0] = [os.path.join(ROOT, "bot"), *sorted(glob.glob(os.path.join(ROOT, "packages", "*", "src")))]
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    """マイグレーションを適用したテスト用DB"""
+    from crm_core.migrations import migrate
+
+    migrate(os.path.join(ROOT, "migrations"))
+    yield
+    shutil.rmtree(_DB_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def projects():
+    """クライアント付きの案件を当月に5件作成し、案件IDのリストを返す"""
+    from crm_core import Client, Project, get_db
+
+    project_ids = []
+    with get_db() as db:
+        for i in range(5):
+            client = Client(company_name=f"テスト商事{datetime.utcnow():%H%M%S%f}-{i}")
+            db.add(client)
+            db.flush()
+            project = Project(
+                project_name=f"テスト案件{i}",
+                client_id=client.client_id,
+                status_id=1 + i % 3,
+                estimated_amount=100000 * (i + 1),
+            )
+            db.add(project)
+            db.flush()
+            project_ids.append(project.project_id)
+    return project_ids
+
+
+@pytest.fixture(scope="session")
+def dashboard():
+    """dashboard/app.py（streamlit がなければスキップ）"""
+    pytest.importorskip("streamlit")
+    pytest.importorskip("plotly")
+    spec = importlib.util.spec_from_file_location("dashboard_app", os.path.join(ROOT, "dashboard", "app.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,39 @@
+"""見積精度の分析結果のキャッシュが工数の記録で破棄されること"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from crm_core import Project, Task, get_db
+from crm_estimate import get_estimate_accuracy
+from crm_schedule import record_time, start_timer, stop_timer
+
+
+@pytest.fixture
+def task_id(projects):
+    """納品済の案件のタスク"""
+    with get_db() as db:
+        project = db.get(Project, projects[0])
+        project.status_id = 8
+        project.estimated_hours = 10
+        task = Task(project_id=project.project_id, task_name="実装", status="done", estimated_hours=10)
+        db.add(task)
+        db.flush()
+        return task.task_id
+
+
+def test_record_time_invalidates_cache(task_id):
+    cached = get_estimate_accuracy()
+    assert get_estimate_accuracy() is cached
+    with get_db() as db:
+        record_time(db, task_id, db.get(Task, task_id).project_id, 2.5)
+    assert get_estimate_accuracy() is not cached
+
+
+def test_stop_timer_invalidates_cache(task_id):
+    with get_db() as db:
+        start_timer(db, "U0TEST", task_id, now=datetime.now() - timedelta(hours=1))
+    cached = get_estimate_accuracy()
+    with get_db() as db:
+        stopped = stop_timer(db, "U0TEST")
+    assert stopped.hours > 0
+    assert get_estimate_accuracy() is not cached
@@ -0,0 +1,62 @@
+"""strictモード（raiseload('*')）で一覧・レポート・ダッシュボードが先読みだけで動くこと"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy.exc import InvalidRequestError
+
+from crm_core import Project, get_db, get_read_db, set_strict_loading
+from crm_core.loading import hot_path, query_projects_with_client
+
+
+@pytest.fixture
+def strict_loading():
+    set_strict_loading(True)
+    yield
+    set_strict_loading(False)
+
+
+def test_query_projects_with_client_preloads_client(strict_loading, projects):
+    with get_read_db() as db:
+        rows = query_projects_with_client(db).filter(Project.project_id.in_(projects)).all()
+        names = [p.client.company_name for p in rows]
+    assert len(names) == len(projects)
+
+
+def test_strict_loading_rejects_lazy_load(strict_loading, projects):
+    with get_read_db() as db:
+        project = hot_path(db.query(Project), "test").filter(Project.project_id == projects[0]).one()
+        with pytest.raises(InvalidRequestError):
+            project.client
+
+
+def test_bulk_update_ignored_by_hot_path_listener(projects):
+    with get_db() as db:
+        updated = db.query(Project).filter(Project.project_id.in_(projects)).update(
+            {Project.notes: "一括更新"}, synchronize_session=False
+        )
+    assert updated == len(projects)
+
+
+def test_project_listing(strict_loading, projects):
+    from handlers.project_handler import fetch_project_page
+
+    with get_read_db() as db:
+        page = fetch_project_page(db)
+    assert page.rows
+    assert all(row.company_name for row in page.rows if row.project_id in projects)
+
+
+def test_monthly_report(strict_loading, projects):
+    from reports.monthly_report import MonthlyReportGenerator
+
+    today = datetime.utcnow()
+    with get_read_db() as db:
+        stats = MonthlyReportGenerator(db).collect_stats(today.year, today.month)
+    assert stats.new_projects >= len(projects)
+    assert stats.top_clients
+
+
+def test_dashboard_load_data(strict_loading, projects, dashboard):
+    df = dashboard.load_data()
+    assert set(projects) <= set(df["project_id"])
+    assert (df["client_name"] != "不明").all()
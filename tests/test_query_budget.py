@@ -0,0 +1,114 @@
+"""クエリ数の上限（raise モード）
+
+一覧・レポート・ダッシュボード・見積表示が上限内で動くこと、N+1 を QueryBudgetExceeded で検出すること。
+"""
+from datetime import datetime
+
+import pytest
+
+from crm_core import (
+    EstimateItem, Project, QueryBudgetExceeded, Task,
+    get_db, get_read_db, query_budget, set_query_budget_mode,
+)
+from crm_core.loading import get_project_with_client
+from crm_estimate import create_version
+
+
+@pytest.fixture(autouse=True)
+def raise_on_budget():
+    set_query_budget_mode("raise")
+    yield
+    set_query_budget_mode("off")
+
+
+@pytest.fixture(scope="module")
+def router():
+    """案件・工程・見積のメッセージコマンドを登録したルーター"""
+    from slack_bolt import App
+    from router import CommandRouter
+    from handlers import register_project_handlers, register_schedule_handlers, register_estimate_handlers
+
+    app = App(token="xoxb-test", signing_secret="test", token_verification_enabled=False)
+    router = CommandRouter()
+    for register in (register_project_handlers, register_schedule_handlers, register_estimate_handlers):
+        register(app, router)
+    return router
+
+
+@pytest.fixture
+def project_id(projects):
+    """タスク・見積明細・見積の版（2つ）がある案件"""
+    project_id = projects[0]
+    with get_db() as db:
+        for i in range(5):
+            db.add(Task(project_id=project_id, task_name=f"タスク{i}", status="todo", sort_order=i))
+            db.add(EstimateItem(project_id=project_id, item_name=f"明細{i}", quantity=i + 1, unit_price=10000))
+        db.flush()
+        create_version(db, project_id, note="初版")
+        db.add(EstimateItem(project_id=project_id, item_name="追加明細", quantity=1, unit_price=5000))
+        db.flush()
+        create_version(db, project_id, note="追加")
+    return project_id
+
+
+def run_command(router, text: str) -> list[str]:
+    """メッセージコマンドを実行し、返信のテキストを返す"""
+    command, args = router.resolve(text)
+    assert args is not None, command.usage
+    replies = []
+    command.handler({"user": "U0TEST"}, lambda text=None, **kwargs: replies.append(text), args)
+    return replies
+
+
+def test_collect_stats(projects):
+    from reports.monthly_report import MonthlyReportGenerator
+
+    today = datetime.utcnow()
+    with get_read_db() as db:
+        stats = MonthlyReportGenerator(db).collect_stats(today.year, today.month)
+    assert stats.new_projects >= len(projects)
+
+
+def test_dashboard_load_data(projects, dashboard):
+    assert set(projects) <= set(dashboard.load_data()["project_id"])
+
+
+def test_build_estimate_blocks(project_id):
+    from handlers.estimate_handler import build_estimate_blocks, calculate_estimate_total, fetch_estimate_page
+
+    with get_read_db() as db:
+        project = get_project_with_client(db, project_id)
+        page = fetch_estimate_page(db, project_id)
+        blocks = build_estimate_blocks(project, page, calculate_estimate_total(db, project_id))
+    assert blocks[0]["type"] == "header"
+
+
+def test_build_estimate_blocks_rejects_lazy_client(project_id):
+    from handlers.estimate_handler import build_estimate_blocks, calculate_estimate_total, fetch_estimate_page
+
+    with get_read_db() as db:
+        project = db.get(Project, project_id)  # クライアントを先読みしていない
+        page = fetch_estimate_page(db, project_id)
+        total = calculate_estimate_total(db, project_id)
+        with pytest.raises(QueryBudgetExceeded):
+            build_estimate_blocks(project, page, total)
+
+
+def test_project_list(router, projects):
+    assert run_command(router, "案件一覧") == ["最近の案件一覧"]
+
+
+def test_task_list(router, project_id):
+    assert run_command(router, f"タスク一覧 {project_id}") == ["タスク一覧"]
+
+
+def test_estimate_version_list(router, project_id):
+    (reply,) = run_command(router, f"見積版一覧 {project_id}")
+    assert "v2" in reply
+
+
+def test_n_plus_one_raises(projects):
+    with pytest.raises(QueryBudgetExceeded, match=r"N\+1"):
+        with query_budget("N+1"), get_read_db() as db:
+            for project in db.query(Project).filter(Project.project_id.in_(projects)):
+                project.client.company_name
@@ -0,0 +1,53 @@
+"""全文検索の文書が Core の INSERT・DELETE（一括登録・テンプレート適用・版の復元）にも追従すること"""
+import pytest
+
+from crm_core import EstimateTemplate, EstimateTemplateItem, SearchDocument, get_db, search_query
+from crm_estimate import apply_template_items, create_version, insert_estimate_items, restore_version
+
+
+def item_hits(db, keyword: str, project_id: int) -> list[str]:
+    query, _ = search_query(db, keyword)
+    return [
+        row.title for row in query.filter(
+            SearchDocument.doc_type == "estimate_item", SearchDocument.project_id == project_id
+        )
+    ]
+
+
+@pytest.fixture
+def project_id(projects):
+    return projects[0]
+
+
+def test_bulk_insert_is_searchable(project_id):
+    with get_db() as db:
+        insert_estimate_items(db, project_id, [
+            {"item_name": "決済連携", "description": "ＰａｙＰａｌ と Stripe", "unit_price": 80000},
+        ])
+        assert item_hits(db, "paypal", project_id) == ["決済連携"]
+
+
+def test_template_items_are_searchable(project_id):
+    with get_db() as db:
+        template = EstimateTemplate(template_name=f"検索テスト{project_id}")
+        db.add(template)
+        db.flush()
+        db.add(EstimateTemplateItem(
+            template_id=template.template_id, item_name="在庫同期", description="基幹システムと夜間バッチ",
+            unit_price=50000,
+        ))
+        db.flush()
+        apply_template_items(db, project_id, template.template_name)
+        assert item_hits(db, "夜間バッチ", project_id) == ["在庫同期"]
+
+
+def test_restore_version_drops_stale_documents(project_id):
+    with get_db() as db:
+        insert_estimate_items(db, project_id, [{"item_name": "要件定義", "unit_price": 100000}])
+        version = create_version(db, project_id)
+        insert_estimate_items(db, project_id, [{"item_name": "多言語対応", "unit_price": 60000}])
+        create_version(db, project_id)
+
+        restore_version(db, project_id, version.version_no)
+        assert item_hits(db, "多言語", project_id) == []
+        assert item_hits(db, "要件定義", project_id) == ["要件定義"]